@@ -3,10 +3,11 @@
 
 import sys
 import json
+import multiprocessing
 import os
-import math
+import threading
 import time
-import random
+from collections import deque
 from datetime import datetime, timedelta
 
 # 检查依赖
@@ -30,10 +31,12 @@ except ImportError:
 try:
     from PyQt6.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, 
-        QPushButton, QTextEdit, QGroupBox, QSpinBox, QComboBox, QTabWidget, QFormLayout,
-        QDateEdit, QProgressBar, QStatusBar, QCheckBox, QFileDialog, QMessageBox
+        QPushButton, QPlainTextEdit, QGroupBox, QSpinBox, QComboBox, QTabWidget, QFormLayout,
+        QDateEdit, QProgressBar, QStatusBar, QCheckBox, QFileDialog, QMessageBox, QTableView, QHeaderView
     )
-    from PyQt6.QtCore import QThread, pyqtSignal, QObject, QDate
+    from PyQt6.QtCore import (QThread, pyqtSignal, QObject, QDate, QTimer, Qt, QAbstractTableModel,
+                              QModelIndex, QUrl)
+    from PyQt6.QtGui import QDesktopServices
 except ImportError:
     missing_modules.append("PyQt6")
 
@@ -48,375 +51,405 @@ if missing_modules:
 # 如果所有模块都可用，继续执行
 print("所有依赖模块检查通过!")
 
+from ccgp.checkpoint import CrawlCheckpoint, checkpoint_path, list_checkpoints
+from ccgp.detail import DETAIL_HEAD, DetailFetcher, detail_to_row
+from ccgp.engine import HEAD, CrawlEngine, record_to_row
+from ccgp.export import ExcelSink, resolve_output_path, write_excel
+from ccgp.metrics import CrawlMetrics
+from ccgp.profiling import Profiler, stage_timer
+from ccgp.record import Announcement
+from ccgp.store import AnnouncementStore, StoreWriter
+
 # ------------------------- Worker类 -------------------------
+# 日志级别：简要模式只显示进度和错误，详细模式另外显示每条数据和请求参数
+LOG_DEBUG = 10
+LOG_INFO = 20
+LOG_ERROR = 40
+# 日志框最多保留的行数，超出时自动删除最早的行
+LOG_MAX_LINES = 2000
+# 主线程把缓冲的日志刷新到日志框的间隔（毫秒）
+LOG_FLUSH_MS = 250
+
+
+class LogBuffer(object):
+    """
+    工作线程的日志缓冲区。
+
+    工作线程只把日志追加到缓冲区，不触发任何界面更新；主线程的定时器每隔 LOG_FLUSH_MS 毫秒
+    用 drain() 取走积攒的日志，一次性追加到日志框。低于 level 的日志直接丢弃；
+    缓冲区最多积攒 LOG_MAX_LINES 条，来不及显示时丢弃最早的日志并计数。
+    """
+
+    def __init__(self, level=LOG_INFO, max_pending=LOG_MAX_LINES):
+        self.level = level
+        self.pending = deque(maxlen=max_pending)
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def write(self, level, message):
+        if level < self.level:
+            return
+        line = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}"
+        with self.lock:
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+            self.pending.append(line)
+
+    def debug(self, message):
+        self.write(LOG_DEBUG, message)
+
+    def info(self, message):
+        self.write(LOG_INFO, message)
+
+    def error(self, message):
+        self.write(LOG_ERROR, message)
+
+    def drain(self):
+        """取走全部积攒的日志行，返回 (日志行列表, 丢弃的条数)"""
+        with self.lock:
+            lines = list(self.pending)
+            self.pending.clear()
+            dropped, self.dropped = self.dropped, 0
+        return lines, dropped
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    抓取结果表格的数据模型，直接读取 Announcement 记录列表，不为每行创建控件或数据行。
+
+    - 抓取过程中工作线程只往列表末尾追加记录，sync() 由主线程定时调用，把新记录加入表格；
+    - 行按需提供给视图：rowCount() 只包含已取出的行，视图滚动到底部时再通过 fetchMore() 取下一批；
+    - 排序和筛选在模型中完成，rows 为排序、筛选后的记录下标；两者都未启用时 rows 为 None，
+      行号即记录下标，不额外占用内存。排序后新到的记录追加在末尾，再次点击表头即可重新排序。
+    """
+
+    # (表头, 记录字段)
+    COLUMNS = [('日期', 'date'), ('名称', 'title'), ('采购人', 'buyer'), ('代理机构', 'agent'),
+               ('地区', 'region'), ('公告类型', 'bid_type_name'), ('详情', 'href')]
+    # 每次提供给视图的行数
+    FETCH_BATCH = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.rows = None
+        self.scanned = 0
+        self.fetched = 0
+        self.filter_text = ''
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+    def set_source(self, records):
+        """显示新的记录列表（抓取开始时传入工作线程正在追加的列表）"""
+        self.beginResetModel()
+        self.records = records
+        self._rebuild()
+        self.endResetModel()
+
+    def _matches(self, record):
+        text = self.filter_text
+        return text in record.title or text in record.buyer or text in record.agent or text in record.region
+
+    def _sort_keys(self, column):
+        """每条记录的排序键，预先取出后按下标排序，比在比较时逐次取属性快得多"""
+        name = self.COLUMNS[column][1]
+        if name == 'date':
+            # 按解析后的日期排序，无法解析的日期排在最前
+            return [r.published.toordinal() if r.published is not None else 0 for r in self.records]
+        return [getattr(r, name) for r in self.records]
+
+    def _rebuild(self):
+        """按当前的筛选条件和排序重新计算 rows"""
+        count = len(self.records)
+        if self.filter_text:
+            rows = [i for i in range(count) if self._matches(self.records[i])]
+        elif self.sort_column >= 0:
+            rows = list(range(count))
+        else:
+            rows = None
+        if rows is not None and self.sort_column >= 0:
+            rows.sort(key=self._sort_keys(self.sort_column).__getitem__,
+                      reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+        self.rows = rows
+        self.scanned = count
+        self.fetched = min(self.FETCH_BATCH, self.total_rows())
+
+    def total_rows(self):
+        """筛选后的总行数（含尚未提供给视图的行，不含 sync() 之后才追加的记录）"""
+        return self.scanned if self.rows is None else len(self.rows)
+
+    def record_at(self, row):
+        return self.records[row if self.rows is None else self.rows[row]]
+
+    def sync(self):
+        """把工作线程新追加的记录加入表格；视图已显示到末尾时立即提供新行"""
+        count = len(self.records)
+        if count == self.scanned:
+            return
+        # 追加之前视图是否已取到最后一行
+        at_end = self.fetched == self.total_rows()
+        if self.rows is not None:
+            self.rows.extend(i for i in range(self.scanned, count)
+                             if not self.filter_text or self._matches(self.records[i]))
+        self.scanned = count
+        if at_end:
+            self.fetchMore(QModelIndex())
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.filter_text = text.strip()
+        self._rebuild()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.fetched < self.total_rows()
+
+    def fetchMore(self, parent):
+        count = min(self.FETCH_BATCH, self.total_rows() - self.fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return getattr(self.record_at(index.row()), self.COLUMNS[index.column()][1])
+        if role == Qt.ItemDataRole.ToolTipRole:
+            record = self.record_at(index.row())
+            return f"{record.title}\n{record.summary}" if index.column() == 1 else None
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section][0]
+        return section + 1
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.beginResetModel()
+        self.sort_column = column
+        self.sort_order = order
+        self._rebuild()
+        self.endResetModel()
+
+
 class Worker(QObject):
     """
     将爬虫逻辑放在一个单独的QObject中，以便可以移动到QThread中执行，防止UI阻塞。
+    实际的抓取和解析由 ccgp.engine.CrawlEngine 完成，Worker只负责转发进度：
+    进度条通过Qt信号更新，日志写入 log（LogBuffer），由主线程定时取走显示。
     """
     finished = pyqtSignal()
-    progress_update = pyqtSignal(str)
     progress_bar_update = pyqtSignal(int, int)
-    error = pyqtSignal(str)
-    data_saved = pyqtSignal(str)
 
-    def __init__(self, config):
+    def __init__(self, config, resume=False):
         super().__init__()
         self.config = config
+        self.log = LogBuffer(LOG_DEBUG if config.get('log_level') == 'debug' else LOG_INFO)
         self.is_running = True
         self.current_crawled_data = []
-        self.session = requests.Session()  # 使用会话管理网络连接
-        
-        # 禁用代理以避免连接问题
-        self.session.trust_env = False
-        
-        # 根据配置设置代理
-        if config.get('use_proxy', False):
-            proxy_host = config.get('proxy_host', '127.0.0.1')
-            proxy_port = config.get('proxy_port', 7890)
-            proxy_url = f"http://{proxy_host}:{proxy_port}"
-            self.session.proxies = {
-                'http': proxy_url,
-                'https': proxy_url
-            }
-        else:
-            self.session.proxies = {}
+        self.sink = None
+        # 抓取过程中写断点日志，中断后可从断点继续；resume 为 True 时在已有日志的基础上续抓
+        self.checkpoint = CrawlCheckpoint(checkpoint_path(config, config.get('checkpoint_dir')), config, resume=resume)
+        # 运行指标，抓取结束时在日志中输出摘要
+        self.metrics = CrawlMetrics()
+        # 勾选"性能分析"时按阶段和页码记录耗时，结束时写出报告
+        self.profiler = Profiler.from_config(config)
+        self.timed = stage_timer(self.metrics, self.profiler)
+        self.engine = CrawlEngine(
+            config,
+            log=self.log.info,
+            debug=self.log.debug,
+            progress=self._emit_progress if self.profiler is not None else self.progress_bar_update.emit,
+            checkpoint=self.checkpoint,
+            metrics=self.metrics,
+            profiler=self.profiler,
+        )
+        # 勾选"保存到本地公告库"时同时写入公告库，之后可在"公告搜索"中检索
+        self.store_writer = None
+        if config.get('store'):
+            self.store_writer = StoreWriter(AnnouncementStore(config['store']))
+        # 勾选"抓取详情页"时，列表抓取的同时并发抓取详情页
+        self.detail_fetcher = None
+        if config.get('fetch_details'):
+            self.detail_fetcher = DetailFetcher(config, log=self.log.info)
 
     def stop(self):
-        self.progress_update.emit("正在请求停止...")
+        self.log.info("正在请求停止...")
         self.is_running = False
-        # 关闭网络会话
-        if hasattr(self, 'session'):
-            try:
-                self.session.close()
-            except:
-                pass
+        # 停止引擎并关闭网络会话
+        self.engine.stop()
+        if self.detail_fetcher is not None:
+            self.detail_fetcher.stop()
+
+    def _emit_progress(self, current, total):
+        with self.timed('emit', current):
+            self.progress_bar_update.emit(current, total)
 
     def run(self):
         """执行爬虫任务"""
+        if self.profiler is not None:
+            # 在工作线程中启动，cProfile 记录的是抓取所在的线程
+            self.profiler.start()
         try:
-            self.progress_update.emit("开始执行数据爬取任务...")
+            self.log.info("开始执行数据爬取任务...")
             
-            # 1. 抓取数据
+            # 1. 抓取数据，开启自动保存时边抓取边写入Excel
             self.current_crawled_data = self._crawler_ccgp_threaded()
             
             if not self.is_running:
-                self._save_interrupted_data()
-                self.progress_update.emit("任务已手动停止。")
-                self.finished.emit()
+                self._close_sink()
+                self.log.info("任务已手动停止。")
                 return
             
-            self.progress_update.emit("数据抓取完成，开始处理数据...")
-            
-            head = ['序号', '关键字', '名称', '日期', '采购人', '代理机构', '公告类型', '详情', '项目概况']
+            self.log.info("数据抓取完成，开始处理数据...")
             
             # 根据是否有新数据，决定后续操作
             if self.current_crawled_data:
-                self.progress_update.emit(f"共抓取到 {len(self.current_crawled_data)} 条数据。")
-                
-                # 自动保存
-                if self.config.get('auto_save', True):
-                    output_filename = self.config.get('output_prefix', 'filtered_data_') + datetime.now().strftime("%Y%m%d_%H%M%S")
-                    self._writer_excel(self.current_crawled_data, head, output_filename)
-                    self.data_saved.emit(f"数据已保存到 {output_filename}.xlsx")
+                self.log.info(f"共抓取到 {len(self.current_crawled_data)} 条数据。")
+                self._close_sink()
             else:
-                self.progress_update.emit("未抓取到任何数据。")
+                self.log.info("未抓取到任何数据。")
             
-            self.progress_update.emit(f"本次共抓取数据条数: {len(self.current_crawled_data)}")
-            self.progress_update.emit("任务完成!")
+            self.log.info(f"本次共抓取数据条数: {len(self.current_crawled_data)}")
+            self.log.info("任务完成!")
             
         except Exception as e:
-            self.error.emit(f"程序执行过程中发生错误: {e}")
+            self.log.error(f"程序执行过程中发生错误: {e}")
         finally:
+            # 出错时也要生成Excel文件，保留已抓取的数据
+            saved = self._close_sink()
+            # 完整抓取且结果已保存时删除断点日志，否则保留以便继续抓取
+            if self.engine.completed and saved:
+                self.checkpoint.finish()
+            else:
+                self.checkpoint.close()
+                self.log.info("断点已保存，可点击“继续上次抓取”从中断处继续。")
             # 确保在结束时关闭网络会话
-            if hasattr(self, 'session'):
+            self.engine.close()
+            if self.detail_fetcher is not None:
+                self.detail_fetcher.close()
+            self._close_store()
+            for line in self.metrics.summary():
+                self.log.info(line)
+            if self.profiler is not None:
                 try:
-                    self.session.close()
-                except:
-                    pass
+                    self.log.info(f"性能分析报告已写入 {self.profiler.write()}")
+                except Exception as e:
+                    self.log.error(f"写入性能分析报告时出错: {e}")
             self.finished.emit()
 
-    def _save_interrupted_data(self):
-        if self.current_crawled_data:
-            self.progress_update.emit("正在保存已抓取的数据...")
-            head = ['序号', '关键字', '名称', '日期', '采购人', '代理机构', '公告类型', '详情', '项目概况']
-            output_filename = "interrupted_data_" + datetime.now().strftime("%Y%m%d_%H%M%S")
-            self._writer_excel(self.current_crawled_data, head, output_filename)
-            self.data_saved.emit(f"已保存 {len(self.current_crawled_data)} 条数据到 {output_filename}.xlsx")
-        else:
-            self.progress_update.emit("没有数据需要保存。")
-
-    def _get_bid_type_name(self, bid_type_code):
-        """根据公告类型代码获取对应的名称"""
-        bid_type_map = {
-            "0": "所有", "1": "公开招标", "2": "询价公告", "3": "竞争性谈判",
-            "4": "单一来源", "5": "资格预审", "6": "邀请公告", "7": "中标公告",
-            "8": "更正公告", "9": "其他公告", "10": "竞争性磋商", "11": "成交公告",
-            "12": "废标公告"
-        }
-        return bid_type_map.get(bid_type_code, "未知类型")
+    def _open_sink(self):
+        output_filename = self.config.get('output_prefix', 'filtered_data_') + datetime.now().strftime("%Y%m%d_%H%M%S")
+        full_path = resolve_output_path(self.config.get('save_path', ''), output_filename)
+        self.sink = ExcelSink(full_path, HEAD + DETAIL_HEAD if self.detail_fetcher is not None else HEAD)
 
-    def _get_request_headers(self, referer=None):
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/119.0'
-        ]
-        ua = random.choice(user_agents)
-        headers = {
-            "User-Agent": ua, 
-            "Host": "search.ccgp.gov.cn",
-            "Referer": referer if referer else "http://search.ccgp.gov.cn/",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-            "Accept-Encoding": "gzip, deflate", 
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Connection": "keep-alive", 
-            "Upgrade-Insecure-Requests": "1",
-            "Cache-Control": "max-age=0"
-        }
-        return headers
+    def _close_sink(self):
+        """结束写入并生成Excel文件，可重复调用；保存出错时返回 False"""
+        if self.sink is None:
+            return True
+        sink, self.sink = self.sink, None
+        try:
+            with self.timed('write'):
+                sink.close()
+            self.log.info(f"已保存 {sink.count} 条数据到 {sink.full_path}")
+            return True
+        except Exception as e:
+            self.log.error(f"保存Excel文件时出错: {e}")
+            return False
 
-    def _open_url(self, url, params, refer=None):
-        headers = self._get_request_headers(refer)
-        delay_seconds = 3  # 固定延迟
-        self.progress_update.emit(f"等待 {delay_seconds} 秒...")
-        time.sleep(delay_seconds)
-        
+    def _close_store(self):
+        if self.store_writer is None:
+            return
+        store_writer, self.store_writer = self.store_writer, None
         try:
-            response = self.session.get(url, headers=headers, params=params, timeout=30)
-            return response
+            with self.timed('write'):
+                store_writer.close()
+            self.log.info(f"{store_writer.count} 条数据已写入公告库 {store_writer.store.path}")
         except Exception as e:
-            self.progress_update.emit(f"网络错误: {str(e)[:30]}")
-            raise
+            self.log.error(f"写入公告库时出错: {e}")
+        finally:
+            store_writer.store.close()
 
     def _crawler_ccgp_threaded(self):
-        sheetdata = []
-        url = 'http://search.ccgp.gov.cn/bxsearch?'
-        
-        # 使用GUI传入的日期
-        start_date_str = self.config['start_date']
-        end_date_str = self.config['end_date']
-        
-        # 添加调试信息
-        self.progress_update.emit(f"使用时间范围: {start_date_str} 至 {end_date_str}")
-        
-        # 使用最简单的参数格式
-        params = {
-            'searchtype': 1, 
-            'page_index': 1, 
-            'bidSort': 0,
-            'buyerName': self.config.get('buyer_name', ''), 
-            'projectId': '', 
-            'pinMu': 0, 
-            'bidType': self.config.get('bid_type', '0'),
-            'dbselect': 'bidx', 
-            'kw': self.config.get('keyword', ''),  # 不设置默认值
-            'start_time': start_date_str,
-            'end_time': end_date_str,
-            'timeType': self.config.get('time_type', 6),  # 使用配置中的timeType
-            'displayZone': '',
-            'zoneId': self.config.get('zone_id', ''),
-            'pppStatus': 0, 
-            'agentName': self.config.get('agent_name', '')
-        }
-        
-        # 简单清理空参数，但保留重要参数
-        cleaned_params = {}
-        for k, v in params.items():
-            if k == 'kw':  # 关键字参数处理
-                # 如果用户没有输入关键字，使用空字符串而不是默认值
-                user_keyword = self.config.get('keyword', '').strip()
-                cleaned_params[k] = user_keyword if user_keyword else ''
-            elif k == 'dbselect':  # dbselect必须是字符串
-                cleaned_params[k] = 'bidx'
-            elif k in ['searchtype', 'page_index', 'bidSort', 'pinMu', 'pppStatus', 'timeType']:
-                # 这些参数转换为整数
-                try:
-                    cleaned_params[k] = int(v) if v != '' else 0
-                except (ValueError, TypeError):
-                    cleaned_params[k] = 0
-            elif k == 'bidType':
-                # bidType保持字符串格式
-                cleaned_params[k] = str(v) if v is not None else '0'
-            elif k in ['start_time', 'end_time']:  # 时间参数必须保留
-                cleaned_params[k] = v
-            elif v is not None and str(v).strip():
-                cleaned_params[k] = v
-        
-        # 添加参数调试信息
-        self.progress_update.emit(f"API参数: {cleaned_params}")
-        
-        # 构建并显示完整的API URL
-        from urllib.parse import urlencode
-        full_url = url + urlencode(cleaned_params)
-        self.progress_update.emit(f"完整API URL: {full_url}")
-        
+        # 内存中保存紧凑的 Announcement 记录，数据行只在写入Excel时临时生成；
+        # 记录直接追加到 current_crawled_data，结果表格在抓取过程中即可显示已抓到的数据
+        records = self.current_crawled_data
+        source = self.engine.iter_records()
+        if self.detail_fetcher is not None:
+            source = self.detail_fetcher.enrich(source)
         try:
-            self.progress_update.emit("开始获取数据...")
-            resp = self._open_url(url, cleaned_params)
-            if not self.is_running: return sheetdata
-            resp.raise_for_status()
-            html = resp.content.decode('utf-8')
-            tree = etree.HTML(html)
-            
-            total_text = tree.xpath('/html/body/div[5]/div[1]/div/p[1]/span[2]/text()')
-            total = int(total_text[0].strip()) if total_text else 0
-            self.progress_update.emit(f"找到 {total} 条数据")
-            
-            if total > 0:
-                pagesize = math.ceil(total / 20)
-                self.progress_update.emit(f"总共 {pagesize} 页数据需要抓取")
-                
-                for curr_page in range(1, pagesize + 1):
-                    if not self.is_running: break
-                    self.progress_update.emit(f"正在抓取第 {curr_page}/{pagesize} 页数据...")
-                    self.progress_bar_update.emit(curr_page, pagesize)
-                    
-                    # 获取下一页内容
-                    if curr_page > 1:
-                        params['page_index'] = curr_page
-                        resp = self._open_url(url, params, resp.url)
-                        if not self.is_running: break
-                        html = resp.content.decode('utf-8')
-                        tree = etree.HTML(html)
-                    
-                    list_items = tree.xpath('/html/body/div[5]/div[2]/div/div/div[1]/ul/li')
-                    for i, li in enumerate(list_items):
-                        if not self.is_running: break
-                        try:
-                            # 添加空值检查
-                            title_element = li.find('a')
-                            summary_element = li.find('p')
-                            span_element = li.find('span')
-                            
-                            if title_element is None or summary_element is None or span_element is None: 
-                                self.progress_update.emit("  跳过无效数据项")
-                                continue
-                                
-                            # 安全获取文本内容
-                            title = title_element.text.strip() if title_element.text else ''
-                            if not title:
-                                self.progress_update.emit("  跳过空标题项")
-                                continue
-                                
-                            link_href = title_element.get('href', '')
-                            summary = summary_element.text.strip() if summary_element.text else ''
-                            
-                            # 安全获取span内容
-                            span_text = span_element.xpath('string()')
-                            if not span_text:
-                                self.progress_update.emit("  跳过空span项")
-                                continue
-                                
-                            info = span_text.replace(' ', '').replace('\r', '').replace('\n', '').replace('\t', '')
-                            
-                            if len(info) < 10:
-                                self.progress_update.emit("  跳过信息不完整项")
-                                continue
-                            
-                            date_part = info[:10]
-                            remaining_info = info[10:]
-                            
-                            # 初始化
-                            buyer_part = ''
-                            agent_part = ''
-                            region_part = ''
-                            
-                            # 调试信息 - 减少输出频率
-                            if i % 5 == 0:  # 每5条记录输出一次
-                                self.progress_update.emit(f"  解析数据: {remaining_info[:30]}...")
-                            
-                            # 使用更精确的方式解析
-                            # 先找到所有标识位置
-                            buyer_pos = remaining_info.find('采购人：')
-                            agent_pos = remaining_info.find('代理机构：')
-                            
-                            # 处理采购人
-                            if buyer_pos != -1:
-                                buyer_start = buyer_pos + 4
-                                # 找到下一个分隔符的位置
-                                next_sep = remaining_info.find('|', buyer_start)
-                                if next_sep != -1:
-                                    buyer_part = remaining_info[buyer_start:next_sep].strip()
-                                else:
-                                    # 如果没有|，看是否有代理机构标识
-                                    if agent_pos > buyer_pos:
-                                        buyer_part = remaining_info[buyer_start:agent_pos].strip()
-                                    else:
-                                        buyer_part = remaining_info[buyer_start:].strip()
-                            
-                            # 处理代理机构
-                            if agent_pos != -1:
-                                agent_start = agent_pos + 5
-                                # 找到下一个分隔符的位置
-                                next_sep = remaining_info.find('|', agent_start)
-                                if next_sep != -1:
-                                    agent_part = remaining_info[agent_start:next_sep].strip()
-                                else:
-                                    agent_part = remaining_info[agent_start:].strip()
-                            
-                            # 处理区域信息 - 从最后一个|开始的部分
-                            last_pipe = remaining_info.rfind('|')
-                            if last_pipe != -1:
-                                potential_region = remaining_info[last_pipe + 1:].strip()
-                                # 确保这部分不包含采购人或代理机构标识
-                                if '采购人：' not in potential_region and '代理机构：' not in potential_region:
-                                    region_part = potential_region
-                            
-                            # 调试输出解析结果 - 减少输出频率
-                            if i % 5 == 0:  # 每5条记录输出一次
-                                self.progress_update.emit(f"    解析结果: 采购人={buyer_part[:20]}, 代理={agent_part[:20]}, 区域={region_part[:20]}")
-                            
-                            # 获取公告类型名称
-                            bid_type_name = self._get_bid_type_name(self.config.get('bid_type', '0'))
-                            
-                            # 获取搜索关键字
-                            search_keyword = self.config.get('keyword', '')
-                            
-                            # 更新数据行结构: 序号、关键字、名称、日期、采购人、代理机构、公告类型、详情、项目概况
-                            row = [len(sheetdata) + 1, search_keyword, title, date_part, buyer_part, agent_part, bid_type_name, link_href, summary]
-                            sheetdata.append(row)
-                            
-                            # 减少日志输出频率
-                            if i % 10 == 0:  # 每10条记录输出一次
-                                self.progress_update.emit(f"  已获取第 {i+1} 条数据: {title[:20]}...")
-                        except (ValueError, IndexError, AttributeError) as e:
-                            self.progress_update.emit(f"解析数据时出错，跳过此条记录: {e}")
-                            continue
-                        except Exception as e:
-                            self.progress_update.emit(f"处理数据时出现未知错误，跳过此条记录: {e}")
-                            continue
-                            
+            for record in source:
+                if not self.is_running: break
+                records.append(record)
+                # 抓到第一条数据时才创建文件，没有数据时不生成空文件
+                if self.config.get('auto_save', True):
+                    if self.sink is None:
+                        self._open_sink()
+                    # 数据行结构: 序号、关键字、名称、日期、采购人、代理机构、公告类型、详情、项目概况
+                    with self.timed('write', record.page):
+                        row = record_to_row(len(records), record)
+                        if self.detail_fetcher is not None:
+                            row += detail_to_row(record)
+                        self.sink.append(row)
+                if self.store_writer is not None:
+                    with self.timed('write', record.page):
+                        self.store_writer.write(record)
+                # 减少日志输出频率
+                if len(records) % 10 == 1:
+                    self.log.debug(f"  已获取第 {len(records)} 条数据: {record.title[:20]}...")
         except Exception as e:
-            self.error.emit(f"抓取数据时发生错误: {e}")
-        return sheetdata
-
-    def _writer_excel(self, data, head, filename):
-        # 获取保存路径
-        save_path = self.config.get('save_path', '')
-        if save_path and save_path.strip():
-            full_path = os.path.join(save_path, filename + '.xlsx')
-        else:
-            full_path = filename + '.xlsx'
-        
-        workbook = xlsxwriter.Workbook(full_path)
-        worksheet = workbook.add_worksheet("中标公告")
-        for cvi, cv in enumerate(head):
-            worksheet.write(0, cvi, cv)
-        for row_idx, rowdata in enumerate(data, start=1):
-            for col_idx, cell_data in enumerate(rowdata):
-                worksheet.write(row_idx, col_idx, cell_data)
-        workbook.close()
+            self.log.error(f"抓取数据时发生错误: {e}")
+        finally:
+            source.close()
+        return records
 
 
 # ------------------------- PyQt6 GUI 主窗口 -------------------------
 class MainWindow(QMainWindow):
     CONFIG_FILE = "config.json"
+    CACHE_DIR = "ccgp_cache"
+    CHECKPOINT_DIR = "checkpoints"
+    PROFILE_DIR = "profiles"
+    STORE_FILE = "announcements.db"
+    SEARCH_LIMIT = 1000
+    BID_TYPES = [
+        ("所有", "0"), ("公开招标", "1"), ("询价公告", "2"), ("竞争性谈判", "3"),
+        ("单一来源", "4"), ("资格预审", "5"), ("邀请公告", "6"), ("中标公告", "7"),
+        ("更正公告", "8"), ("其他公告", "9"), ("竞争性磋商", "10"), ("成交公告", "11"),
+        ("废标公告", "12")
+    ]
+    REGIONS = [
+        ("全国", ""), ("北京", "11"), ("天津", "12"), ("河北", "13"), ("山西", "14"),
+        ("内蒙古", "15"), ("辽宁", "21"), ("吉林", "22"), ("黑龙江", "23"), ("上海", "31"),
+        ("江苏", "32"), ("浙江", "33"), ("安徽", "34"), ("福建", "35"), ("江西", "36"),
+        ("山东", "37"), ("河南", "41"), ("湖北", "42"), ("湖南", "43"), ("广东", "44"),
+        ("广西", "45"), ("海南", "46"), ("重庆", "50"), ("四川", "51"), ("贵州", "52"),
+        ("云南", "53"), ("西藏", "54"), ("陕西", "61"), ("甘肃", "62"), ("青海", "63"),
+        ("宁夏", "64"), ("新疆", "65")
+    ]
 
     def __init__(self):
         super().__init__()
         self.worker = None
         self.thread = None
         self.crawled_data = []
+        # "公告搜索"使用的公告库，首次搜索时打开
+        self.search_store = None
+        # 抓取期间定时把工作线程缓冲的日志刷新到日志框，并把新抓到的记录加入结果表格
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(LOG_FLUSH_MS)
+        self.refresh_timer.timeout.connect(self._refresh_from_worker)
         self.init_ui()
         self.load_config()
 
@@ -462,8 +495,12 @@ class MainWindow(QMainWindow):
         # Create Tabs - 去掉邮件标签页
         self.crawler_tab = self._create_crawler_tab()
         self.advanced_tab = self._create_advanced_tab()
+        self.results_tab = self._create_results_tab()
+        self.search_tab = self._create_search_tab()
 
         self.tab_widget.addTab(self.crawler_tab, "爬虫设置")
+        self.tab_widget.addTab(self.results_tab, "抓取结果")
+        self.tab_widget.addTab(self.search_tab, "公告搜索")
         self.tab_widget.addTab(self.advanced_tab, "高级设置")
 
         # Status Bar
@@ -520,13 +557,7 @@ class MainWindow(QMainWindow):
         # 第二列：公告类型和代理机构名称
         search_layout.addWidget(QLabel("公告类型:"), 0, 1)
         self.bid_type_combo = QComboBox()
-        bid_types = [
-            ("所有", "0"), ("公开招标", "1"), ("询价公告", "2"), ("竞争性谈判", "3"),
-            ("单一来源", "4"), ("资格预审", "5"), ("邀请公告", "6"), ("中标公告", "7"),
-            ("更正公告", "8"), ("其他公告", "9"), ("竞争性磋商", "10"), ("成交公告", "11"),
-            ("废标公告", "12")
-        ]
-        for name, code in bid_types:
+        for name, code in self.BID_TYPES:
             self.bid_type_combo.addItem(name, code)
         self.bid_type_combo.setCurrentText("所有")
         search_layout.addWidget(self.bid_type_combo, 1, 1)
@@ -563,16 +594,7 @@ class MainWindow(QMainWindow):
         # 第三列：区域
         search_layout.addWidget(QLabel("区域:"), 0, 2)
         self.region_combo = QComboBox()
-        regions = [
-            ("全国", ""), ("北京", "11"), ("天津", "12"), ("河北", "13"), ("山西", "14"),
-            ("内蒙古", "15"), ("辽宁", "21"), ("吉林", "22"), ("黑龙江", "23"), ("上海", "31"),
-            ("江苏", "32"), ("浙江", "33"), ("安徽", "34"), ("福建", "35"), ("江西", "36"),
-            ("山东", "37"), ("河南", "41"), ("湖北", "42"), ("湖南", "43"), ("广东", "44"),
-            ("广西", "45"), ("海南", "46"), ("重庆", "50"), ("四川", "51"), ("贵州", "52"),
-            ("云南", "53"), ("西藏", "54"), ("陕西", "61"), ("甘肃", "62"), ("青海", "63"),
-            ("宁夏", "64"), ("新疆", "65")
-        ]
-        for name, code in regions:
+        for name, code in self.REGIONS:
             self.region_combo.addItem(name, code)
         self.region_combo.setCurrentText("广西")
         search_layout.addWidget(self.region_combo, 1, 2)
@@ -614,8 +636,11 @@ class MainWindow(QMainWindow):
         self.stop_button.setEnabled(False)
         self.save_results_button = QPushButton('💾 保存结果')
         self.save_results_button.setEnabled(False)
+        self.resume_button = QPushButton('⏯️ 继续上次抓取')
+        self.resume_button.setToolTip("从最近一次被中断的抓取的断点继续，已完成的页面不再重新请求")
 
         button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.resume_button)
         button_layout.addWidget(self.stop_button)
         button_layout.addWidget(self.save_results_button)
         button_layout.addStretch()
@@ -625,8 +650,10 @@ class MainWindow(QMainWindow):
         # Log Output Area
         log_group = QGroupBox("运行日志")
         log_layout = QVBoxLayout()
-        self.log_output = QTextEdit()
+        # QPlainTextEdit 追加文本的开销远小于 QTextEdit，且可以限制保留的行数
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
+        self.log_output.setMaximumBlockCount(LOG_MAX_LINES)
         self.log_output.setMaximumHeight(200)
         log_layout.addWidget(self.log_output)
         log_group.setLayout(log_layout)
@@ -634,11 +661,169 @@ class MainWindow(QMainWindow):
 
         # Connect Signals
         self.start_button.clicked.connect(self._start_crawling)
+        self.resume_button.clicked.connect(self._resume_crawling)
         self.stop_button.clicked.connect(self._stop_crawling)
         self.save_results_button.clicked.connect(self._save_results)
 
         return tab
 
+    def _create_results_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        filter_layout = QHBoxLayout()
+        self.results_filter_input = QLineEdit()
+        self.results_filter_input.setPlaceholderText("按名称、采购人、代理机构或地区筛选")
+        self.results_count_label = QLabel("共 0 条")
+        filter_layout.addWidget(QLabel("筛选:"))
+        filter_layout.addWidget(self.results_filter_input)
+        filter_layout.addWidget(self.results_count_label)
+        layout.addLayout(filter_layout)
+
+        self.results_model = RecordTableModel(self)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.results_view.setAlternatingRowColors(True)
+        self.results_view.setWordWrap(False)
+        # 固定行高、列宽不随内容计算，几十万行时滚动和刷新的开销只与可见行数有关
+        self.results_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.results_view.verticalHeader().setDefaultSectionSize(22)
+        header = self.results_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        for column, width in enumerate([90, 360, 180, 180, 60, 80]):
+            self.results_view.setColumnWidth(column, width)
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.results_view.setSortingEnabled(True)
+        self.results_view.setToolTip("双击一行在浏览器中打开公告详情")
+        layout.addWidget(self.results_view)
+
+        # 输入停顿后再筛选，避免每输入一个字就扫描全部记录
+        self.results_filter_timer = QTimer(self)
+        self.results_filter_timer.setSingleShot(True)
+        self.results_filter_timer.setInterval(300)
+        self.results_filter_timer.timeout.connect(self._apply_results_filter)
+        self.results_filter_input.textChanged.connect(self.results_filter_timer.start)
+        self.results_view.doubleClicked.connect(self._open_result)
+
+        return tab
+
+    def _apply_results_filter(self):
+        self.results_model.set_filter(self.results_filter_input.text())
+        self._update_results_count()
+
+    def _update_results_count(self):
+        model = self.results_model
+        if model.filter_text:
+            self.results_count_label.setText(f"{model.total_rows()} / {len(model.records)} 条")
+        else:
+            self.results_count_label.setText(f"共 {len(model.records)} 条")
+
+    def _open_result(self, index):
+        href = self.results_model.record_at(index.row()).href
+        if href:
+            QDesktopServices.openUrl(QUrl(href))
+
+    def _create_search_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        query_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("在已抓取的公告中搜索，多个词以空格分开")
+        self.search_input.setToolTip("在标题、项目概况、采购人、代理机构和详情字段中查找，不访问网络")
+        self.search_button = QPushButton("🔍 搜索")
+        query_layout.addWidget(self.search_input)
+        query_layout.addWidget(self.search_button)
+        layout.addLayout(query_layout)
+
+        filter_layout = QHBoxLayout()
+        self.search_zone_combo = QComboBox()
+        for name, code in self.REGIONS:
+            self.search_zone_combo.addItem(name, code)
+        self.search_zone_combo.setToolTip("抓取时选择的区域")
+        self.search_bid_type_combo = QComboBox()
+        for name, code in self.BID_TYPES:
+            self.search_bid_type_combo.addItem(name, code)
+        self.search_bid_type_combo.setToolTip("抓取时选择的公告类型")
+        self.search_date_checkbox = QCheckBox("日期:")
+        self.search_start_date = QDateEdit()
+        self.search_start_date.setDate(QDate.currentDate().addMonths(-1))
+        self.search_start_date.setCalendarPopup(True)
+        self.search_end_date = QDateEdit()
+        self.search_end_date.setDate(QDate.currentDate())
+        self.search_end_date.setCalendarPopup(True)
+        self.search_count_label = QLabel("")
+        filter_layout.addWidget(QLabel("区域:"))
+        filter_layout.addWidget(self.search_zone_combo)
+        filter_layout.addWidget(QLabel("公告类型:"))
+        filter_layout.addWidget(self.search_bid_type_combo)
+        filter_layout.addWidget(self.search_date_checkbox)
+        filter_layout.addWidget(self.search_start_date)
+        filter_layout.addWidget(QLabel("至"))
+        filter_layout.addWidget(self.search_end_date)
+        filter_layout.addStretch()
+        filter_layout.addWidget(self.search_count_label)
+        layout.addLayout(filter_layout)
+
+        self.search_model = RecordTableModel(self)
+        self.search_view = QTableView()
+        self.search_view.setModel(self.search_model)
+        self.search_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.search_view.setAlternatingRowColors(True)
+        self.search_view.setWordWrap(False)
+        self.search_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.search_view.verticalHeader().setDefaultSectionSize(22)
+        header = self.search_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        for column, width in enumerate([90, 360, 180, 180, 60, 80]):
+            self.search_view.setColumnWidth(column, width)
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.search_view.setSortingEnabled(True)
+        self.search_view.setToolTip("双击一行在浏览器中打开公告详情")
+        layout.addWidget(self.search_view)
+
+        self.search_button.clicked.connect(self._search_store)
+        self.search_input.returnPressed.connect(self._search_store)
+        self.search_view.doubleClicked.connect(self._open_search_result)
+
+        return tab
+
+    def _search_store(self):
+        """在本地公告库中搜索，结果按日期倒序，最多显示 SEARCH_LIMIT 条"""
+        if self.search_store is None:
+            if not os.path.exists(self.STORE_FILE):
+                self.search_count_label.setText("公告库为空，请先抓取（高级设置中勾选“保存到本地公告库”）")
+                return
+            try:
+                self.search_store = AnnouncementStore(self.STORE_FILE)
+            except Exception as e:
+                self.search_count_label.setText(f"打开公告库失败: {e}")
+                return
+        date_range = {}
+        if self.search_date_checkbox.isChecked():
+            date_range = {"start_date": self.search_start_date.date().toString("yyyy-MM-dd"),
+                          "end_date": self.search_end_date.date().toString("yyyy-MM-dd")}
+        started = time.perf_counter()
+        try:
+            rows = self.search_store.search(self.search_input.text(), zone_id=self.search_zone_combo.currentData(),
+                                            bid_type=self.search_bid_type_combo.currentData(),
+                                            limit=self.SEARCH_LIMIT, **date_range)
+        except Exception as e:
+            self.search_count_label.setText(f"搜索出错: {e}")
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        self.search_model.set_source([Announcement.from_dict(row) for row in rows])
+        more = f"（只显示最近的 {self.SEARCH_LIMIT} 条）" if len(rows) >= self.SEARCH_LIMIT else ""
+        self.search_count_label.setText(f"找到 {len(rows)} 条{more}，用时 {elapsed:.0f} 毫秒")
+
+    def _open_search_result(self, index):
+        href = self.search_model.record_at(index.row()).href
+        if href:
+            QDesktopServices.openUrl(QUrl(href))
+
     def _create_advanced_tab(self):
         tab = QWidget()
         layout = QFormLayout(tab)
@@ -654,12 +839,79 @@ class MainWindow(QMainWindow):
         delay_h_layout.addWidget(QLabel("至"))
         delay_h_layout.addWidget(self.max_delay_input)
         delay_h_layout.addWidget(QLabel("秒"))
+        self.min_delay_input.setToolTip("响应快且正常时，请求间隔逐步缩短到该值")
+        self.max_delay_input.setToolTip("响应变慢或出错时，请求间隔逐步拉长到该值")
         layout.addRow("请求延迟:", delay_h_layout)
 
-        self.auto_save_checkbox = QCheckBox("爬取完成后自动保存结果")
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 16)
+        self.concurrency_input.setValue(1)
+        self.concurrency_input.setToolTip("获取总页数后，第2页起同时抓取的页数；1 表示逐页抓取")
+        layout.addRow("并发页数:", self.concurrency_input)
+
+        self.parse_workers_input = QSpinBox()
+        self.parse_workers_input.setRange(0, os.cpu_count() or 1)
+        self.parse_workers_input.setValue(0)
+        self.parse_workers_input.setToolTip("并发抓取时用于解析页面的子进程数，多核电脑上可加快大量页面的解析；0 表示不使用子进程")
+        layout.addRow("解析进程数:", self.parse_workers_input)
+
+        self.max_retries_input = QSpinBox()
+        self.max_retries_input.setRange(0, 10)
+        self.max_retries_input.setValue(3)
+        self.max_retries_input.setToolTip("单页请求出错时的重试次数，重试间隔逐次加倍；仍失败的页面在最后再统一重试一轮")
+        layout.addRow("失败重试次数:", self.max_retries_input)
+
+        profile_h_layout = QHBoxLayout()
+        self.profile_checkbox = QCheckBox("记录各阶段耗时")
+        self.profile_checkbox.setToolTip(f"按阶段（等待、请求、解析、写入、界面更新）和页码记录耗时并采样调用栈，"
+                                         f"结束时在 {self.PROFILE_DIR} 目录中生成报告和火焰图数据")
+        self.cprofile_checkbox = QCheckBox("同时使用 cProfile")
+        self.cprofile_checkbox.setToolTip("额外记录函数级耗时，会使抓取变慢")
+        profile_h_layout.addWidget(self.profile_checkbox)
+        profile_h_layout.addWidget(self.cprofile_checkbox)
+        layout.addRow("性能分析:", profile_h_layout)
+
+        cache_h_layout = QHBoxLayout()
+        self.use_cache_checkbox = QCheckBox("缓存搜索结果")
+        self.use_cache_checkbox.setToolTip("有效期内重复执行相同的搜索时直接使用缓存，不再等待请求间隔")
+        self.cache_ttl_input = QSpinBox()
+        self.cache_ttl_input.setRange(1, 7 * 24 * 60)
+        self.cache_ttl_input.setValue(60)
+        cache_h_layout.addWidget(self.use_cache_checkbox)
+        cache_h_layout.addWidget(QLabel("有效期:"))
+        cache_h_layout.addWidget(self.cache_ttl_input)
+        cache_h_layout.addWidget(QLabel("分钟"))
+        layout.addRow("响应缓存:", cache_h_layout)
+
+        detail_h_layout = QHBoxLayout()
+        self.fetch_details_checkbox = QCheckBox("抓取详情页")
+        self.fetch_details_checkbox.setToolTip("同时抓取每条公告的详情页，提取项目编号、预算金额、中标供应商、中标金额等字段")
+        self.detail_workers_input = QSpinBox()
+        self.detail_workers_input.setRange(1, 16)
+        self.detail_workers_input.setValue(4)
+        self.detail_workers_input.setToolTip("同时抓取的详情页数")
+        detail_h_layout.addWidget(self.fetch_details_checkbox)
+        detail_h_layout.addWidget(QLabel("并发数:"))
+        detail_h_layout.addWidget(self.detail_workers_input)
+        layout.addRow("详情页:", detail_h_layout)
+
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItem("简要（进度与错误）", "info")
+        self.log_level_combo.addItem("详细（含每条数据和请求参数）", "debug")
+        self.log_level_combo.setToolTip("详细日志会逐条显示抓到的数据，抓取量大时建议使用简要日志")
+        layout.addRow("日志级别:", self.log_level_combo)
+
+        self.auto_save_checkbox = QCheckBox("自动保存结果（边抓取边写入Excel）")
+        self.auto_save_checkbox.setToolTip("抓取过程中逐行写入Excel，手动停止或出错时已抓取的数据同样会保存")
         self.auto_save_checkbox.setChecked(True)
         layout.addRow("", self.auto_save_checkbox)
 
+        self.use_store_checkbox = QCheckBox("保存到本地公告库（可在“公告搜索”中检索）")
+        self.use_store_checkbox.setToolTip(f"抓到的公告同时写入 {self.STORE_FILE} 并建立全文索引，"
+                                           f"之后查找历史公告不必重新抓取")
+        self.use_store_checkbox.setChecked(False)
+        layout.addRow("", self.use_store_checkbox)
+
         # 添加代理设置
         self.use_proxy_checkbox = QCheckBox("使用代理服务器")
         self.use_proxy_checkbox.setChecked(False)
@@ -676,11 +928,34 @@ class MainWindow(QMainWindow):
         proxy_h_layout.addWidget(self.proxy_port_input)
         layout.addRow("", proxy_h_layout)
 
+        self.proxy_pool_input = QPlainTextEdit()
+        self.proxy_pool_input.setPlaceholderText("每行一个，如 http://10.0.0.2:3128；direct 表示直接访问")
+        self.proxy_pool_input.setToolTip("填写多个出口时按各出口的响应速度和出错情况分配请求，出错的出口暂停使用一段时间；"
+                                         "填写后上面的单个代理设置不再用于列表页")
+        self.proxy_pool_input.setMaximumHeight(80)
+        layout.addRow("代理池:", self.proxy_pool_input)
+
         return tab
 
     def _log(self, message):
-        self.log_output.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}")
-        self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
+        # 先显示工作线程积攒的日志，保持先后顺序
+        self._flush_worker_log()
+        self.log_output.appendPlainText(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}")
+
+    def _refresh_from_worker(self):
+        self._flush_worker_log()
+        self.results_model.sync()
+        self._update_results_count()
+
+    def _flush_worker_log(self):
+        """把工作线程缓冲的日志一次性追加到日志框"""
+        if self.worker is None:
+            return
+        lines, dropped = self.worker.log.drain()
+        if dropped:
+            lines.insert(0, f"……日志过多，省略了 {dropped} 条……")
+        if lines:
+            self.log_output.appendPlainText('\n'.join(lines))
 
     def _update_progress_bar(self, current, total):
         progress = int((current / total) * 100) if total > 0 else 0
@@ -758,12 +1033,27 @@ class MainWindow(QMainWindow):
             # Advanced Config
             "min_delay": self.min_delay_input.value(),
             "max_delay": self.max_delay_input.value(),
+            "concurrency": self.concurrency_input.value(),
+            "parse_workers": self.parse_workers_input.value(),
+            "max_retries": self.max_retries_input.value(),
+            "use_cache": self.use_cache_checkbox.isChecked(),
+            "cache_dir": self.CACHE_DIR if self.use_cache_checkbox.isChecked() else "",
+            "cache_ttl": self.cache_ttl_input.value() * 60,
             "auto_save": self.auto_save_checkbox.isChecked(),
+            "store": self.STORE_FILE if self.use_store_checkbox.isChecked() else "",
+            "checkpoint_dir": self.CHECKPOINT_DIR,
+            "log_level": self.log_level_combo.currentData(),
+            "fetch_details": self.fetch_details_checkbox.isChecked(),
+            "detail_workers": self.detail_workers_input.value(),
+            "profile": self.profile_checkbox.isChecked(),
+            "cprofile": self.cprofile_checkbox.isChecked(),
+            "profile_dir": self.PROFILE_DIR,
             
             # Proxy Config
             "use_proxy": self.use_proxy_checkbox.isChecked(),
             "proxy_host": self.proxy_host_input.text(),
             "proxy_port": self.proxy_port_input.value(),
+            "proxies": [line.strip() for line in self.proxy_pool_input.toPlainText().splitlines() if line.strip()],
         }
 
     def save_config(self):
@@ -810,12 +1100,26 @@ class MainWindow(QMainWindow):
             # Advanced Config
             self.min_delay_input.setValue(config.get("min_delay", 2))
             self.max_delay_input.setValue(config.get("max_delay", 6))
+            self.concurrency_input.setValue(config.get("concurrency", 1))
+            self.parse_workers_input.setValue(config.get("parse_workers", 0))
+            self.max_retries_input.setValue(config.get("max_retries", 3))
+            self.use_cache_checkbox.setChecked(config.get("use_cache", False))
+            self.cache_ttl_input.setValue(int(config.get("cache_ttl", 3600)) // 60)
             self.auto_save_checkbox.setChecked(config.get("auto_save", True))
+            self.use_store_checkbox.setChecked(bool(config.get("store", "")))
+            index = self.log_level_combo.findData(config.get("log_level", "info"))
+            if index != -1: self.log_level_combo.setCurrentIndex(index)
+            self.fetch_details_checkbox.setChecked(config.get("fetch_details", False))
+            self.detail_workers_input.setValue(config.get("detail_workers", 4))
+            self.profile_checkbox.setChecked(config.get("profile", False))
+            self.cprofile_checkbox.setChecked(config.get("cprofile", False))
             
             # Proxy Config
             self.use_proxy_checkbox.setChecked(config.get("use_proxy", False))
             self.proxy_host_input.setText(config.get("proxy_host", "127.0.0.1"))
             self.proxy_port_input.setValue(config.get("proxy_port", 7890))
+            self.proxy_pool_input.setPlainText("\n".join(
+                p if isinstance(p, str) else p.get("url", "") for p in config.get("proxies", [])))
 
             self._log("配置已加载。")
         except Exception as e:
@@ -831,9 +1135,28 @@ class MainWindow(QMainWindow):
             self.thread.wait(2000)
         
         self.save_config()
+        self._launch_worker(self._get_current_config())
+
+    def _resume_crawling(self):
+        """按最近一个断点日志中的查询条件继续抓取"""
+        checkpoints = list_checkpoints(self.CHECKPOINT_DIR)
+        if not checkpoints:
+            QMessageBox.information(self, "提示", "没有被中断的抓取任务。")
+            return
+        if self.thread and self.thread.isRunning():
+            return
+        path, header = checkpoints[0]
+        # 查询条件以断点日志为准，请求间隔、代理等其余设置取当前界面
         config = self._get_current_config()
+        config.update(header['config'])
+        self._launch_worker(config, resume=True)
+        query = header['config']
+        self._log(f"继续 {header['created']} 开始的抓取: {query.get('keyword', '')} "
+                  f"{query.get('start_date', '')} 至 {query.get('end_date', '')}")
 
+    def _launch_worker(self, config, resume=False):
         self.start_button.setEnabled(False)
+        self.resume_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         self.save_results_button.setEnabled(False)
         self.log_output.clear()
@@ -843,22 +1166,22 @@ class MainWindow(QMainWindow):
 
         # 创建新的线程和worker
         self.thread = QThread()
-        self.worker = Worker(config)
+        self.worker = Worker(config, resume=resume)
         self.worker.moveToThread(self.thread)
 
-        # 连接信号
+        # 连接信号：worker 结束后退出线程的事件循环，线程真正结束后再做清理
         self.thread.started.connect(self.worker.run)
         self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self._crawler_finished)
-        
-        # 连接日志和进度信号
-        self.worker.progress_update.connect(self._log)
+        self.thread.finished.connect(self._crawler_finished)
+
+        # 进度条走信号，日志由定时器从 worker.log 中批量取走
         self.worker.progress_bar_update.connect(self._update_progress_bar)
-        self.worker.error.connect(self._log)
-        self.worker.data_saved.connect(self._log)
 
         # 启动线程
+        self.results_model.set_source(self.worker.current_crawled_data)
+        self._update_results_count()
         self.thread.start()
+        self.refresh_timer.start()
 
     def _stop_crawling(self):
         """停止爬虫"""
@@ -869,7 +1192,12 @@ class MainWindow(QMainWindow):
 
     def _crawler_finished(self):
         """爬虫完成后的处理"""
+        self.refresh_timer.stop()
+        if self.thread:
+            # finished 信号在线程退出前发出，等线程完全结束后才能释放 QThread 对象
+            self.thread.wait()
         self.start_button.setEnabled(True)
+        self.resume_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.save_results_button.setEnabled(True)
         self.status_bar.showMessage("爬虫任务完成")
@@ -877,7 +1205,8 @@ class MainWindow(QMainWindow):
         # 安全地获取数据
         try:
             if self.worker and hasattr(self.worker, 'current_crawled_data'):
-                self.crawled_data = self.worker.current_crawled_data.copy()  # 创建副本
+                # 工作线程已结束，不再修改该列表，直接接管即可，无需复制
+                self.crawled_data = self.worker.current_crawled_data
             else:
                 self.crawled_data = []
         except Exception as e:
@@ -885,8 +1214,10 @@ class MainWindow(QMainWindow):
             self.crawled_data = []
             
         self._log("爬虫线程已结束。")
-        
-        # 延迟清理线程引用，避免内存访问错误
+        self.results_model.sync()
+        self._update_results_count()
+
+        # 线程已结束，可以安全地释放
         if self.thread:
             self.thread.deleteLater()
             self.thread = None
@@ -902,24 +1233,13 @@ class MainWindow(QMainWindow):
         try:
             output_filename = self.output_prefix_input.text() + datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # 获取保存路径
-            save_path = self.save_path_input.text()
-            if save_path and save_path.strip():
-                full_path = os.path.join(save_path, output_filename + '.xlsx')
-                display_path = full_path
+            full_path = resolve_output_path(self.save_path_input.text(), output_filename)
+            display_path = full_path
+            if any(r.detail is not None for r in self.crawled_data):
+                rows = (record_to_row(i, r) + detail_to_row(r) for i, r in enumerate(self.crawled_data, start=1))
+                write_excel(rows, HEAD + DETAIL_HEAD, full_path)
             else:
-                full_path = output_filename + '.xlsx'
-                display_path = output_filename + '.xlsx'
-            
-            head = ['序号', '关键字', '名称', '日期', '采购人', '代理机构', '公告类型', '详情', '项目概况']
-            workbook = xlsxwriter.Workbook(full_path)
-            worksheet = workbook.add_worksheet("中标公告")
-            for cvi, cv in enumerate(head):
-                worksheet.write(0, cvi, cv)
-            for row_idx, rowdata in enumerate(self.crawled_data, start=1):
-                for col_idx, cell_data in enumerate(rowdata):
-                    worksheet.write(row_idx, col_idx, cell_data)
-            workbook.close()
+                write_excel((record_to_row(i, r) for i, r in enumerate(self.crawled_data, start=1)), HEAD, full_path)
             
             self._log(f"数据已手动保存到 {display_path}")
             QMessageBox.information(self, "成功", f"数据已成功保存到 {display_path}")
@@ -950,6 +1270,10 @@ class MainWindow(QMainWindow):
                 # 清理引用
                 self.worker = None
                 self.thread = None
+
+            if self.search_store is not None:
+                self.search_store.close()
+                self.search_store = None
                 
             # 接受关闭事件
             event.accept()
@@ -961,6 +1285,8 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == '__main__':
+    # 打包后的程序中，解析子进程（高级设置 → 解析进程数）从这里启动
+    multiprocessing.freeze_support()
     app = None
     try:
         # 设置Qt平台插件路径
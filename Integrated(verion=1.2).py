@@ -1,20 +1,22 @@
 # -*- coding=utf-8 -*-
 # 导入所有需要的库
-import math  # 用于数学计算，如此处的向上取整
-import time  # 用于时间相关操作，如程序暂停
-import requests  # 用于发送HTTP网络请求
-from lxml import etree  # 用于解析HTML/XML文档
 from datetime import datetime, timedelta  # 用于处理日期和时间
-import random  # 用于生成随机数，如随机延迟和User-Agent
 import xlsxwriter  # 用于创建和写入Excel (.xlsx) 文件
-import smtplib  # 用于发送电子邮件
-from email.mime.text import MIMEText  # 用于创建纯文本或HTML格式的邮件内容
-from email.mime.multipart import MIMEMultipart  # 用于创建包含多个部分的邮件（如正文和附件）
 import csv  # 用于读写CSV文件，但在此脚本中未被使用
 import json  # 用于处理JSON数据，但在此脚本中未被使用
 import openpyxl  # 用于读取和写入Excel文件，此处用于加载历史数据
 import signal  # 用于处理操作系统信号，如此处的Ctrl+C中断
 import sys  # 用于与Python解释器交互，如此处的退出程序
+import argparse  # 用于解析命令行参数（--daemon 常驻模式）
+from ccgp.engine import CrawlEngine, create_session  # 与GUI共用的抓取引擎（请求、翻页、解析）
+from ccgp.notify import EmailDispatcher, SMTPConnection  # 后台发送提醒邮件（复用连接、合并摘要）
+from ccgp.incremental import IncrementalTracker  # 增量抓取：记录每个查询上次抓取到的位置
+from ccgp.metrics import CrawlMetrics, MetricsServer  # 运行指标，常驻模式下以 Prometheus 格式提供
+from ccgp.ratelimit import AdaptiveRateLimiter  # 自适应请求限速，常驻模式下所有任务共用
+from ccgp.record import Announcement  # 公告记录（紧凑的 __slots__ 对象）
+from ccgp.retry import CircuitBreaker  # 熔断器，常驻模式下所有任务共用
+from ccgp.schedule import Scheduler, load_jobs  # 常驻模式的定时任务
+from ccgp.store import AnnouncementStore, KnownKeys  # SQLite 公告库，用于去重和保存历史数据
 
 # ------------------------- 配置文件 -------------------------
 # 在这里配置邮件发送的相关信息，需要替换成您自己的真实信息
@@ -23,6 +25,18 @@ SMTP_PORT = 465  # SMTP服务器的SSL端口 (例如: 465)
 SENDER_EMAIL = "sender@example.com"  # 发件人的邮箱地址
 SENDER_PASSWORD = "your_password"  # 发件人邮箱的授权码或密码 (注意：不是登录密码)
 RECEIVER_EMAIL = "receiver@example.com"  # 收件人的邮箱地址
+SMTP_USE_SSL = True  # 是否使用SSL连接；本地测试服务器（benchmarks/fakesmtp.py）为明文，需设为 False
+EMAIL_DIGEST_WINDOW = 60  # 收到提醒后等待的秒数，期间的提醒合并为一封摘要邮件
+EMAIL_ATTACH_THRESHOLD = 100  # 新数据超过该条数时正文只列条数，完整数据作为压缩附件发送
+
+# 常驻模式下提供 Prometheus 指标（http://127.0.0.1:端口/metrics）的端口，0 表示不提供
+METRICS_PORT = 9108
+
+# SQLite 公告库文件，用于保存历史数据并去重
+STORE_FILE = "announcements.db"
+
+# 写Excel和邮件中的数据表头
+HEAD = ['序号', '类型', '名称', '日期', '招标人', '代理机构', '区域', '详情', '项目概况']
 
 # 全局变量，用于在程序运行期间临时保存已抓取到的所有数据
 current_data = []
@@ -41,7 +55,7 @@ def signal_handler(signum, frame):
         # 生成一个带时间戳的文件名，以 "interrupted_data_" 开头
         output_filename = "interrupted_data_" + datetime.now().strftime("%Y%m%d_%H%M%S")
         # 调用 writer_excel 函数将数据写入Excel文件
-        writer_excel(current_data, head, '中标公告', output_filename)
+        writer_excel(records_to_rows(current_data), head, '中标公告', output_filename)
         print(f"已保存 {len(current_data)} 条数据到 {output_filename}.xlsx")
     else:
         # 如果没有抓取到任何数据，就打印提示信息
@@ -56,186 +70,51 @@ signal.signal(signal.SIGINT, signal_handler)
 
 
 # ------------------------- 数据爬取模块 -------------------------
-def get_request_headers(referer=None):
-    """
-    生成一个模拟浏览器的HTTP请求头。
-    这有助于伪装我们的爬虫，使其看起来像一个正常的浏览器访问，从而绕过一些基础的反爬虫机制。
-    """
-    # 定义一个包含多个常见浏览器User-Agent的列表
-    user_agents = [
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/101.0.4951.64 Safari/537.36',
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:100.0) Gecko/20100101 Firefox/100.0',
-        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/101.0.4951.64 Safari/537.36'
-    ]
-    # 从列表中随机选择一个User-Agent
-    ua = random.choice(user_agents)
-
-    # 构建完整的请求头字典
-    headers = {
-        "User-Agent": ua,  # 模拟浏览器身份
-        "Host": "search.ccgp.gov.cn",  # 目标服务器域名
-        "Referer": referer if referer else "http://search.ccgp.gov.cn/",  # 指示请求来源页面
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",  # 接受的内容类型
-        "Accept-Encoding": "gzip, deflate",  # 接受的编码格式
-        "Accept-Language": "zh-CN,zh;q=0.9",  # 接受的语言
-        "Connection": "keep-alive",  # 保持连接
-        "Upgrade-Insecure-Requests": "1"
-    }
-    return headers
-
-
-def open_url(url, params, refer=None):
+def get_query_config(buyerName=''):
     """
-    发送HTTP GET请求并获取网页内容。
-    这个函数封装了请求头生成、随机延迟和实际的请求发送过程。
+    本脚本固定使用的查询条件：广西最近3天的"公告"，键名与GUI的配置文件保持一致。
     """
-    # 获取随机生成的请求头
-    headers = get_request_headers(refer)
-
-    # 生成一个2到6秒之间的随机延迟
-    delay_seconds = random.randint(2, 6)
-    print(f"等待 {delay_seconds} 秒以避免频繁请求...")
-
-    try:
-        # 程序暂停指定的秒数，这是友好的爬虫行为，可以减轻目标服务器的压力
-        time.sleep(delay_seconds)
-    except KeyboardInterrupt:
-        # 如果在暂停期间用户按下了Ctrl+C，则捕获异常并重新抛出
-        print("用户中断了延迟等待")
-        raise
+    # 定义时间范围
+    curr_date = datetime.now()
+    start_date = curr_date - timedelta(days=3)  # 设置抓取时间范围为最近3天
 
-    # 使用requests库发送GET请求，并传递URL、请求头和查询参数
-    response = requests.get(url, headers=headers, params=params, allow_redirects=True)
-    # 检查HTTP响应状态码，如果不是200（成功），则打印错误信息
-    if response.status_code != 200:
-        print(f"请求失败: {response.status_code}")
-    return response
+    return {
+        'keyword': '公告',  # 搜索关键词
+        'buyer_name': buyerName,  # 采购人名称
+        'bid_type': '0',  # 公告类别
+        'start_date': start_date.strftime("%Y:%m:%d"),  # 开始时间
+        'end_date': curr_date.strftime("%Y:%m:%d"),  # 结束时间
+        'time_type': 1,  # 时间类型设置为“近三天”
+        'zone_id': '45',  # 区域ID，这里硬编码为广西的ID
+        'min_delay': 2,  # 请求间隔下限（秒），响应良好时逐步缩短到该值
+        'max_delay': 6,  # 请求间隔上限（秒），响应变慢或出错时逐步拉长到该值
+    }
 
 
-def crawler_ccgp(sheetdata=[], year='', buyerName=''):
+def crawler_ccgp(sheetdata=[], year='', buyerName='', tracker=None, config=None, shared=None):
     """
     核心爬虫函数，负责抓取中国政府采购网的招标公告数据。
+    请求与解析由 ccgp.engine.CrawlEngine 完成，这里把抓到的 Announcement 记录收集到 sheetdata 中，
+    写Excel和发邮件时再用 record_to_script_row() 转换为本脚本的数据行。
+    传入 tracker（IncrementalTracker）时为增量抓取：翻到上次抓取的位置即停止。
+    config 为查询条件，默认使用 get_query_config()；shared 为常驻模式下各任务共用的
+    session / limiter / breaker / metrics，避免每次抓取重新建立连接。
     """
     global current_data  # 声明我们将要修改全局变量 current_data
     current_data = sheetdata  # 将当前数据列表与全局变量同步
 
-    # 定义目标网站的URL和时间范围
-    url = 'http://search.ccgp.gov.cn/bxsearch?'
-    curr_date = datetime.now()
-    start_date = curr_date - timedelta(days=3)  # 设置抓取时间范围为最近3天
-    start_time = start_date.strftime("%Y:%m:%d")
-    end_time = curr_date.strftime("%Y:%m:%d")
-
-    # 定义HTTP请求的查询参数，这些参数决定了我们要搜索什么内容
-    params = {
-        'searchtype': 1,
-        'page_index': 1,  # 初始页码为1
-        'bidSort': 0,  # 公告类型
-        'buyerName': buyerName,  # 采购人名称
-        'projectId': '',  # 项目编号
-        'pinMu': 0,  # 品目
-        'bidType': 0,  # 公告类别
-        'dbselect': 'bidx',
-        'kw': '公告',  # 搜索关键词
-        'start_time': start_time,  # 开始时间
-        'end_time': end_time,  # 结束时间
-        'timeType': 1,  # 时间类型设置为“近三天”
-        'displayZone': '',  # 显示区域
-        'zoneId': '45',  # 区域ID，这里硬编码为广西的ID
-        'pppStatus': 0,  # PPP项目状态
-        'agentName': ''  # 代理机构名称
-    }
+    if config is None:
+        config = get_query_config(buyerName)
+    engine = CrawlEngine(config, log=print, page_filter=tracker, **(shared or {}))
 
     try:
-        print("开始获取数据...")
-        # 发送第一次请求以获取总数据量和第一页内容
-        resp = open_url(url, params)
-        resp.raise_for_status()  # 如果请求失败（非200状态码），则抛出异常
-        html = resp.content.decode('utf-8')  # 将响应内容解码为UTF-8字符串
-        tree = etree.HTML(html)  # 使用lxml的etree解析HTML
-
-        try:
-            # 使用XPath定位并提取公告总数
-            total_text = tree.xpath('/html/body/div[5]/div[1]/div/p[1]/span[2]/text()')
-            if not total_text:
-                # 如果找不到总数，可能是页面结构变化或没有结果
-                print("警告：无法在页面上找到数据总数。可能是没有结果或页面结构已更改。")
-                total = 0
-            else:
-                total = int(total_text[0].strip())
-        except (IndexError, ValueError):
-            # 如果XPath找不到元素或文本无法转换为整数，则打印错误并返回
-            print("未找到数据总数，可能没有匹配的结果。")
-            return sheetdata
-
-        print(f"找到 {total} 条数据")
-
-        if total > 0:
-            # 计算总页数（每页20条数据）
-            pagesize = math.ceil(total / 20)
-            print(f"总共 {pagesize} 页数据需要抓取")
-
-            # 循环遍历每一页
-            for curr_page in range(1, pagesize + 1):
-                print(f"正在抓取第 {curr_page}/{pagesize} 页数据...")
-
-                # 使用XPath定位当前页面的所有公告列表项
-                list_items = tree.xpath('/html/body/div[5]/div[2]/div/div/div[1]/ul/li')
-                # 遍历每个列表项以提取信息
-                for i, li in enumerate(list_items):
-                    try:
-                        # 提取标题、摘要和信息所在的HTML元素
-                        title_element = li.find('a')
-                        summary_element = li.find('p')
-                        span_element = li.find('span')
-
-                        if title_element is None or summary_element is None or span_element is None:
-                            print(f"  - 跳过一条不完整的记录。")
-                            continue
-
-                        title = title_element.text.strip()
-                        link_href = title_element.get('href')
-                        summary = summary_element.text.strip() if summary_element.text else ''
-
-                        # 提取并清理包含日期、采购人等信息的文本
-                        info = span_element.xpath('string()').replace(' ', '').replace('\r', '').replace('\n',
-                                                                                                         '').replace(
-                            '\t', '')
-
-                        # 解析info文本以提取各个字段
-                        date_part = info[:10]
-                        parts = info[10:].split('|')
-                        buyer_part = parts[0].replace('采购人：', '') if len(parts) > 0 else ''
-                        agent_part = parts[1].replace('代理机构：', '') if len(parts) > 1 else ''
-                        region_part = parts[2] if len(parts) > 2 else ''
-
-                        # 将提取的数据组织成一个列表（一行）
-                        row = [
-                            len(sheetdata) + 1, '公告', title, date_part,
-                            buyer_part, agent_part, region_part, link_href, summary
-                        ]
-                        # 将该行数据添加到结果列表中
-                        sheetdata.append(row)
-                        current_data = sheetdata  # 实时更新全局数据
-                        print(f"  已获取第 {i + 1} 条数据: {title[:30]}...")
-
-                    except (ValueError, IndexError) as e:
-                        # 如果在解析过程中出现错误（如字符串分割失败），则打印错误并跳过此条记录
-                        print(f"解析数据时出错，跳过此条记录: {e}")
-                        continue
-                    except KeyboardInterrupt:
-                        # 如果用户中断，则打印提示并重新抛出异常，由外层try-except处理
-                        print("用户中断了数据抓取")
-                        raise
-
-                # 如果当前不是最后一页，则准备请求下一页
-                if curr_page < pagesize:
-                    params['page_index'] = curr_page + 1  # 更新页码参数
-                    print(f"准备抓取下一页数据...")
-                    # 发送请求获取下一页内容
-                    resp = open_url(url, params, resp.url)
-                    html = resp.content.decode('utf-8')
-                    tree = etree.HTML(html)
+        for record in engine.iter_records():
+            # 将记录添加到结果列表中
+            sheetdata.append(record)
+            current_data = sheetdata  # 实时更新全局数据
+            print(f"  已获取第 {len(sheetdata)} 条数据: {record.title[:30]}...")
+        if tracker is not None and engine.completed:
+            tracker.mark_completed()
 
     except KeyboardInterrupt:
         # 捕获用户中断异常
@@ -245,6 +124,8 @@ def crawler_ccgp(sheetdata=[], year='', buyerName=''):
         # 捕获其他所有异常，如网络错误
         print(f"抓取数据时发生错误: {e}")
         return sheetdata
+    finally:
+        engine.close()
 
     return sheetdata
 
@@ -253,7 +134,7 @@ def crawler_ccgp(sheetdata=[], year='', buyerName=''):
 def load_existing_data(file_path):
     """
     使用 openpyxl 库从一个已存在的 Excel 文件中加载数据。
-    这用于获取历史数据，以便进行去重。
+    现在只在首次使用公告库时用于导入旧的历史数据。
     """
     try:
         # 尝试加载Excel工作簿
@@ -282,169 +163,122 @@ def load_existing_data(file_path):
         return None, None
 
 
-def get_existing_titles(data):
-    """
-    从加载的历史数据中提取所有公告的标题，并存入一个集合中。
-    使用集合（set）可以快速进行成员资格检查（去重）。
-    """
-    if data is not None:
-        # 使用集合推导式高效地提取所有'名称'字段的值
-        return {item.get('名称', '') for item in data if item.get('名称')}
-    return set()
+def record_to_script_row(seq, record):
+    """把记录转换为本脚本的数据行: 序号、类型、名称、日期、招标人、代理机构、区域、详情、项目概况"""
+    return [seq, '公告', record.title, record.date, record.buyer, record.agent,
+            record.region, record.href, record.summary]
 
 
-def filter_duplicates(new_data, existing_titles):
-    """
-    根据已有的标题集合，过滤掉新抓取数据中的重复项。
-    """
-    # 列表推导式：只保留那些标题（在row[2]）不在 existing_titles 集合中的数据行
-    filtered_data = [row for row in new_data if row[2] not in existing_titles]
-    return filtered_data
+def records_to_rows(records):
+    return [record_to_script_row(i, record) for i, record in enumerate(records, start=1)]
 
 
-# ------------------------- 邮件通知模块 -------------------------
-def send_email(subject, body):
-    """
-    发送电子邮件。
+def migrate_existing_data(store, file_path):
     """
-    # 创建一个MIMEMultipart对象，这是构建复杂邮件的基础
-    msg = MIMEMultipart()
-    msg["From"] = SENDER_EMAIL  # 设置发件人
-    msg["To"] = RECEIVER_EMAIL  # 设置收件人
-    msg["Subject"] = subject  # 设置邮件主题
-    # 将HTML格式的正文附加到邮件中
-    msg.attach(MIMEText(body, "html"))
-
-    try:
-        # 使用SMTP_SSL协议连接到邮件服务器，这提供了加密传输
-        with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT) as server:
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)  # 登录邮箱
-            server.sendmail(SENDER_EMAIL, RECEIVER_EMAIL, msg.as_string())  # 发送邮件
-            print("邮件发送成功!")
-    except Exception as e:
-        # 捕获所有可能的异常，如认证失败、连接超时等
-        print(f"邮件发送失败: {e}")
-
-
-def generate_email_body(new_data):
+    首次使用公告库时，把旧版本使用的历史Excel文件导入公告库，之后不再读取该文件。
     """
-    根据新数据生成一个精美的HTML格式的邮件正文。
+    if store.count() > 0:
+        return
+    data, headers = load_existing_data(file_path)
+    if not data:
+        return
+    records = [Announcement(
+        title=item.get('名称') or '', date=str(item.get('日期') or ''),
+        buyer=item.get('招标人') or '', agent=item.get('代理机构') or '',
+        region=item.get('区域') or '', href=item.get('详情') or '',
+        summary=item.get('项目概况') or '', keyword=item.get('类型') or '',
+    ) for item in data if item.get('名称')]
+    store.upsert_many(records)
+    print(f"已将 {len(records)} 条历史数据从 '{file_path}' 导入公告库。")
+
+
+def filter_duplicates(new_data, store):
     """
-    if not new_data:
-        return None
-
-    # 定义HTML表格的列名
-    columns = ['序号', '类型', '名称', '日期', '招标人', '代理机构', '区域', '详情', '项目概况']
-
-    # 手动构建HTML表格字符串
-    html_rows = []
-
-    # 创建表头行
-    header_row = '<tr>' + ''.join([f'<th>{col}</th>' for col in columns]) + '</tr>'
-    html_rows.append(header_row)
-
-    # 为每一行数据创建一个HTML表格行
-    for row in new_data:
-        # 特别处理详情链接，使其成为可点击的超链接
-        row_with_link = list(row)
-        row_with_link[7] = f'<a href="{row[7]}" target="_blank">点击查看</a>'
-        data_row = '<tr>' + ''.join([f'<td>{cell}</td>' for cell in row_with_link]) + '</tr>'
-        html_rows.append(data_row)
-
-    # 将所有行合并成一个完整的HTML表格
-    html_table = '<table class="data-table">' + ''.join(html_rows) + '</table>'
-
-    # 定义表格的CSS样式，使其更美观
-    style = """
-    <style>
-        .data-table { width: 100%; border-collapse: collapse; font-family: Arial, sans-serif; font-size: 14px; color: #333; }
-        .data-table th, .data-table td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
-        .data-table th { background-color: #f8f9fa; font-weight: bold; color: #333; }
-        .data-table tr:hover { background-color: #f1f1f1; }
-        .data-table a { color: #007bff; text-decoration: none; }
-        .data-table a:hover { text-decoration: underline; }
-    </style>
+    过滤掉公告库中已经存在的记录（按详情链接判断），同一批内部的重复项也只保留一条。
     """
+    return store.filter_new(new_data)
+
 
-    # 构建完整的HTML邮件正文
-    body = f"""
-    <html>
-        <head>{style}</head>
-        <body>
-            <h3>发现 {len(new_data)} 条新招标公告：</h3>
-            {html_table}
-            <p>请及时查看邮件内容或访问网站获取详细信息。</p>
-        </body>
-    </html>
+# ------------------------- 邮件通知模块 -------------------------
+def create_email_dispatcher():
+    """
+    创建后台邮件发送器：提醒放入队列后立即返回，由后台线程复用同一个已登录的 SMTP 连接发送，
+    EMAIL_DIGEST_WINDOW 秒内的多条提醒合并为一封邮件，条数较多时改为压缩附件。
     """
-    return body
+    connection = SMTPConnection(SMTP_SERVER, SMTP_PORT, SENDER_EMAIL, SENDER_PASSWORD, use_ssl=SMTP_USE_SSL)
+    return EmailDispatcher(connection, SENDER_EMAIL, RECEIVER_EMAIL, HEAD, link_column=7,
+                           digest_window=EMAIL_DIGEST_WINDOW, attach_threshold=EMAIL_ATTACH_THRESHOLD, log=print)
 
 
 def writer_excel(data, head=['A1', 'A2', 'A3', 'A4', 'A5', 'A6', 'A7', 'A8'], sheetname='sheet1', filename='DataFile'):
     """
     使用 XlsxWriter 库将数据写入一个新的Excel文件。
     """
-    # 创建一个新的Excel工作簿
-    workbook = xlsxwriter.Workbook(filename + '.xlsx')
+    # 以常量内存模式创建工作簿，逐行写入，数据量大时内存占用也不会增长
+    workbook = xlsxwriter.Workbook(filename + '.xlsx', {'constant_memory': True})
     # 添加一个工作表
     worksheet = workbook.add_worksheet(sheetname)
 
-    row = 0
-    col = 0
-
     # 写入表头
-    for cvi, cv in enumerate(head):
-        worksheet.write(row, col + cvi, cv)
-    row += 1
+    worksheet.write_row(0, 0, head)
 
-    # 遍历数据并逐行逐单元格写入
-    for rowdata in data:
-        for cvindex, cv in enumerate(rowdata):
-            worksheet.write(row, col + cvindex, cv)
-        row += 1
+    # 逐行写入数据
+    for row, rowdata in enumerate(data, start=1):
+        worksheet.write_row(row, 0, rowdata)
 
     # 保存并关闭工作簿
     workbook.close()
 
 
+def report_new_data(filtered_data, dispatcher, title=''):
+    """
+    有新数据时交给后台发送器发送邮件提醒（不等待发送完成），并保存到Excel文件；
+    title 为任务名，显示在邮件主题和正文中。
+    """
+    if not filtered_data:
+        # 如果没有新数据
+        print("未发现新数据，无需发送邮件。")
+        return
+    print(f"发现 {len(filtered_data)} 条新数据，准备发送邮件并保存到Excel文件。")
+    filtered_rows = records_to_rows(filtered_data)
+    # 放入邮件队列，由后台线程发送
+    dispatcher.notify(title, filtered_rows)
+
+    # 生成带时间戳的文件名
+    output_filename = "filtered_data_" + datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 将新数据写入Excel文件
+    writer_excel(filtered_rows, HEAD, '中标公告', output_filename)
+    print(f"新数据已保存到 {output_filename}.xlsx")
+
+
 # ------------------------- 主程序 -------------------------
 def main():
     """
     程序的主入口函数，协调所有模块的执行流程。
     """
+    dispatcher = create_email_dispatcher()
     try:
         print("开始执行数据爬取任务...")
         print("提示: 按 Ctrl+C 可以中断程序并保存已抓取的数据")
 
-        # 1. 调用爬虫函数抓取数据
-        sheetdata = crawler_ccgp([], str(datetime.now().year), '')
+        # 1. 打开公告库用于去重，首次运行时导入旧的 existing_data.xlsx
+        store = AnnouncementStore(STORE_FILE)
+        migrate_existing_data(store, "existing_data.xlsx")
 
-        # 2. 加载历史数据用于去重
-        # 注意：这里硬编码了文件名，程序需要一个名为 "existing_data.xlsx" 的文件来读取历史记录
-        existing_data, headers = load_existing_data("existing_data.xlsx")
-        existing_titles = get_existing_titles(existing_data)
+        # 2. 调用爬虫函数增量抓取数据，翻到上次抓取的位置即停止
+        tracker = IncrementalTracker(store, get_query_config(''))
+        sheetdata = crawler_ccgp([], str(datetime.now().year), '', tracker)
 
         # 3. 过滤掉重复的数据
-        filtered_data = filter_duplicates(sheetdata, existing_titles)
+        filtered_data = filter_duplicates(sheetdata, store)
 
-        # 4. 根据是否有新数据，决定后续操作
-        head = ['序号', '类型', '名称', '日期', '招标人', '代理机构', '区域', '详情', '项目概况']
-        if filtered_data:
-            # 如果有新数据
-            print(f"发现 {len(filtered_data)} 条新数据，准备发送邮件并保存到Excel文件。")
-            # 生成邮件正文
-            email_body = generate_email_body(filtered_data)
-            # 发送邮件
-            send_email("[招标公告更新提醒] 发现新数据", email_body)
-
-            # 生成带时间戳的文件名
-            output_filename = "filtered_data_" + datetime.now().strftime("%Y%m%d_%H%M%S")
-            # 将新数据写入Excel文件
-            writer_excel(filtered_data, head, '中标公告', output_filename)
-            print(f"新数据已保存到 {output_filename}.xlsx")
-        else:
-            # 如果没有新数据
-            print("未发现新数据，无需发送邮件。")
+        # 4. 有新数据时发送邮件并保存到Excel文件
+        report_new_data(filtered_data, dispatcher)
+
+        # 5. 把本次抓取的数据写入公告库，下次运行时作为历史数据
+        store.upsert_many(sheetdata)
+        tracker.commit()
+        store.close()
 
         print(f"本次共抓取原始数据条数: {len(sheetdata)}")
         print(f"过滤后新增数据条数: {len(filtered_data)}")
@@ -456,8 +290,83 @@ def main():
     except Exception as e:
         # 捕获所有其他未预料到的异常
         print(f"程序执行过程中发生未知错误: {e}")
+    finally:
+        # 等待后台线程发出队列中的提醒邮件
+        dispatcher.close()
+
+
+def run_daemon(jobs_file):
+    """
+    常驻模式：按任务文件（格式见 ccgp/schedule.py）中的时间表反复执行各个查询，直到按 Ctrl+C 或收到 SIGTERM。
+
+    与每次由 cron 启动脚本相比，进程只启动一次：所有任务共用一个网络会话（连接保持复用）、
+    限速器、熔断器和邮件发送器，公告库中最近的公告主键和各查询的高水位常驻内存，去重时不必每次查询数据库。
+    每次执行的流程与 main() 相同：增量抓取 -> 过滤已有数据 -> 邮件提醒 -> 写入公告库。
+    """
+    # 常驻运行时通常由 systemd / supervisor 等通过 SIGTERM 停止，与 Ctrl+C 同样处理
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    jobs = load_jobs(jobs_file, get_query_config(''))
+    if not jobs:
+        print(f"任务文件 '{jobs_file}' 中没有任务。")
+        return
+
+    store = AnnouncementStore(STORE_FILE)
+    migrate_existing_data(store, "existing_data.xlsx")
+    known = KnownKeys(store)
+    print(f"已载入 {len(known)} 条最近公告用于去重。")
+
+    first = jobs[0].config
+    metrics = CrawlMetrics()
+    shared = {
+        'session': create_session(first),
+        'limiter': AdaptiveRateLimiter.from_config(first),
+        'breaker': CircuitBreaker.from_config(first),
+        'metrics': metrics,
+    }
+
+    # 所有任务共用一个邮件发送器，时间接近的提醒合并为一封邮件
+    dispatcher = create_email_dispatcher()
+
+    metrics.set_gauge('email_queue_depth', dispatcher.queue.qsize, '等待发送的邮件提醒数')
+    metrics.set_gauge('known_keys', lambda: len(known), '内存中用于去重的公告主键数')
+    server = None
+    if METRICS_PORT:
+        server = MetricsServer(metrics, METRICS_PORT).start()
+        print(f"运行指标: {server.url}")
+
+    def run_job(job, config):
+        global current_data
+        print(f"\n[{job.name}] 开始执行（{datetime.now():%Y-%m-%d %H:%M:%S}）")
+        tracker = IncrementalTracker(known, config)
+        sheetdata = crawler_ccgp([], str(datetime.now().year), '', tracker, config=config, shared=shared)
+        filtered_data = filter_duplicates(sheetdata, known)
+        report_new_data(filtered_data, dispatcher, job.name)
+        known.upsert_many(sheetdata)
+        tracker.commit()
+        # 本次数据已处理完毕，之后中断时不必再另存
+        current_data = []
+        metrics.inc('job_runs_total', help='定时任务执行次数', job=job.name)
+        metrics.inc('job_new_rows_total', len(filtered_data), help='定时任务发现的新公告条数', job=job.name)
+        print(f"[{job.name}] 抓取 {len(sheetdata)} 条，新增 {len(filtered_data)} 条")
+
+    print(f"常驻模式启动，共 {len(jobs)} 个任务，按 Ctrl+C 退出。")
+    try:
+        Scheduler(jobs, run_job, log=print).run()
+    finally:
+        if server is not None:
+            server.stop()
+        shared['session'].close()
+        store.close()
+        dispatcher.close()
 
 
 # 当该脚本作为主程序直接运行时，执行main()函数
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='抓取广西最近3天的招标公告，发现新公告时发送邮件提醒')
+    parser.add_argument('--daemon', metavar='JOBS', help='常驻模式：按 JSON 任务文件中的时间表反复抓取，不再退出')
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.daemon)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""离线基准测试：本地模拟搜索服务器与抓取/解析/导出性能测量"""
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+离线基准测试。
+
+在本机启动模拟搜索服务器（见 fakesite.py），不访问网络，测量：
+
+- crawl：抓取引擎在不同并发数下的 页/秒、条/秒 和内存峰值；
+- parse：列表页解析的单条耗时；
+- export：Excel / CSV / JSON Lines 导出的耗时和内存峰值。
+
+结果以 JSON 输出，可保存后用 --compare 与其他版本的结果对比：
+
+    python -m benchmarks.bench -o before.json
+    python -m benchmarks.bench -o after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from ccgp.engine import HEAD, CrawlEngine, build_params, record_to_row  # noqa: E402
+from ccgp.export import RecordWriter, write_csv, write_excel  # noqa: E402
+from ccgp.listpage import parse_document  # noqa: E402
+from benchmarks.fakesite import FakeSearchServer  # noqa: E402
+
+BASE_CONFIG = {
+    'keyword': '公告',
+    'zone_id': '45',
+    'bid_type': '0',
+    'time_type': 6,
+    'start_date': '2025:07:01',
+    'end_date': '2025:07:09',
+    'min_delay': 0,
+    'max_delay': 0,
+}
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def measure(func):
+    """执行 func，返回 (结果, 耗时秒, 内存峰值MB)。内存峰值由 tracemalloc 统计，仅含 Python 分配"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def crawl_once(config):
+    engine = CrawlEngine(config)
+    try:
+        records = list(engine.iter_records())
+    finally:
+        engine.close()
+    return engine, records
+
+
+def bench_crawl(server, concurrency, repeat, parse_workers=0):
+    """抓取全部页面：耗时取多次中最快的一次，内存峰值单独运行一次测量（tracemalloc 会拖慢运行）"""
+    config = dict(BASE_CONFIG, search_url=server.search_url, concurrency=concurrency, parse_workers=parse_workers)
+    best = None
+    errors = 0
+    engine = None
+    records = []
+    for _ in range(repeat):
+        try:
+            (engine, records), elapsed = timed(lambda: crawl_once(config))
+        except Exception as e:
+            errors += 1
+            log(f"  抓取失败: {e}")
+            continue
+        best = elapsed if best is None else min(best, elapsed)
+    if best is None:
+        return {'concurrency': concurrency, 'errors': errors}
+
+    try:
+        _, _, peak_mb = measure(lambda: crawl_once(config))
+    except Exception:
+        peak_mb = None
+    return {
+        'concurrency': concurrency,
+        'pages': engine.page_count,
+        'rows': len(records),
+        'seconds': round(best, 4),
+        'pages_per_sec': round(engine.page_count / best, 2),
+        'rows_per_sec': round(len(records) / best, 1),
+        'peak_memory_mb': round(peak_mb, 2) if peak_mb is not None else None,
+        'errors': errors,
+    }
+
+
+def bench_parse(server, iterations):
+    """反复解析同一页（含 HTML 解析），返回单条记录的平均解析耗时；更细的分阶段耗时见 bench_parser.py"""
+    import requests
+
+    config = dict(BASE_CONFIG, search_url=server.search_url)
+    body = requests.get(server.search_url, params=build_params(config, 1), timeout=30).content
+    engine = CrawlEngine(config)
+    try:
+        rows = len(engine.parse_page(parse_document(body), 1))
+        started = time.perf_counter()
+        for _ in range(iterations):
+            engine.parse_page(parse_document(body), 1)
+        elapsed = time.perf_counter() - started
+    finally:
+        engine.close()
+    return {
+        'iterations': iterations,
+        'rows_per_page': rows,
+        'page_bytes': len(body),
+        'usec_per_page': round(elapsed / iterations * 1e6, 1),
+        'usec_per_row': round(elapsed / (iterations * rows) * 1e6, 2) if rows else None,
+    }
+
+
+def sample_records(server, count):
+    """从模拟服务器抓取记录并循环复用，凑够 count 条用于导出测试"""
+    config = dict(BASE_CONFIG, search_url=server.search_url, concurrency=4)
+    _, records = crawl_once(config)
+    result = []
+    while len(result) < count:
+        for record in records:
+            if len(result) >= count:
+                break
+            result.append(record.replace(href=f"{record.href}#{len(result)}"))
+    return result
+
+
+def bench_export(records, directory):
+    results = {}
+
+    def excel():
+        data = [record_to_row(i, r) for i, r in enumerate(records, start=1)]
+        write_excel(data, HEAD, os.path.join(directory, 'bench.xlsx'))
+
+    def csv():
+        data = [record_to_row(i, r) for i, r in enumerate(records, start=1)]
+        write_csv(data, HEAD, os.path.join(directory, 'bench.csv'))
+
+    def jsonl():
+        writer = RecordWriter('jsonl', os.path.join(directory, 'bench.jsonl'))
+        try:
+            for record in records:
+                writer.write(record)
+        finally:
+            writer.close()
+
+    for name, func, ext in (('xlsx', excel, '.xlsx'), ('csv', csv, '.csv'), ('jsonl', jsonl, '.jsonl')):
+        _, elapsed = timed(func)
+        _, _, peak_mb = measure(func)
+        results[name] = {
+            'rows': len(records),
+            'seconds': round(elapsed, 4),
+            'rows_per_sec': round(len(records) / elapsed, 1) if elapsed else None,
+            'peak_memory_mb': round(peak_mb, 2),
+            'file_mb': round(os.path.getsize(os.path.join(directory, 'bench' + ext)) / 1024 / 1024, 2),
+        }
+    return results
+
+
+def run(args):
+    results = {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'total': args.total,
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'parse_workers': args.parse_workers,
+        },
+    }
+    with FakeSearchServer(total=args.total, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate) as server:
+        if 'crawl' in args.only:
+            results['crawl'] = []
+            for concurrency in args.concurrency:
+                log(f"crawl: 并发数 {concurrency} ...")
+                results['crawl'].append(bench_crawl(server, concurrency, args.repeat, args.parse_workers))
+            results['meta']['server_requests'] = server.requests
+            results['meta']['server_errors'] = server.errors
+
+        # 解析和导出测试不应受模拟出错影响
+        server.error_rate = 0
+        server.latency = server.jitter = 0
+        if 'parse' in args.only:
+            log("parse ...")
+            results['parse'] = bench_parse(server, args.parse_iterations)
+        if 'export' in args.only:
+            log(f"export: {args.export_rows} 条 ...")
+            records = sample_records(server, args.export_rows)
+            with tempfile.TemporaryDirectory() as directory:
+                results['export'] = bench_export(records, directory)
+    return results
+
+
+def flatten(results, prefix=''):
+    """把结果展开为 {指标路径: 数值}，crawl 列表按并发数区分"""
+    flat = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            if key == 'meta':
+                continue
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(results, list):
+        for item in results:
+            flat.update(flatten(item, f"{prefix}c{item.get('concurrency', '?')}."))
+    elif isinstance(results, (int, float)) and not isinstance(results, bool):
+        flat[prefix.rstrip('.')] = results
+    return flat
+
+
+def compare(baseline, current):
+    """打印与基准结果相比各指标的变化"""
+    old = flatten(baseline)
+    new = flatten(current)
+    log(f"对比基准 {baseline.get('meta', {}).get('revision')} -> {current.get('meta', {}).get('revision')}")
+    for key in sorted(new):
+        if key not in old or not old[key]:
+            continue
+        change = (new[key] - old[key]) / old[key] * 100
+        log(f"  {key:40s} {old[key]:>12} -> {new[key]:>12}  ({change:+.1f}%)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench', description='离线基准测试')
+    parser.add_argument('--total', type=int, default=2000, help='模拟的搜索结果总条数（每页20条）')
+    parser.add_argument('--latency', type=float, default=0.02, help='模拟服务器每次响应的延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='响应延迟的随机抖动（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='模拟服务器返回500的比例')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4], help='要测试的并发数')
+    parser.add_argument('--parse-workers', dest='parse_workers', type=int, default=0,
+                        help='抓取测试中解析列表页的子进程数（默认 0，即在抓取线程中解析）')
+    parser.add_argument('--repeat', type=int, default=3, help='每种并发数的重复次数，取最快的一次')
+    parser.add_argument('--parse-iterations', type=int, default=200, help='解析测试的重复次数')
+    parser.add_argument('--export-rows', type=int, default=20000, help='导出测试的记录条数')
+    parser.add_argument('--only', nargs='+', choices=['crawl', 'parse', 'export'],
+                        default=['crawl', 'parse', 'export'], help='只运行指定的测试')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件，默认输出到标准输出')
+    parser.add_argument('--compare', help='与之前保存的结果 JSON 对比')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run(args)
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        log(f"结果已保存: {args.output}")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+列表页解析的微基准：对比原来的解析方式与 ccgp.listpage 的单条记录耗时。
+
+原来的方式（legacy）：响应先解码为字符串再交给 etree.HTML，
+每页临时编译绝对路径 XPath，每条记录用 find() 查找子元素、
+xpath('string()') 取文本、replace() 链去空白，再逐段 find() 拆分信息串。
+
+    python -m benchmarks.bench_parser
+    python -m benchmarks.bench_parser --pages 50 --repeat 5 -o parser.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from lxml import etree
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from ccgp import listpage  # noqa: E402
+from benchmarks.fakesite import PAGE_SIZE, render_page  # noqa: E402
+
+
+def legacy_parse_list_item(li):
+    title_element = li.find('a')
+    summary_element = li.find('p')
+    span_element = li.find('span')
+    if title_element is None or summary_element is None or span_element is None:
+        return None
+    title = title_element.text.strip() if title_element.text else ''
+    if not title:
+        return None
+    span_text = span_element.xpath('string()')
+    if not span_text:
+        return None
+    info = span_text.replace(' ', '').replace('\r', '').replace('\n', '').replace('\t', '')
+    if len(info) < 10:
+        return None
+    date_part, buyer_part, agent_part, region_part = listpage.parse_info_slow(info)
+    return {
+        'title': title,
+        'date': date_part,
+        'buyer': buyer_part,
+        'agent': agent_part,
+        'region': region_part,
+        'href': title_element.get('href', ''),
+        'summary': summary_element.text.strip() if summary_element.text else '',
+    }
+
+
+def legacy_parse(body):
+    tree = etree.HTML(body.decode('utf-8'))
+    total = int(tree.xpath(listpage.TOTAL_XPATH)[0].strip())
+    return total, [legacy_parse_list_item(li) for li in tree.xpath(listpage.LIST_XPATH)]
+
+
+def fast_parse(body):
+    tree = listpage.parse_document(body)
+    total = listpage.parse_total(tree)
+    return total, [listpage.parse_list_item(li) for li in listpage.list_items(tree)]
+
+
+def best_of(func, bodies, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for body in bodies:
+            func(body)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_stages(bodies, repeat):
+    """分阶段计时：文档解析、列表项定位、逐条提取"""
+    trees = [listpage.parse_document(body) for body in bodies]
+    items = [li for tree in trees for li in listpage.list_items(tree)]
+    infos = [''.join(li.find('span').itertext()).replace(' ', '').replace('\r', '').replace('\n', '').replace('\t', '')
+             for li in items]
+    stages = {
+        'document': best_of(listpage.parse_document, bodies, repeat),
+        'list_items': best_of(listpage.list_items, trees, repeat),
+        'list_item': best_of(listpage.parse_list_item, items, repeat),
+        'info_regex': best_of(listpage.parse_info, infos, repeat),
+        'info_slow': best_of(listpage.parse_info_slow, infos, repeat),
+    }
+    rows = len(items)
+    return {name: round(seconds / rows * 1e6, 2) for name, seconds in stages.items()}
+
+
+def run(args):
+    bodies = [render_page(f"p{i:07d}", PAGE_SIZE * args.pages, i + 1).encode('utf-8') for i in range(args.pages)]
+    rows = sum(len(fast_parse(body)[1]) for body in bodies)
+
+    # 两种方式的解析结果必须一致
+    for body in bodies:
+        legacy_total, legacy_items = legacy_parse(body)
+        fast_total, fast_items = fast_parse(body)
+        fast_items = [{name: getattr(r, name) for name in old} for old, r in zip(legacy_items, fast_items)]
+        if (legacy_total, legacy_items) != (fast_total, fast_items):
+            raise AssertionError("新旧解析结果不一致")
+
+    legacy = best_of(legacy_parse, bodies, args.repeat)
+    fast = best_of(fast_parse, bodies, args.repeat)
+    return {
+        'pages': args.pages,
+        'rows': rows,
+        'legacy_usec_per_row': round(legacy / rows * 1e6, 2),
+        'fast_usec_per_row': round(fast / rows * 1e6, 2),
+        'speedup': round(legacy / fast, 2),
+        'fast_stages_usec_per_row': bench_stages(bodies, args.repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_parser', description='列表页解析微基准')
+    parser.add_argument('--pages', type=int, default=20, help='参与测试的页数（每页20条）')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数，取最快的一次')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件，默认输出到标准输出')
+    args = parser.parse_args(argv)
+
+    text = json.dumps(run(args), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+本地模拟的 HTTP 代理，把请求原样转发给目标地址（通常是 fakesite.py 的模拟搜索服务器），用于测试代理池。
+
+可设置转发前的额外延迟、返回 403 的比例（模拟出口 IP 被封禁），
+banned 为 True 时所有请求都返回 403；stop() 后端口不再接受连接，模拟代理宕机。
+requests 记录收到的请求数。
+"""
+
+import http.client
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class FakeProxy(object):
+    """
+    在本机随机端口启动的模拟代理，可作为上下文管理器使用：
+
+        with FakeProxy(latency=0.05) as proxy:
+            config = {'proxies': [proxy.url], ...}
+    """
+
+    def __init__(self, latency=0.0, ban_rate=0.0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.ban_rate = ban_rate
+        self.banned = False
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def handle(self, handler):
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.banned or (self.ban_rate and random.random() < self.ban_rate):
+            self._send(handler, 403, b'Forbidden', 'text/plain')
+            return
+
+        # 代理收到的请求行中是完整的地址
+        target = urlsplit(handler.path)
+        path = target.path + ('?' + target.query if target.query else '')
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        try:
+            conn.request('GET', path, headers={k: v for k, v in handler.headers.items()
+                                               if k.lower() not in ('proxy-connection', 'connection', 'host')})
+            resp = conn.getresponse()
+            body = resp.read()
+            self._send(handler, resp.status, body, resp.getheader('Content-Type', 'text/html'))
+        except OSError:
+            self._send(handler, 502, b'Bad Gateway', 'text/plain')
+        finally:
+            conn.close()
+
+    def _send(self, handler, status, body, content_type):
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='本地模拟 HTTP 代理')
+    parser.add_argument('--port', type=int, default=8890)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--ban-rate', type=float, default=0.0, help='返回 403 的比例')
+    args = parser.parse_args()
+    proxy = FakeProxy(args.latency, args.ban_rate, port=args.port)
+    print(f"模拟代理地址: {proxy.url}")
+    try:
+        proxy.httpd.serve_forever()
+    except KeyboardInterrupt:
+        proxy.stop()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+本地模拟的搜索服务器，页面结构与 search.ccgp.gov.cn/bxsearch 的结果页一致
+（总条数位于 /html/body/div[5]/div[1]/div/p[1]/span[2]，
+列表位于 /html/body/div[5]/div[2]/div/div/div[1]/ul/li），用于离线基准测试。
+
+可配置总条数、响应延迟及其抖动、出错比例。数据由查询参数确定性生成，
+同一查询多次请求返回相同内容，不同关键词/日期返回不同的详情链接。
+详情链接指向本服务器的 /cggg/... 页面，内容包含项目编号、预算金额、截止时间、
+开标时间、中标供应商和中标金额，用于测试详情页抓取。
+与按 Host 分发的前端服务器一样，详情页请求的 Host 不是本服务器地址时返回 421；
+detail_requests 记录各详情页请求的 Host 和 Referer。
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+
+BUYERS = ['南宁市第一人民医院', '广西壮族自治区教育厅', '桂林市公安局', '柳州市财政局', '玉林市人民政府办公室']
+AGENTS = ['广西建设工程招标有限公司', '中化国际招标有限责任公司', '广西华德招标代理有限公司']
+ZONES = ['广西', '北京', '广东', '四川']
+TITLES = ['{buyer}办公设备采购项目公开招标公告', '{buyer}信息化建设项目中标（成交）结果公告',
+          '{buyer}物业管理服务竞争性磋商公告', '{buyer}医疗设备采购项目更正公告']
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>中国政府采购网搜索</title></head>
+<body>
+<div class="header"></div>
+<div class="nav"></div>
+<div class="search"></div>
+<div class="filter"></div>
+<div class="vT_z">
+  <div class="vT-srch-result-list-con">
+    <div><p class="pager"><span>共找到</span><span style="color:#c00000">
+                {total}
+            </span><span>条内容</span></p></div>
+  </div>
+  <div class="vT-srch-result-list">
+    <div><div><div class="vT-srch-result-list-bid">
+      <ul class="vT-srch-result-list-bid">
+{items}
+      </ul>
+    </div></div></div>
+  </div>
+</div>
+</body>
+</html>
+'''
+
+ITEM_TEMPLATE = '''        <li>
+            <a href="{href}" style="line-height:18px" target="_blank">
+                {title}
+            </a>
+            <p>{summary}</p>
+            <span>{date} {time}
+                | 采购人：{buyer}
+                | 代理机构：{agent}
+                | <a href="javascript:void(0)">{zone}</a>
+            </span>
+        </li>'''
+
+
+DETAIL_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<div class="vF_deail_maincontent">
+  <h2 class="tc">{title}</h2>
+  <div class="vF_detail_content">
+    <p><strong>项目概况</strong></p>
+    <p>一、项目编号：{code}</p>
+    <p>二、项目名称：{title}</p>
+    <p>三、预算金额：<span>{budget}万元（人民币）</span></p>
+    <p>四、提交投标文件截止时间：<span>2025年{month:02d}月{day:02d}日 09点30分（北京时间）</span></p>
+    <p>五、开标时间：2025年{month:02d}月{day:02d}日 09点30分</p>
+    <p>六、中标（成交）信息</p>
+    <p>供应商名称：{winner}</p>
+    <p>中标（成交）金额：{amount}（元）</p>
+  </div>
+</div>
+</body>
+</html>
+'''
+
+WINNERS = ['广西信达科技有限公司', '南宁市华通物业服务有限公司', '桂林恒远医疗器械有限公司']
+
+
+def render_detail(path):
+    """按详情页路径确定性地生成详情页"""
+    rnd = random.Random(path)
+    budget = rnd.randint(10, 900)
+    return DETAIL_TEMPLATE.format(
+        title=rnd.choice(TITLES).format(buyer=rnd.choice(BUYERS)),
+        code=f"GXZC2025-G{rnd.randint(1, 9)}-{rnd.randint(10000, 99999)}",
+        budget=budget,
+        month=rnd.randint(1, 12),
+        day=rnd.randint(1, 28),
+        winner=rnd.choice(WINNERS),
+        amount=f"{budget * 10000 * rnd.uniform(0.8, 0.99):.2f}",
+    )
+
+
+def render_item(seed, index, base_url=''):
+    """按查询种子和序号确定性地生成一条公告，base_url 为空时链接指向正式网站"""
+    rnd = random.Random(f"{seed}:{index}")
+    buyer = rnd.choice(BUYERS)
+    return ITEM_TEMPLATE.format(
+        href=f"{base_url or 'http://www.ccgp.gov.cn'}/cggg/dfgg/gkzb/2025{rnd.randint(1, 12):02d}/t{seed}_{index}.htm",
+        title=rnd.choice(TITLES).format(buyer=buyer),
+        summary=f"项目编号：GXZC2025-G{rnd.randint(1, 9)}-{rnd.randint(10000, 99999)}，预算金额约{rnd.randint(10, 900)}万元。",
+        date=f"2025.{rnd.randint(1, 12):02d}.{rnd.randint(1, 28):02d}",
+        time=f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}",
+        buyer=buyer,
+        agent=rnd.choice(AGENTS),
+        zone=rnd.choice(ZONES),
+    )
+
+
+def render_page(seed, total, page_index, page_size=PAGE_SIZE, base_url=''):
+    start = (page_index - 1) * page_size
+    items = [render_item(seed, i, base_url) for i in range(start, min(start + page_size, total))]
+    return PAGE_TEMPLATE.format(total=total, items='\n'.join(items))
+
+
+class FakeSearchServer(object):
+    """
+    在本机随机端口启动的模拟搜索服务器，可作为上下文管理器使用：
+
+        with FakeSearchServer(total=400, latency=0.05) as server:
+            config = {'search_url': server.search_url, ...}
+    """
+
+    def __init__(self, total=400, latency=0.0, jitter=0.0, error_rate=0.0, host='127.0.0.1', port=0):
+        self.total = total
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        # 详情页请求的 (Host, Referer)
+        self.detail_requests = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self):
+        return self.base_url + '/bxsearch?'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def handle(self, handler):
+        with self.lock:
+            self.requests += 1
+            failed = self.error_rate > 0 and random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        delay = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if failed:
+            self._send(handler, 500, '<html><body>Internal Server Error</body></html>')
+            return
+
+        parsed = urlparse(handler.path)
+        if parsed.path.startswith('/cggg/'):
+            host = handler.headers.get('Host')
+            with self.lock:
+                self.detail_requests.append((host, handler.headers.get('Referer')))
+            # 与按 Host 分发的前端服务器一样，Host 不是本站时不返回详情页
+            if host != urlparse(self.base_url).netloc:
+                self._send(handler, 421, '<html><body>Misdirected Request</body></html>')
+                return
+            self._send(handler, 200, render_detail(parsed.path))
+            return
+        if parsed.path != '/bxsearch':
+            self._send(handler, 404, '<html><body>Not Found</body></html>')
+            return
+        query = parse_qs(parsed.query)
+
+        def arg(name, default=''):
+            return query.get(name, [default])[0]
+
+        seed_text = '|'.join([arg('kw'), arg('zoneId'), arg('bidType'), arg('start_time'), arg('end_time')])
+        seed = hashlib.md5(seed_text.encode('utf-8')).hexdigest()[:8]
+        try:
+            page_index = int(arg('page_index', '1'))
+        except ValueError:
+            page_index = 1
+        self._send(handler, 200, render_page(seed, self.total, page_index, base_url=self.base_url))
+
+    def _send(self, handler, status, body):
+        data = body.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='本地模拟搜索服务器')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--total', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeSearchServer(args.total, args.latency, args.jitter, args.error_rate, port=args.port)
+    print(f"模拟搜索地址: {server.search_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+本地模拟的 SMTP 服务器（明文，不加密），用于在不连接真实邮件服务器的情况下测试邮件提醒。
+
+支持 EHLO/HELO、AUTH PLAIN、MAIL、RCPT、DATA、RSET、NOOP、QUIT，
+收到的邮件解析为 email.message.Message 保存在 messages 中；connections 和 logins 记录连接和登录次数，
+latency 为每条命令的响应延迟，用于模拟较慢的邮件服务器。
+"""
+
+import email
+import email.header
+import socketserver
+import threading
+import time
+
+
+class FakeSMTPServer(object):
+    """
+    在本机随机端口启动的模拟 SMTP 服务器，可作为上下文管理器使用：
+
+        with FakeSMTPServer() as server:
+            connection = SMTPConnection(server.host, server.port, 'user', 'pass', use_ssl=False)
+    """
+
+    def __init__(self, latency=0.0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.lock = threading.Lock()
+        self.tcpd = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self.tcpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def host(self):
+        return self.tcpd.server_address[0]
+
+    @property
+    def port(self):
+        return self.tcpd.server_address[1]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server.handle(self)
+
+        return Handler
+
+    def handle(self, handler):
+        with self.lock:
+            self.connections += 1
+
+        def reply(text):
+            if self.latency:
+                time.sleep(self.latency)
+            handler.wfile.write((text + '\r\n').encode('ascii'))
+            handler.wfile.flush()
+
+        reply('220 fakesmtp ready')
+        while True:
+            line = handler.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', errors='replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                reply('250-fakesmtp\r\n250-AUTH PLAIN\r\n250 8BITMIME')
+            elif verb == 'HELO':
+                reply('250 fakesmtp')
+            elif verb == 'AUTH':
+                if len(command.split()) == 2:
+                    # AUTH PLAIN 后单独一行发送凭据
+                    reply('334 ')
+                    handler.rfile.readline()
+                with self.lock:
+                    self.logins += 1
+                reply('235 Authentication successful')
+            elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                reply('250 OK')
+            elif verb == 'DATA':
+                reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = handler.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    # 去掉行首用于转义的点
+                    lines.append(data[1:] if data.startswith(b'..') else data)
+                with self.lock:
+                    self.messages.append(email.message_from_bytes(b''.join(lines)))
+                reply('250 OK: queued')
+            elif verb == 'QUIT':
+                reply('221 Bye')
+                return
+            else:
+                reply('502 Command not implemented')
+
+    def start(self):
+        self.thread = threading.Thread(target=self.tcpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.tcpd.shutdown()
+        self.tcpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='本地模拟 SMTP 服务器，打印收到的邮件主题和附件')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeSMTPServer(args.latency, port=args.port).start()
+    print(f"模拟 SMTP 服务器: {server.host}:{server.port}")
+    shown = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            with server.lock:
+                new_messages = server.messages[shown:]
+            for message in new_messages:
+                subject = str(email.header.make_header(email.header.decode_header(message['Subject'] or '')))
+                attachments = [part.get_filename() for part in message.walk() if part.get_filename()]
+                print(f"[连接 {server.connections}，登录 {server.logins}] {subject} {attachments or ''}")
+            shown += len(new_messages)
+    except KeyboardInterrupt:
+        server.stop()
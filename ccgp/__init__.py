@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+中国政府采购网公告爬虫的无界面抓取引擎。
+
+GUI（Crawler_GUI_V2.py）、定时脚本（Integrated(verion=1.2).py）和命令行
+（python -m ccgp）共用同一套抓取与解析逻辑。
+"""
+
+from .engine import (
+    BID_TYPE_MAP, HEAD, PAGE_SIZE, SEARCH_URL, CrawlEngine, build_params,
+    get_bid_type_name, iter_records, record_to_row,
+)
+from .record import Announcement
+
+__all__ = [
+    'BID_TYPE_MAP', 'HEAD', 'PAGE_SIZE', 'SEARCH_URL', 'Announcement', 'CrawlEngine', 'build_params',
+    'get_bid_type_name', 'iter_records', 'record_to_row',
+]
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+批量查询：一次运行中抓取多个 区域 × 关键词 × 公告类型 组合。
+
+任务文件为 JSON，例如：
+
+    {
+        "defaults": {"start_date": "2025-07-01", "end_date": "2025-07-09", "min_delay": 1, "max_delay": 4},
+        "zones": ["11", "45"],
+        "keywords": ["公告", "采购"],
+        "bid_types": ["0"],
+        "queries": [{"keyword": "医疗", "zone_id": "44", "bid_type": "7"}]
+    }
+
+zones / keywords / bid_types 展开为笛卡尔积，queries 中的查询原样追加，
+两者都以 defaults 为基础。所有查询共享同一个网络会话、限速器、熔断器、解析进程池和代理池。
+"""
+
+import itertools
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .engine import CrawlEngine, create_session, get_bid_type_name
+from .cache import ResponseCache
+from .parsepool import ParserPool
+from .proxypool import ProxyPool
+from .ratelimit import AdaptiveRateLimiter
+from .retry import CircuitBreaker
+
+
+def load_job(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def expand_queries(job, base_config=None):
+    """把任务描述展开为查询配置列表"""
+    job_defaults = job.get('defaults', {})
+    defaults = dict(base_config or {})
+    defaults.update(job_defaults)
+    # 任务文件给出日期而未指定时间类型时，按自定义时间处理
+    if ('start_date' in job_defaults or 'end_date' in job_defaults) and 'time_type' not in job_defaults:
+        defaults['time_type'] = 6
+
+    queries = []
+    zones = job.get('zones')
+    keywords = job.get('keywords')
+    bid_types = job.get('bid_types')
+    if zones or keywords or bid_types:
+        for zone_id, keyword, bid_type in itertools.product(
+                zones or [defaults.get('zone_id', '')],
+                keywords or [defaults.get('keyword', '')],
+                bid_types or [defaults.get('bid_type', '0')]):
+            queries.append(dict(defaults, zone_id=str(zone_id), keyword=keyword, bid_type=str(bid_type)))
+    for query in job.get('queries', []):
+        queries.append(dict(defaults, **query))
+    return queries
+
+
+# 文件名中不能出现的字符：路径分隔符、Windows 保留字符和空白
+_UNSAFE_FILENAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def query_label(config):
+    """查询的简短描述，用于日志和分查询输出的文件名"""
+    zone = config.get('zone_id') or '全国'
+    keyword = config.get('keyword') or '全部'
+    return f"{zone}_{keyword}_{get_bid_type_name(config.get('bid_type', '0'))}"
+
+
+def query_filename(index, config):
+    """
+    分查询输出的文件名（不含扩展名）：查询序号加查询描述。
+    只在采购人、代理机构或日期上不同的查询描述相同，靠序号区分
+    """
+    label = _UNSAFE_FILENAME.sub('_', query_label(config)).strip('._')
+    return f"{index + 1:02d}_{label}"
+
+
+class BatchCrawl(object):
+    """
+    并行执行多个查询。
+
+    workers 为同时进行的查询数；每条记录通过 on_record(查询序号, 记录) 回调交给调用方，
+    回调在持有锁的情况下调用，调用方无需自行加锁。
+    """
+
+    def __init__(self, queries, workers=2, log=None, session=None, limiter=None, cache=None, breaker=None,
+                 parser_pool=None, proxy_pool=None, metrics=None, profiler=None):
+        self.queries = queries
+        self.workers = max(1, int(workers))
+        self.log = log or (lambda message: None)
+        first = queries[0] if queries else {}
+        if session is None:
+            pool_config = dict(first, concurrency=self.workers * max(1, int(first.get('concurrency', 1))))
+            session = create_session(pool_config)
+        self.session = session
+        if limiter is None:
+            limiter = AdaptiveRateLimiter.from_config(dict(first, concurrency=self.workers))
+        self.limiter = limiter
+        self.cache = cache if cache is not None else ResponseCache.from_config(first)
+        self.breaker = breaker if breaker is not None else CircuitBreaker.from_config(first)
+        self.parser_pool = parser_pool if parser_pool is not None else ParserPool.from_config(first)
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool.from_config(first, self.log)
+        self.metrics = metrics
+        self.profiler = profiler
+        self.is_running = True
+        self.engines = set()
+        self.lock = threading.Lock()
+
+    def stop(self):
+        self.is_running = False
+        with self.lock:
+            engines = list(self.engines)
+        for engine in engines:
+            engine.stop()
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+        if self.parser_pool is not None:
+            self.parser_pool.close()
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+    def _crawl_query(self, index, config, on_record):
+        label = query_label(config)
+        engine = CrawlEngine(config, session=self.session, limiter=self.limiter, cache=self.cache,
+                             breaker=self.breaker, parser_pool=self.parser_pool, proxy_pool=self.proxy_pool,
+                             metrics=self.metrics, profiler=self.profiler,
+                             log=lambda message: self.log(f"[{label}] {message}"))
+        with self.lock:
+            if not self.is_running:
+                return 0, []
+            self.engines.add(engine)
+        count = 0
+        try:
+            for record in engine.iter_records():
+                with self.lock:
+                    on_record(index, record)
+                count += 1
+        finally:
+            with self.lock:
+                self.engines.discard(engine)
+        return count, engine.failed_pages
+
+    def run(self, on_record):
+        """执行全部查询，返回 (各查询条数列表, 失败的查询序号列表)"""
+        counts = [0] * len(self.queries)
+        failed = []
+        self.log(f"共 {len(self.queries)} 个查询，同时执行 {self.workers} 个")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._crawl_query, i, q, on_record): i for i, q in enumerate(self.queries)}
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    index = futures[future]
+                    label = query_label(self.queries[index])
+                    try:
+                        counts[index], failed_pages = future.result()
+                    except Exception as e:
+                        failed.append(index)
+                        self.log(f"查询 {label} 失败: {e}")
+                        continue
+                    if failed_pages:
+                        # 已抓到的记录照常交给调用方，但该查询计为失败
+                        failed.append(index)
+                        self.log(f"查询 {label} 有 {len(failed_pages)} 页抓取失败，结果不完整，{counts[index]} 条数据")
+                        continue
+                    self.log(f"查询 {label} 完成，{counts[index]} 条数据（{done}/{len(self.queries)}）")
+            except KeyboardInterrupt:
+                self.stop()
+                for future in futures:
+                    future.cancel()
+                raise
+        return counts, failed
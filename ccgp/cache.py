@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘上的HTTP响应缓存。
+
+以规范化后的 URL + 查询参数为键，把响应正文保存在缓存目录下的 SQLite 文件中：
+
+- 每条缓存有自己的过期时间（默认 ttl 秒）；
+- 总大小超过上限时按最近访问时间淘汰（LRU），淘汰到上限的 90%；
+- 离线/回放模式下只读缓存，未命中时抛出 CacheMiss，不访问网络。
+
+重复执行相同的搜索或重新处理之前抓过的页面时直接命中缓存，不再等待请求间隔。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from requests import HTTPError, Request
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_MB = 200
+# 超过上限时淘汰到上限的该比例，不必每次写入都淘汰
+EVICT_TARGET = 0.9
+# 命中时只在内存中记下访问时间，积累到该数目、写入或关闭时再一并写回
+ACCESS_FLUSH = 100
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    url         TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    body        BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    created     REAL NOT NULL,
+    expires     REAL NOT NULL,
+    accessed    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed);
+'''
+
+
+class CacheMiss(Exception):
+    """离线模式下请求的页面不在缓存中"""
+
+
+def normalize_request(url, params=None):
+    """规范化请求：去掉 URL 末尾的 ?，参数按名称排序并统一为去除首尾空白的字符串"""
+    url = url.rstrip('?').strip()
+    items = sorted((str(k), str(v).strip()) for k, v in (params or {}).items())
+    return url, items
+
+
+def cache_key(url, params=None):
+    url, items = normalize_request(url, params)
+    text = json.dumps([url, items], ensure_ascii=False)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class CachedResponse(object):
+    """从缓存读出的响应，提供抓取引擎用到的 requests.Response 属性"""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, content):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(f"{self.status_code} Error (cached) for url: {self.url}")
+
+
+class ResponseCache(object):
+    """
+    响应缓存。可在多个线程间共享。
+
+    directory: 缓存目录；ttl: 默认有效期（秒）；max_mb: 缓存总大小上限（MB）；
+    offline: 为 True 时只读缓存，未命中抛出 CacheMiss。
+    """
+
+    def __init__(self, directory, ttl=DEFAULT_TTL, max_mb=DEFAULT_MAX_MB, offline=False):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, 'responses.db'), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # 缓存总大小和尚未写回的访问时间；多个进程共用缓存目录时总大小只是本进程的估计，淘汰前重新统计
+        self.total_bytes = self._stored_bytes()
+        self.accessed = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """配置中设置了 cache_dir 时创建缓存，否则返回 None"""
+        directory = config.get('cache_dir')
+        if not directory:
+            return None
+        return cls(directory,
+                   ttl=float(config.get('cache_ttl', DEFAULT_TTL)),
+                   max_mb=float(config.get('cache_max_mb', DEFAULT_MAX_MB)),
+                   offline=bool(config.get('offline', False)))
+
+    def close(self):
+        with self.lock:
+            try:
+                self._flush_accessed()
+                self.conn.commit()
+            finally:
+                self.conn.close()
+
+    def get(self, url, params=None):
+        """返回未过期的缓存响应；未命中时返回 None，离线模式下抛出 CacheMiss"""
+        key = cache_key(url, params)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute('SELECT url, status_code, body, expires, size FROM responses WHERE key = ?',
+                                    (key,)).fetchone()
+            # 离线回放时忽略过期时间
+            if row is not None and (row[3] >= now or self.offline):
+                self.accessed[key] = now
+                if len(self.accessed) >= ACCESS_FLUSH:
+                    self._flush_accessed()
+                    self.conn.commit()
+                self.hits += 1
+                return CachedResponse(row[0], row[1], row[2])
+            if row is not None:
+                self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.conn.commit()
+                self.accessed.pop(key, None)
+                self.total_bytes -= row[4]
+            self.misses += 1
+        if self.offline:
+            raise CacheMiss(f"离线模式下缓存未命中: {url} {params}")
+        return None
+
+    def put(self, url, params, response, ttl=None):
+        """保存响应，超过总大小上限时淘汰最久未访问的缓存"""
+        key = cache_key(url, params)
+        full_url = getattr(response, 'url', None) or Request('GET', url, params=params).prepare().url
+        body = response.content
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            old = self.conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (key, url, status_code, body, size, created, expires, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, full_url, response.status_code, sqlite3.Binary(body), len(body), now, expires, now))
+            self.accessed.pop(key, None)
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            self._flush_accessed()
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _stored_bytes(self):
+        return self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _flush_accessed(self):
+        """把内存中的访问时间写回（由调用方提交）"""
+        if self.accessed:
+            self.conn.executemany('UPDATE responses SET accessed = ? WHERE key = ?',
+                                  [(accessed, key) for key, accessed in self.accessed.items()])
+            self.accessed.clear()
+
+    def _evict(self):
+        self.total_bytes = self._stored_bytes()
+        target = int(self.max_bytes * EVICT_TARGET)
+        if self.total_bytes <= self.max_bytes:
+            return
+        # 先清理已过期的，再按最近访问时间从旧到新淘汰
+        self.conn.execute('DELETE FROM responses WHERE expires < ?', (time.time(),))
+        total = self._stored_bytes()
+        evict = []
+        for key, size in self.conn.execute('SELECT key, size FROM responses ORDER BY accessed'):
+            if total <= target:
+                break
+            evict.append((key,))
+            total -= size
+        self.conn.executemany('DELETE FROM responses WHERE key = ?', evict)
+        self.total_bytes = total
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute('DELETE FROM responses')
+            self.conn.commit()
+            self.accessed.clear()
+            self.total_bytes = 0
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+断点日志与续抓。
+
+长时间的抓取在抓取过程中把进度追加写入一个 JSON Lines 日志文件（断点日志）：
+
+    {"type": "start", "key": ..., "config": {...}, "created": ...}   查询条件
+    {"type": "total", "total": 5980, "page_count": 299}                总条数与总页数
+    {"type": "page", "page": 17, "records": [...]}                     已完成的页及该页产出的记录
+
+某页的记录全部交给调用方之后才写入该页，日志每隔 flush_interval 秒落盘一次（fsync）。
+程序崩溃、断电或被手动停止后，用同一个日志续抓：已完成页面的记录直接从日志中读出，
+不再请求这些页面，只抓取剩余的页。抓取完整结束且结果已保存后调用 finish() 删除日志。
+
+断电时最后一行可能只写了一半，读取时忽略无法解析的末行，续写前把文件截断到最后一个完整行。
+"""
+
+import glob
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from .engine import query_fingerprint
+from .record import Announcement
+
+DEFAULT_CHECKPOINT_DIR = 'checkpoints'
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# 写入日志的查询条件，续抓时据此重建配置
+QUERY_KEYS = ['keyword', 'buyer_name', 'agent_name', 'zone_id', 'bid_type', 'start_date', 'end_date', 'time_type']
+
+
+def checkpoint_key(config):
+    """同一查询（含日期范围）对应同一个断点日志"""
+    text = json.dumps([query_fingerprint(config)] + [str(config.get(k, '')) for k in ('start_date', 'end_date', 'time_type')])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def checkpoint_path(config, directory=None):
+    return os.path.join(directory or DEFAULT_CHECKPOINT_DIR, checkpoint_key(config) + '.jsonl')
+
+
+def read_journal(path):
+    """逐条生成日志中的条目，遇到不完整或无法解析的行即停止"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                # 末行不完整：写入时被中断
+                return
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+def read_header(path):
+    """返回日志的 start 条目，文件为空或已损坏时返回 None"""
+    for entry in read_journal(path):
+        return entry if entry.get('type') == 'start' else None
+    return None
+
+
+def list_checkpoints(directory=None):
+    """目录中未完成的断点日志，最近修改的在前，返回 [(路径, start 条目)]"""
+    result = []
+    paths = glob.glob(os.path.join(directory or DEFAULT_CHECKPOINT_DIR, '*.jsonl'))
+    for path in sorted(paths, key=os.path.getmtime, reverse=True):
+        header = read_header(path)
+        if header is not None:
+            result.append((path, header))
+    return result
+
+
+class CrawlCheckpoint(object):
+    """
+    单个查询的断点日志。
+
+    resume 为 True 且日志已存在时在其基础上续抓（查询条件不一致时抛出 ValueError），
+    否则重新开始并覆盖旧日志。done_pages 为已完成的页码，total / page_count 为上次得到的总数。
+    """
+
+    def __init__(self, path, config, resume=False, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.key = checkpoint_key(config)
+        self.flush_interval = flush_interval
+        self.done_pages = set()
+        self.record_count = 0
+        self.total = None
+        self.page_count = None
+        self.resumed = False
+        self.last_sync = time.monotonic()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume and os.path.exists(path):
+            self._load(path)
+            self.fp = open(path, 'a', encoding='utf-8')
+        else:
+            self.fp = open(path, 'w', encoding='utf-8')
+            self._append({'type': 'start', 'key': self.key, 'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                          'config': {k: config.get(k) for k in QUERY_KEYS if config.get(k) is not None}})
+            self.flush(sync=True)
+
+    def _load(self, path):
+        valid_end = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                valid_end += len(line)
+                kind = entry.get('type')
+                if kind == 'start' and entry.get('key') != self.key:
+                    raise ValueError(f"断点日志 {path} 对应的查询条件与当前查询不一致")
+                elif kind == 'total':
+                    self.total = entry['total']
+                    self.page_count = entry['page_count']
+                elif kind == 'page':
+                    self.done_pages.add(entry['page'])
+                    self.record_count += len(entry['records'])
+        # 去掉写了一半的末行，之后的条目接在最后一个完整行后面
+        if valid_end < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+        self.resumed = True
+
+    def _append(self, entry):
+        self.fp.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def flush(self, sync=False):
+        """写出缓冲区；sync 为 True 或距上次落盘超过 flush_interval 秒时 fsync"""
+        if self.fp is None:
+            return
+        self.fp.flush()
+        if sync or time.monotonic() - self.last_sync >= self.flush_interval:
+            os.fsync(self.fp.fileno())
+            self.last_sync = time.monotonic()
+
+    def replay(self):
+        """按原先产出的顺序生成日志中已完成页面的记录，逐页读取，不一次性载入内存"""
+        for entry in read_journal(self.path):
+            if entry.get('type') == 'page':
+                for data in entry['records']:
+                    yield Announcement.from_dict(data)
+
+    def set_total(self, total, page_count):
+        if (total, page_count) == (self.total, self.page_count):
+            return
+        self.total = total
+        self.page_count = page_count
+        self._append({'type': 'total', 'total': total, 'page_count': page_count})
+        self.flush()
+
+    def page_done(self, page, records):
+        """记录某页已完成及该页产出的记录"""
+        if page in self.done_pages:
+            return
+        self.done_pages.add(page)
+        self.record_count += len(records)
+        self._append({'type': 'page', 'page': page, 'records': [r.to_dict() for r in records]})
+        self.flush()
+
+    def close(self):
+        """保留日志以便续抓"""
+        if self.fp is None:
+            return
+        self.flush(sync=True)
+        self.fp.close()
+        self.fp = None
+
+    def finish(self):
+        """抓取完整结束、结果已保存后删除日志"""
+        if self.fp is not None:
+            self.fp.close()
+            self.fp = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,565 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口，无需图形界面即可执行抓取任务：
+
+    python -m ccgp crawl --keyword 公告 --zone 45 --start 2025-07-01 --end 2025-07-09
+
+日志输出到标准错误，--format jsonl --output - 时记录逐条写到标准输出，
+可直接通过管道交给下游程序处理。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from .batch import BatchCrawl, expand_queries, load_job, query_filename
+from .checkpoint import CrawlCheckpoint, checkpoint_path, list_checkpoints, read_header
+from .detail import DetailFetcher
+from .distributed import DEFAULT_LEASE, DEFAULT_PAGES_PER_TASK, DEFAULT_POLL, Coordinator, QueueWorker
+from .engine import CrawlEngine, query_fingerprint
+from .export import RecordWriter, resolve_output_path
+from .incremental import IncrementalTracker
+from .metrics import CrawlMetrics
+from .profiling import Profiler, stage_timer
+from .shard import SHARD_UNITS, ShardedCrawl
+from .store import DEFAULT_SEARCH_LIMIT, DEFAULT_STORE, AnnouncementStore, StoreWriter, record_key
+from .workqueue import open_queue
+
+
+def log(message):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+
+def load_config(path):
+    """读取与GUI共用的JSON配置文件，文件不存在时返回空配置"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def add_query_arguments(parser):
+    """添加与单个查询相关的参数，未指定的参数沿用配置文件中的值"""
+    parser.add_argument('--config', default='config.json', help='配置文件路径（默认 config.json）')
+    parser.add_argument('--keyword', help='搜索关键词')
+    parser.add_argument('--buyer', dest='buyer_name', help='采购人名称')
+    parser.add_argument('--agent', dest='agent_name', help='代理机构名称')
+    parser.add_argument('--zone', dest='zone_id', help='区域代码，如 45 表示广西，留空表示全国')
+    parser.add_argument('--bid-type', dest='bid_type', help='公告类型代码，0 表示所有')
+    parser.add_argument('--start', dest='start_date', help='开始日期 yyyy-MM-dd')
+    parser.add_argument('--end', dest='end_date', help='结束日期 yyyy-MM-dd')
+    parser.add_argument('--time-type', dest='time_type', type=int, help='时间类型，6 表示自定义时间')
+    parser.add_argument('--min-delay', dest='min_delay', type=float, help='请求间隔下限（秒），响应良好时间隔逐步缩短到该值')
+    parser.add_argument('--max-delay', dest='max_delay', type=float, help='请求间隔上限（秒），响应变慢或出错时间隔逐步拉长到该值')
+    parser.add_argument('--concurrency', type=int, help='第2页起同时抓取的页数（默认 1，即逐页抓取）')
+    parser.add_argument('--parse-workers', dest='parse_workers', type=int,
+                        help='并发抓取时解析列表页的子进程数（默认 0，即在抓取线程中解析）')
+    parser.add_argument('--proxy', dest='proxies', action='append',
+                        help='代理出口地址，如 http://10.0.0.2:3128，可多次指定组成代理池；direct 表示直接访问')
+    parser.add_argument('--cache-dir', dest='cache_dir', help='响应缓存目录；相同查询在有效期内直接使用缓存')
+    parser.add_argument('--cache-ttl', dest='cache_ttl', type=float, help='缓存有效期（秒，默认 3600）')
+    parser.add_argument('--cache-max-mb', dest='cache_max_mb', type=float, help='缓存总大小上限（MB，默认 200），超出时淘汰最久未使用的页面')
+    parser.add_argument('--offline', action='store_true', default=None, help='离线回放：只使用缓存，不访问网络（需要 --cache-dir）')
+    parser.add_argument('--retries', dest='max_retries', type=int, help='单页请求失败（网络错误、超时、429/5xx）后的重试次数（默认 3）')
+    parser.add_argument('--retry-backoff', dest='retry_backoff', type=float,
+                        help='首次重试前的退避时间（秒，默认 2），之后每次加倍并加入随机抖动')
+    parser.add_argument('--breaker-threshold', dest='breaker_threshold', type=int,
+                        help='连续失败多少次后暂停所有请求（默认 5，0 表示不暂停）')
+    parser.add_argument('--breaker-cooldown', dest='breaker_cooldown', type=float, help='暂停请求的时间（秒，默认 60）')
+
+
+def build_config(args):
+    """合并配置文件与命令行参数"""
+    config = load_config(args.config)
+    for key in ['keyword', 'buyer_name', 'agent_name', 'zone_id', 'bid_type',
+                'start_date', 'end_date', 'time_type', 'min_delay', 'max_delay', 'concurrency',
+                'parse_workers', 'proxies', 'cache_dir', 'cache_ttl', 'cache_max_mb', 'offline', 'save_path', 'output_prefix',
+                'max_retries', 'retry_backoff', 'breaker_threshold', 'breaker_cooldown', 'checkpoint_dir',
+                'fetch_details', 'detail_workers', 'detail_min_delay', 'detail_max_delay', 'detail_cache_ttl',
+                'profile', 'profile_dir', 'cprofile']:
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+    # 命令行只给出日期时按自定义时间处理
+    if args.time_type is None and (args.start_date or args.end_date):
+        config['time_type'] = 6
+    return config
+
+
+def output_path(args, config):
+    """输出文件完整路径；jsonl 格式且 --output 为 - 时返回 None，表示写到标准输出"""
+    if args.format == 'jsonl' and args.output == '-':
+        return None
+    filename = args.output or (config.get('output_prefix') or 'filtered_data_') + datetime.now().strftime("%Y%m%d_%H%M%S")
+    return resolve_output_path(config.get('save_path', ''), filename, '.' + args.format)
+
+
+def add_output_arguments(parser):
+    parser.add_argument('--save-path', dest='save_path', help='保存目录')
+    parser.add_argument('--output-prefix', dest='output_prefix', help='输出文件前缀')
+    parser.add_argument('--output', '-o', help='输出文件名（不含扩展名）；jsonl 格式下为 - 时写到标准输出')
+    parser.add_argument('--format', choices=['xlsx', 'csv', 'jsonl'], default='xlsx', help='输出格式（默认 xlsx）')
+    parser.add_argument('--store', help='同时写入 SQLite 公告库（按详情链接去重更新），如 announcements.db')
+
+
+def add_detail_arguments(parser):
+    parser.add_argument('--details', dest='fetch_details', action='store_true', default=None,
+                        help='同时抓取详情页，提取预算金额、中标供应商、中标金额、截止时间等字段')
+    parser.add_argument('--detail-workers', dest='detail_workers', type=int, help='同时抓取的详情页数（默认 4）')
+    parser.add_argument('--detail-min-delay', dest='detail_min_delay', type=float, help='详情页请求间隔下限（秒，默认 1）')
+    parser.add_argument('--detail-max-delay', dest='detail_max_delay', type=float, help='详情页请求间隔上限（秒，默认 4）')
+    parser.add_argument('--detail-cache-ttl', dest='detail_cache_ttl', type=float,
+                        help='详情页缓存有效期（秒，默认 7 天，需要 --cache-dir）')
+
+
+def open_detail_fetcher(config):
+    """配置中开启 fetch_details 时返回详情页抓取器，否则返回 None"""
+    if not config.get('fetch_details'):
+        return None
+    return DetailFetcher(config, log=log)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', action='store_true', default=None,
+                        help='性能分析：按阶段和页码记录墙钟与 CPU 时间，采样调用栈，结束时写出报告')
+    parser.add_argument('--profile-dir', dest='profile_dir', help='性能分析报告目录（默认 profiles）')
+    parser.add_argument('--cprofile', action='store_true', default=None, help='性能分析时同时用 cProfile 记录函数级耗时')
+
+
+def open_profiler(config):
+    """开启 --profile 时创建并启动性能分析，否则返回 None"""
+    profiler = Profiler.from_config(config)
+    if profiler is not None:
+        profiler.start()
+        log("性能分析已开启。")
+    return profiler
+
+
+def close_profiler(profiler):
+    if profiler is not None:
+        log(f"性能分析报告已写入 {profiler.write()}")
+
+
+def add_checkpoint_arguments(parser):
+    parser.add_argument('--checkpoint-dir', dest='checkpoint_dir', help='断点日志目录（默认 checkpoints）')
+
+
+def open_checkpoint(args, config):
+    """crawl 时新建断点日志；增量抓取或指定 --no-checkpoint 时返回 None"""
+    if args.no_checkpoint or args.incremental:
+        return None
+    return CrawlCheckpoint(checkpoint_path(config, config.get('checkpoint_dir')), config)
+
+
+def open_store_writer(args):
+    """指定 --store 时返回公告库写入器，否则返回 None"""
+    if not getattr(args, 'store', None):
+        return None
+    return StoreWriter(AnnouncementStore(args.store))
+
+
+def close_store_writer(store_writer):
+    if store_writer is None:
+        return
+    store_writer.close()
+    store_writer.store.close()
+    log(f"{store_writer.count} 条数据已写入公告库 {store_writer.store.path}")
+
+
+def log_metrics(metrics):
+    """抓取结束时输出运行指标摘要"""
+    for line in metrics.summary():
+        log(line)
+
+
+def cmd_crawl(args):
+    config = build_config(args)
+    if args.incremental and not args.store:
+        log("增量抓取需要同时指定 --store 公告库。")
+        return 1
+    store_writer = open_store_writer(args)
+    tracker = None
+    if args.incremental:
+        tracker = IncrementalTracker(store_writer.store, config)
+        if tracker.watermark:
+            log(f"增量抓取，上次抓取到: {tracker.watermark[1]} {tracker.watermark[0]}")
+    return run_crawl(args, config, store_writer, tracker, open_checkpoint(args, config))
+
+
+def cmd_resume(args):
+    """按断点日志中的查询条件续抓，已完成的页面直接从日志读出"""
+    config = build_config(args)
+    if args.journal:
+        header = read_header(args.journal) if os.path.exists(args.journal) else None
+        checkpoints = [(args.journal, header)] if header is not None else []
+    else:
+        checkpoints = list_checkpoints(config.get('checkpoint_dir'))
+    if args.list:
+        for path, header in checkpoints:
+            query = header['config']
+            log(f"{path}  {header['created']} 开始  {query.get('keyword', '')} {query.get('start_date', '')} 至 {query.get('end_date', '')}")
+        return 0
+    if not checkpoints:
+        log("没有可以续抓的断点日志。")
+        return 1
+
+    path, header = checkpoints[0]
+    # 查询条件以断点日志为准，请求间隔、缓存等其余设置仍取配置文件和命令行参数
+    config.update(header['config'])
+    try:
+        checkpoint = CrawlCheckpoint(path, config, resume=True)
+    except ValueError as e:
+        log(str(e))
+        return 1
+    log(f"续抓断点日志 {path}（{header['created']} 开始），已完成 {len(checkpoint.done_pages)} 页")
+    return run_crawl(args, config, open_store_writer(args), None, checkpoint)
+
+
+def run_crawl(args, config, store_writer, tracker, checkpoint):
+    metrics = CrawlMetrics()
+    profiler = open_profiler(config)
+    timed = stage_timer(metrics, profiler)
+    engine = CrawlEngine(config, log=log, page_filter=tracker, checkpoint=checkpoint, metrics=metrics,
+                         profiler=profiler)
+    fetcher = open_detail_fetcher(config)
+    writer = RecordWriter(args.format, output_path(args, config), details=fetcher is not None)
+
+    status = 0
+    records = engine.iter_records()
+    try:
+        if fetcher is not None:
+            records = fetcher.enrich(records)
+        for record in records:
+            with timed('write', record.page):
+                writer.write(record)
+                if store_writer is not None:
+                    store_writer.write(record)
+        if tracker is not None and engine.completed:
+            tracker.mark_completed()
+        if engine.failed_pages:
+            status = 1
+    except KeyboardInterrupt:
+        status = 130
+        engine.stop()
+        if fetcher is not None:
+            fetcher.stop()
+        log("抓取被用户中断，正在保存已抓取的数据...")
+    except Exception as e:
+        status = 1
+        log(f"抓取数据时发生错误: {e}")
+    finally:
+        # 先结束记录流（包括详情页抓取的后台线程），再关闭引擎和断点日志
+        records.close()
+        engine.close()
+        if fetcher is not None:
+            fetcher.close()
+        writer.close()
+        if store_writer is not None:
+            store_writer.flush()
+        if tracker is not None:
+            tracker.commit()
+        close_store_writer(store_writer)
+        if checkpoint is not None:
+            # 完整抓取且结果已保存后才删除断点日志
+            if status == 0 and engine.completed:
+                checkpoint.finish()
+            else:
+                checkpoint.close()
+                log(f"断点已保存到 {checkpoint.path}，运行 python -m ccgp resume 可继续抓取")
+
+    if writer.full_path:
+        log(f"{writer.count} 条数据已保存到 {writer.full_path}")
+    log_metrics(metrics)
+    close_profiler(profiler)
+    return status
+
+
+def write_merged(args, config, records, metrics=None, profiler=None):
+    """把合并后的记录写到输出文件（和公告库），返回退出码；给出 metrics / profiler 时记录写入耗时"""
+    timed = stage_timer(metrics, profiler)
+    # 详情页在合并输出时抓取，已抓过的详情页走缓存
+    fetcher = open_detail_fetcher(config)
+    writer = RecordWriter(args.format, output_path(args, config), details=fetcher is not None)
+    store_writer = open_store_writer(args)
+    status = 0
+    try:
+        if fetcher is not None:
+            records = fetcher.enrich(records)
+        for record in records:
+            with timed('write', record.page):
+                writer.write(record)
+                if store_writer is not None:
+                    store_writer.write(record)
+    except KeyboardInterrupt:
+        status = 130
+        if fetcher is not None:
+            fetcher.stop()
+        log("合并输出被用户中断，已写出的数据仍会保存。")
+    finally:
+        if fetcher is not None:
+            records.close()
+            fetcher.close()
+        writer.close()
+        close_store_writer(store_writer)
+    if writer.full_path:
+        log(f"{writer.count} 条数据已合并保存到 {writer.full_path}")
+    return status
+
+
+def cmd_backfill(args):
+    config = build_config(args)
+    shard_dir = args.shard_dir or os.path.join('shards', query_fingerprint(config))
+    metrics = CrawlMetrics()
+    profiler = open_profiler(config)
+    crawl = ShardedCrawl(config, shard_dir, unit=args.unit, workers=args.workers, log=log, metrics=metrics,
+                         profiler=profiler)
+    log(f"分片目录: {shard_dir}")
+
+    status = 0
+    try:
+        failed = crawl.run()
+    except KeyboardInterrupt:
+        log("回填被用户中断，已完成的分片会在下次运行时跳过。")
+        close_profiler(profiler)
+        return 130
+    finally:
+        crawl.close()
+
+    if failed:
+        status = 1
+        log(f"{len(failed)} 个分片未完成，重新运行同一命令即可只抓取这些分片。")
+
+    status = write_merged(args, config, crawl.iter_records(), metrics, profiler) or status
+    log_metrics(metrics)
+    close_profiler(profiler)
+    return status
+
+
+def cmd_coordinate(args):
+    config = build_config(args)
+    queue = open_queue(args.queue)
+    try:
+        coordinator = Coordinator(queue, config, unit=args.unit, pages_per_task=args.pages_per_task,
+                                  job=args.job, log=log)
+        coordinator.publish()
+        if args.no_wait:
+            return 0
+        try:
+            counts = coordinator.wait(args.poll)
+        except KeyboardInterrupt:
+            log(f"停止等待，抓取节点仍会继续执行作业 {coordinator.job}；重新运行同一命令即可继续等待并合并结果。")
+            return 130
+        status = 0
+        if counts['failed']:
+            status = 1
+            for key, error in coordinator.failures():
+                log(f"任务 {key} 失败: {error}")
+            log(f"{counts['failed']} 个任务失败，合并结果不完整。")
+        return write_merged(args, config, coordinator.iter_records()) or status
+    finally:
+        queue.close()
+
+
+def cmd_work(args):
+    config = build_config(args)
+    queue = open_queue(args.queue)
+    metrics = CrawlMetrics()
+    profiler = open_profiler(config)
+    worker = QueueWorker(queue, config, worker_id=args.worker_id, workers=args.workers, lease=args.lease, log=log,
+                         metrics=metrics, profiler=profiler)
+    try:
+        worker.run(exit_when_idle=args.exit_when_idle, poll=args.poll)
+    except KeyboardInterrupt:
+        log("抓取节点被用户中断，未完成的任务已放回队列。")
+        return 130
+    finally:
+        worker.close()
+        queue.close()
+        log_metrics(metrics)
+        close_profiler(profiler)
+    return 1 if worker.failed else 0
+
+
+def cmd_batch(args):
+    base_config = build_config(args)
+    queries = expand_queries(load_job(args.job), base_config)
+    if not queries:
+        log("任务文件中没有查询。")
+        return 1
+    metrics = CrawlMetrics()
+    profiler = open_profiler(base_config)
+    timed = stage_timer(metrics, profiler)
+    batch = BatchCrawl(queries, workers=args.workers, log=log, metrics=metrics, profiler=profiler)
+    store_writer = open_store_writer(args)
+
+    if args.split == 'merged':
+        writer = RecordWriter(args.format, output_path(args, base_config))
+        writers = [writer]
+        seen = set()
+
+        def on_record(index, record):
+            # 不同查询可能命中同一条公告，合并输出时按记录主键（详情链接）去重
+            key = record_key(record)
+            if key in seen:
+                return
+            seen.add(key)
+            with timed('write', record.page):
+                writer.write(record)
+                if store_writer is not None:
+                    store_writer.write(record)
+    else:
+        if args.format == 'jsonl' and args.output == '-':
+            log("分查询输出不支持写到标准输出，请指定 --output 或使用 --split merged。")
+            return 1
+        base_path = output_path(args, base_config)
+        stem, ext = os.path.splitext(base_path)
+        writers = [RecordWriter(args.format, f"{stem}_{query_filename(i, q)}{ext}") for i, q in enumerate(queries)]
+
+        def on_record(index, record):
+            with timed('write', record.page):
+                writers[index].write(record)
+                if store_writer is not None:
+                    store_writer.write(record)
+
+    status = 0
+    try:
+        counts, failed = batch.run(on_record)
+        if failed:
+            status = 1
+            log(f"{len(failed)} 个查询失败。")
+    except KeyboardInterrupt:
+        status = 130
+        log("批量抓取被用户中断，正在保存已抓取的数据...")
+    finally:
+        batch.close()
+        for writer in writers:
+            writer.close()
+        close_store_writer(store_writer)
+
+    for writer in writers:
+        if writer.full_path and writer.count:
+            log(f"{writer.count} 条数据已保存到 {writer.full_path}")
+    log_metrics(metrics)
+    close_profiler(profiler)
+    return status
+
+
+def cmd_search(args):
+    if not os.path.exists(args.store):
+        log(f"公告库 {args.store} 不存在，抓取时加 --store 写入公告库后才能搜索。")
+        return 1
+    with AnnouncementStore(args.store) as store:
+        if args.rebuild_index:
+            started = time.perf_counter()
+            store.rebuild_search_index()
+            log(f"已重建全文索引（{store.count()} 条公告），用时 {time.perf_counter() - started:.1f} 秒")
+        started = time.perf_counter()
+        rows = store.search(' '.join(args.text), start_date=args.start_date, end_date=args.end_date,
+                            zone_id=args.zone_id, bid_type=args.bid_type, limit=args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+    for row in rows:
+        if args.format == 'jsonl':
+            print(json.dumps(row, ensure_ascii=False))
+        else:
+            print('\t'.join(row[name] or '' for name in ['date', 'bid_type_name', 'title', 'buyer', 'agent', 'href']))
+    more = f"（只显示前 {args.limit} 条，可用 --limit 调整）" if args.limit and len(rows) >= args.limit else ''
+    log(f"找到 {len(rows)} 条公告{more}，用时 {elapsed:.1f} 毫秒")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='ccgp', description='中国政府采购网公告爬虫（命令行模式）')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    crawl = subparsers.add_parser('crawl', help='按查询条件抓取公告')
+    add_query_arguments(crawl)
+    add_output_arguments(crawl)
+    add_detail_arguments(crawl)
+    add_checkpoint_arguments(crawl)
+    add_profile_arguments(crawl)
+    crawl.add_argument('--no-checkpoint', dest='no_checkpoint', action='store_true',
+                       help='不写断点日志（默认抓取过程中写断点日志，中断后可用 resume 继续）')
+    crawl.add_argument('--incremental', action='store_true',
+                       help='增量抓取：只输出公告库中没有的公告，翻到上次抓取的位置即停止（需要 --store）')
+    crawl.set_defaults(func=cmd_crawl)
+
+    resume = subparsers.add_parser('resume', help='从断点日志继续被中断的抓取，已完成的页面不再请求')
+    resume.add_argument('journal', nargs='?', help='断点日志文件，默认为断点目录中最近的一个')
+    resume.add_argument('--list', action='store_true', help='列出未完成的断点日志')
+    add_query_arguments(resume)
+    add_output_arguments(resume)
+    add_detail_arguments(resume)
+    add_checkpoint_arguments(resume)
+    add_profile_arguments(resume)
+    resume.set_defaults(func=cmd_resume)
+
+    backfill = subparsers.add_parser('backfill', help='把日期区间按天或按周分片，并行回填')
+    add_query_arguments(backfill)
+    add_output_arguments(backfill)
+    add_detail_arguments(backfill)
+    add_profile_arguments(backfill)
+    backfill.add_argument('--unit', choices=sorted(SHARD_UNITS), default='day', help='分片单位（默认 day）')
+    backfill.add_argument('--workers', type=int, default=2, help='同时抓取的分片数（默认 2）')
+    backfill.add_argument('--shard-dir', dest='shard_dir', help='分片结果目录，默认 shards/<查询摘要>；已完成的分片在重新运行时跳过')
+    backfill.set_defaults(func=cmd_backfill)
+
+    coordinate = subparsers.add_parser('coordinate', help='分布式回填：把分片任务发布到任务队列，等待各抓取节点完成后合并输出')
+    add_query_arguments(coordinate)
+    add_output_arguments(coordinate)
+    add_detail_arguments(coordinate)
+    coordinate.add_argument('--queue', required=True, help='任务队列，如共享目录中的 queue.db 或 sqlite:///路径')
+    coordinate.add_argument('--unit', choices=sorted(SHARD_UNITS), default='day', help='分片单位（默认 day）')
+    coordinate.add_argument('--pages-per-task', dest='pages_per_task', type=int, default=DEFAULT_PAGES_PER_TASK,
+                            help=f'分片页数较多时每个页码区间任务的页数（默认 {DEFAULT_PAGES_PER_TASK}）')
+    coordinate.add_argument('--job', help='作业名，默认由查询条件和日期区间生成；同名作业不会重复发布任务')
+    coordinate.add_argument('--no-wait', dest='no_wait', action='store_true', help='只发布任务，不等待完成')
+    coordinate.add_argument('--poll', type=float, default=DEFAULT_POLL, help=f'查询进度的间隔（秒，默认 {DEFAULT_POLL}）')
+    coordinate.set_defaults(func=cmd_coordinate)
+
+    work = subparsers.add_parser('work', help='分布式回填的抓取节点：从任务队列领取任务并提交结果')
+    add_query_arguments(work)
+    add_profile_arguments(work)
+    work.add_argument('--queue', required=True, help='任务队列，与 coordinate 相同')
+    work.add_argument('--workers', type=int, default=1, help='本节点同时执行的任务数（默认 1）')
+    work.add_argument('--lease', type=float, default=DEFAULT_LEASE,
+                      help=f'任务租约时长（秒，默认 {DEFAULT_LEASE}），节点失联超过该时间后任务由其他节点重新领取')
+    work.add_argument('--worker-id', dest='worker_id', help='节点名称，默认为 主机名-进程号')
+    work.add_argument('--exit-when-idle', dest='exit_when_idle', action='store_true',
+                      help='队列中没有待处理和进行中的任务时退出（默认一直等待新任务）')
+    work.add_argument('--poll', type=float, default=DEFAULT_POLL, help=f'没有任务时再次领取的间隔（秒，默认 {DEFAULT_POLL}）')
+    work.set_defaults(func=cmd_work)
+
+    batch = subparsers.add_parser('batch', help='按任务文件批量执行多个查询（区域 × 关键词 × 公告类型）')
+    batch.add_argument('job', help='JSON 任务文件')
+    add_query_arguments(batch)
+    add_output_arguments(batch)
+    add_profile_arguments(batch)
+    batch.add_argument('--workers', type=int, default=4, help='同时执行的查询数（默认 4）')
+    batch.add_argument('--split', choices=['merged', 'per-query'], default='merged',
+                       help='merged: 合并为一个文件并按详情链接去重；per-query: 每个查询单独一个文件')
+    batch.set_defaults(func=cmd_batch)
+
+    search = subparsers.add_parser('search', help='在本地公告库中全文搜索已抓取的公告，不访问网络')
+    search.add_argument('text', nargs='*', help='搜索词，在标题、项目概况、采购人、代理机构和详情字段中查找；多个词须同时出现')
+    search.add_argument('--store', default=DEFAULT_STORE, help=f'公告库（默认 {DEFAULT_STORE}）')
+    search.add_argument('--start', dest='start_date', help='开始日期 yyyy-MM-dd')
+    search.add_argument('--end', dest='end_date', help='结束日期 yyyy-MM-dd')
+    search.add_argument('--zone', dest='zone_id', help='抓取时的区域代码，如 45 表示广西（含其下属区域）')
+    search.add_argument('--bid-type', dest='bid_type', help='抓取时的公告类型代码，0 表示所有')
+    search.add_argument('--limit', type=int, default=DEFAULT_SEARCH_LIMIT,
+                        help=f'最多输出的条数，按日期倒序（默认 {DEFAULT_SEARCH_LIMIT}，0 表示不限）')
+    search.add_argument('--format', choices=['table', 'jsonl'], default='table',
+                        help='table: 日期、公告类型、名称、采购人、代理机构、链接，以制表符分隔；jsonl: 每行一条完整记录')
+    search.add_argument('--rebuild-index', dest='rebuild_index', action='store_true',
+                        help='搜索前按公告表重建全文索引（索引损坏或用其他工具修改过公告库时使用）')
+    search.set_defaults(func=cmd_search)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+详情页抓取与字段提取（可选的补充阶段）。
+
+列表页只有标题、日期、采购人和一段概况，预算金额、中标供应商、中标金额、
+截止时间等都在详情页中。DetailFetcher 用一个有上限的线程池并发抓取详情页，
+使用独立的限速器（detail_min_delay / detail_max_delay）和较长的缓存有效期
+（detail_cache_ttl，详情页发布后基本不再变化），把提取到的字段写入记录的 detail。
+
+enrich() 接收列表抓取产出的记录流：列表抓取在后台线程中继续翻页，
+详情页同时在线程池中抓取，记录按原顺序产出；在途的记录数有上限，内存占用不随总数增长。
+"""
+
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from lxml import etree
+
+from .cache import ResponseCache
+from .engine import SEARCH_URL, CrawlStopped, build_params, create_session, get_request_headers
+from .ratelimit import AdaptiveRateLimiter
+
+DEFAULT_WORKERS = 4
+DEFAULT_MIN_DELAY = 1
+DEFAULT_MAX_DELAY = 4
+DEFAULT_CACHE_TTL = 7 * 24 * 3600
+
+# 详情字段及其导出表头
+DETAIL_FIELDS = ['project_code', 'budget', 'winner', 'amount', 'deadline', 'open_time']
+DETAIL_HEAD = ['项目编号', '预算金额(元)', '中标供应商', '中标金额(元)', '投标截止时间', '开标时间']
+
+# 公告正文所在位置，依次尝试，都找不到时退回整个 body
+_CONTENT_PATHS = [
+    etree.XPath('//div[contains(@class, "vF_detail_content")]'),
+    etree.XPath('//div[contains(@class, "vF_deail_maincontent")]'),
+    etree.XPath('//body'),
+]
+
+# 2025年07月31日 09点30分 / 2025-07-31 09:30 等日期时间写法
+_DATETIME = r'(\d{4})\s*[年\-/.]\s*(\d{1,2})\s*[月\-/.]\s*(\d{1,2})\s*日?(?:\s*(\d{1,2})\s*[:：点时]\s*(\d{1,2})\s*分?)?'
+# 标签与金额之间允许换行，以及同一行内的 "（人民币）"、"￥"、"（万元）" 等说明
+_AMOUNT = r'\s*([^\d\n]{0,16}?)[ \t]*([\d,，]+(?:\.\d+)?)\s*[（(]?\s*(万元|元)?'
+
+_PATTERNS = {
+    'project_code': re.compile(r'项目编号\s*[：:]\s*([A-Za-z0-9\[\]【】（）()\-_/.#]+)'),
+    'budget': re.compile(r'预算金额\s*[：:]?' + _AMOUNT),
+    'winner': re.compile(r'(?:中标|成交|中标（成交）)?(?:供应商|中标人|成交人)(?:名称)?\s*[：:]\s*([^\s，,；;。:：]+)'),
+    'amount': re.compile(r'(?:中标|成交|中标（成交）)(?:金额|价格|总价|价)\s*[：:]?' + _AMOUNT),
+    'deadline': re.compile(r'(?:提交投标文件|投标|提交响应文件|响应文件提交|递交响应文件|提交首次响应文件)?截止时间\s*[：:]\s*'
+                           + _DATETIME),
+    'open_time': re.compile(r'开标时间\s*[：:]\s*' + _DATETIME),
+}
+
+
+def parse_amount(number, prefix='', unit=''):
+    """把金额文本转换为以元为单位的数值，"万元" 出现在数字前后都按万元换算"""
+    try:
+        value = float(number.replace(',', '').replace('，', ''))
+    except ValueError:
+        return None
+    if '万' in (unit or '') or '万' in (prefix or ''):
+        value *= 10000
+    return round(value, 2)
+
+
+def _format_datetime(groups):
+    year, month, day, hour, minute = groups
+    text = f"{year}-{int(month):02d}-{int(day):02d}"
+    if hour is not None:
+        text += f" {int(hour):02d}:{int(minute):02d}"
+    return text
+
+
+def page_text(tree):
+    """详情页正文文本，各段之间以换行分隔"""
+    nodes = []
+    for path in _CONTENT_PATHS:
+        nodes = path(tree)
+        if nodes:
+            break
+    return '\n'.join(text.strip() for node in nodes for text in node.itertext() if text.strip())
+
+
+def extract_detail_fields(text):
+    """从详情页正文中提取结构化字段，返回只含找到的字段的字典"""
+    fields = {}
+    match = _PATTERNS['project_code'].search(text)
+    if match:
+        fields['project_code'] = match.group(1)
+    for name in ('budget', 'amount'):
+        match = _PATTERNS[name].search(text)
+        if match:
+            value = parse_amount(match.group(2), match.group(1), match.group(3))
+            if value is not None:
+                fields[name] = value
+    match = _PATTERNS['winner'].search(text)
+    if match:
+        fields['winner'] = match.group(1)
+    for name in ('deadline', 'open_time'):
+        match = _PATTERNS[name].search(text)
+        if match:
+            fields[name] = _format_datetime(match.groups())
+    return fields
+
+
+def detail_to_row(record):
+    """与 DETAIL_HEAD 对应的导出列，没有详情时为空"""
+    detail = record.detail or {}
+    return [detail.get(name, '') for name in DETAIL_FIELDS]
+
+
+class DetailFetcher(object):
+    """
+    详情页抓取器。
+
+    workers 为同时抓取的详情页数（配置 detail_workers）；session、limiter 和 cache 未提供时
+    按配置各自创建，与列表抓取互不影响。单个详情页失败只记录日志，对应记录的 detail 保持为 None。
+    """
+
+    def __init__(self, config, session=None, limiter=None, cache=None, log=None):
+        self.config = config
+        self.search_url = config.get('search_url', SEARCH_URL)
+        self.workers = max(1, int(config.get('detail_workers', DEFAULT_WORKERS)))
+        self.owns_session = session is None
+        self.session = session if session is not None else create_session(dict(config, concurrency=self.workers))
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(config.get('detail_min_delay', DEFAULT_MIN_DELAY),
+                                          config.get('detail_max_delay', DEFAULT_MAX_DELAY), burst=self.workers)
+        self.limiter = limiter
+        self.owns_cache = cache is None
+        self.cache = cache if cache is not None else ResponseCache.from_config(config)
+        self.cache_ttl = float(config.get('detail_cache_ttl', DEFAULT_CACHE_TTL))
+        self.log = log or (lambda message: None)
+        self.is_running = True
+        self.fetched = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def stop(self):
+        self.is_running = False
+
+    def close(self):
+        if self.owns_cache and self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.owns_session:
+            try:
+                self.session.close()
+            except Exception:
+                pass
+
+    def list_page_url(self, page_index):
+        """记录所在的列表页地址，作为详情页请求的来源页"""
+        params = build_params(self.config, max(1, page_index or 1))
+        return requests.Request('GET', self.search_url, params=params).prepare().url
+
+    def fetch(self, url, referer=None):
+        """抓取详情页，返回文档树"""
+        resp = self.cache.get(url) if self.cache is not None else None
+        if resp is None:
+            waited = self.limiter.acquire(lambda: not self.is_running)
+            if waited is None or not self.is_running:
+                raise CrawlStopped()
+            started = time.monotonic()
+            try:
+                resp = self.session.get(url, headers=get_request_headers(referer, url), timeout=30)
+            except Exception:
+                self.limiter.feedback(error=True)
+                raise
+            self.limiter.feedback(resp.status_code, time.monotonic() - started)
+            if self.cache is not None and resp.status_code == 200:
+                self.cache.put(url, None, resp, ttl=self.cache_ttl)
+        resp.raise_for_status()
+        return etree.HTML(resp.content.decode('utf-8', errors='replace'))
+
+    def fetch_detail(self, record):
+        """抓取记录的详情页并写入 record.detail，返回该记录"""
+        if not self.is_running or not record.href:
+            return record
+        try:
+            record.detail = extract_detail_fields(page_text(self.fetch(record.href, self.list_page_url(record.page))))
+        except CrawlStopped:
+            return record
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+            self.log(f"详情页抓取失败，跳过: {record.href} {str(e)[:50]}")
+            return record
+        with self.lock:
+            self.fetched += 1
+            if self.fetched % 50 == 0:
+                self.log(f"已抓取 {self.fetched} 个详情页")
+        return record
+
+    def enrich(self, records):
+        """
+        逐条产出补充了详情字段的记录，顺序与输入一致。
+
+        输入的记录流在后台线程中读取（列表抓取不必等待详情页），
+        已提交但尚未产出的记录最多为 workers 的4倍。关闭本生成器时等待后台线程结束输入的记录流，
+        之后才能关闭引擎、缓存和断点日志。
+        """
+        window = queue.Queue(maxsize=self.workers * 4)
+        done = object()
+        closing = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        def put(item):
+            while not closing.is_set():
+                try:
+                    window.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            try:
+                for record in records:
+                    if closing.is_set() or not self.is_running:
+                        break
+                    if not put(executor.submit(self.fetch_detail, record)):
+                        break
+            except BaseException as e:
+                put(e)
+            finally:
+                # 在本线程中结束输入的记录流，调用者关闭引擎和断点日志时列表抓取已经结束
+                close = getattr(records, 'close', None)
+                if close is not None:
+                    close()
+            put(done)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            while True:
+                item = window.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item.result()
+        finally:
+            closing.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            feeder.join()
+            # 已开始的详情页请求结束后才返回，随后关闭抓取器时缓存不再被使用
+            executor.shutdown(wait=True)
+            self.log(f"详情页抓取结束：成功 {self.fetched} 个，失败 {self.failed} 个")
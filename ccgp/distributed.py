@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+多节点分布式回填。
+
+协调节点（Coordinator）把日期区间按天或按周拆成分片任务发布到任务队列（ccgp.workqueue），
+各机器上的抓取节点（QueueWorker）领取任务、抓取并提交结果：
+
+- 分片任务先抓取第1页得到总页数，页数超过 pages_per_task 时把其余页面按每 pages_per_task 页
+  发布为页码区间任务，由其他节点并行抓取，自己只抓前 pages_per_task 页；
+- 抓取期间每隔租约时长的三分之一续约一次；续约失败说明任务已被收回，立即停止抓取；
+- 有页面最终失败的任务报告失败，放回队列由其他节点重试，领取次数达到上限后标记为失败。
+
+任务中只包含查询条件，请求间隔、代理、缓存等设置取各抓取节点自己的配置。
+所有任务完成后，协调节点按分片和页码顺序读出结果，按详情链接去重后输出。
+"""
+
+import os
+import socket
+import threading
+import time
+
+from .cache import ResponseCache
+from .engine import CrawlEngine, create_session, query_fingerprint
+from .parsepool import ParserPool
+from .proxypool import ProxyPool
+from .ratelimit import AdaptiveRateLimiter
+from .record import Announcement
+from .retry import CircuitBreaker
+from .shard import shard_id, split_date_range
+from .store import record_key
+
+DEFAULT_PAGES_PER_TASK = 50
+DEFAULT_LEASE = 300
+DEFAULT_POLL = 10
+
+# 任务中携带的查询条件，其余设置由抓取节点决定
+QUERY_KEYS = ['keyword', 'buyer_name', 'agent_name', 'zone_id', 'bid_type', 'start_date', 'end_date', 'time_type']
+
+
+def task_key(shard, first_page):
+    """任务键：分片标识/起始页码，补零后按字符串排序即为分片和页码顺序"""
+    return f"{shard}/{first_page:06d}"
+
+
+def page_range_tasks(query, shard, first_page, page_count, pages_per_task):
+    """把 first_page..page_count 按每 pages_per_task 页拆成页码区间任务"""
+    tasks = []
+    for start in range(first_page, page_count + 1, pages_per_task):
+        end = min(start + pages_per_task - 1, page_count)
+        tasks.append((task_key(shard, start), {'query': query, 'shard': shard, 'pages': [start, end]}))
+    return tasks
+
+
+class Coordinator(object):
+    """
+    分布式回填的协调节点：publish() 发布分片任务，wait() 等待全部任务结束，iter_records() 读出合并结果。
+
+    job 为作业名，默认由查询条件、日期区间和分片单位生成，同一回填重复运行时不会重复发布任务。
+    """
+
+    def __init__(self, queue, config, unit='day', pages_per_task=DEFAULT_PAGES_PER_TASK, job=None, log=None):
+        self.queue = queue
+        self.query = {k: config[k] for k in QUERY_KEYS if k in config}
+        self.query['time_type'] = 6
+        self.unit = unit
+        self.pages_per_task = max(1, int(pages_per_task))
+        self.shards = split_date_range(config['start_date'], config['end_date'], unit)
+        self.job = job or '_'.join([query_fingerprint(config), shard_id(self.shards[0][0], self.shards[-1][1]), unit])
+        self.log = log or (lambda message: None)
+
+    def publish(self):
+        """发布分片任务，返回新增的任务数"""
+        tasks = []
+        for start_date, end_date in self.shards:
+            shard = shard_id(start_date, end_date)
+            query = dict(self.query, start_date=start_date, end_date=end_date)
+            tasks.append((task_key(shard, 1), {'query': query, 'shard': shard, 'pages': [1, self.pages_per_task],
+                                               'split': self.pages_per_task}))
+        meta = {'query': self.query, 'unit': self.unit, 'pages_per_task': self.pages_per_task}
+        added = self.queue.publish(self.job, tasks, meta)
+        self.log(f"作业 {self.job}：{len(self.shards)} 个分片，新发布 {added} 个任务")
+        return added
+
+    def wait(self, poll=DEFAULT_POLL, should_stop=None):
+        """等待作业中没有待处理和进行中的任务，返回各状态的任务数；should_stop() 为真时提前返回"""
+        last = None
+        while True:
+            counts = self.queue.status(self.job)
+            summary = (f"待处理 {counts['pending']}，进行中 {counts['leased']}（租约过期 {counts['expired']}），"
+                       f"完成 {counts['done']}，失败 {counts['failed']}")
+            if summary != last:
+                self.log(summary)
+                last = summary
+            if counts['pending'] == 0 and counts['leased'] == 0:
+                return counts
+            deadline = time.monotonic() + poll
+            while time.monotonic() < deadline:
+                if should_stop is not None and should_stop():
+                    return counts
+                time.sleep(min(1.0, poll))
+
+    def failures(self):
+        return self.queue.failures(self.job)
+
+    def iter_records(self):
+        """按分片和页码顺序读出结果；列表在抓取期间有新公告时相邻页面可能重复，按详情链接去重"""
+        seen = set()
+        for key, rows in self.queue.iter_results(self.job):
+            for row in rows:
+                record = Announcement.from_dict(row)
+                k = record_key(record)
+                if k in seen:
+                    continue
+                seen.add(k)
+                yield record
+
+
+class QueueWorker(object):
+    """
+    抓取节点：workers 个线程不断领取并执行任务，线程间共享网络会话、限速器、熔断器、解析进程池和代理池。
+
+    config 为本节点的配置（请求间隔、代理、缓存等），任务的查询条件覆盖其中的同名字段。
+    run(exit_when_idle=True) 在队列中没有待处理和进行中的任务时返回，否则一直等待新任务直到 stop()。
+    """
+
+    def __init__(self, queue, config, worker_id=None, workers=1, lease=DEFAULT_LEASE, log=None, metrics=None,
+                 profiler=None):
+        self.queue = queue
+        self.config = config
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.workers = max(1, int(workers))
+        self.lease = max(10.0, float(lease))
+        self.log = log or (lambda message: None)
+        self.session = create_session(config)
+        self.limiter = AdaptiveRateLimiter.from_config(dict(config, concurrency=self.workers))
+        self.cache = ResponseCache.from_config(config)
+        self.breaker = CircuitBreaker.from_config(config)
+        self.parser_pool = ParserPool.from_config(config)
+        self.proxy_pool = ProxyPool.from_config(config, self.log)
+        self.metrics = metrics
+        self.profiler = profiler
+        self.is_running = True
+        self.stopped = threading.Event()
+        # 正在执行的任务及其引擎，由续约线程定期续约
+        self.active = {}
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    def stop(self):
+        self.is_running = False
+        self.stopped.set()
+        with self.lock:
+            engines = [engine for _, engine in self.active.values()]
+        for engine in engines:
+            engine.stop()
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+        if self.parser_pool is not None:
+            self.parser_pool.close()
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+    def _renew_leases(self):
+        while not self.stopped.wait(self.lease / 3):
+            with self.lock:
+                active = list(self.active.values())
+            for task, engine in active:
+                try:
+                    renewed = self.queue.renew(task, self.worker_id, self.lease)
+                except Exception as e:
+                    # 队列暂时无法访问，下次再试；租约过期前恢复即可
+                    self.log(f"[{task.key}] 续约失败: {e}")
+                    continue
+                if not renewed:
+                    self.log(f"[{task.key}] 租约已被收回，停止抓取")
+                    engine.lost = True
+                    engine.stop()
+
+    def _run_task(self, task):
+        payload = task.payload
+        config = dict(self.config, **payload['query'])
+        first, last = payload['pages']
+        split = payload.get('split')
+        published = []
+
+        def on_progress(curr_page, page_count):
+            # 分片任务抓到第1页后即发布其余页面，其他节点不必等本任务结束
+            if split and not published and page_count > last:
+                published.append(True)
+                tasks = page_range_tasks(payload['query'], payload['shard'], last + 1, page_count, split)
+                added = self.queue.publish(task.job, tasks)
+                self.log(f"[{task.key}] 共 {page_count} 页，发布 {added} 个页码区间任务")
+
+        engine = CrawlEngine(config, session=self.session, limiter=self.limiter, cache=self.cache,
+                             breaker=self.breaker, parser_pool=self.parser_pool, proxy_pool=self.proxy_pool,
+                             pages=range(first, last + 1), progress=on_progress, metrics=self.metrics,
+                             profiler=self.profiler,
+                             log=lambda message: self.log(f"[{task.key}] {message}"))
+        engine.lost = False
+        with self.lock:
+            self.active[task.id] = (task, engine)
+        try:
+            records = [record.to_dict() for record in engine.iter_records()]
+        finally:
+            with self.lock:
+                self.active.pop(task.id, None)
+            engine.close()
+
+        if engine.lost:
+            return
+        if not engine.is_running or not self.is_running:
+            self.queue.release(task, self.worker_id)
+            return
+        if engine.failed_pages:
+            self.failed += 1
+            self.queue.fail(task, self.worker_id, f"第 {engine.failed_pages} 页抓取失败")
+            return
+        if self.queue.complete(task, self.worker_id, records):
+            self.completed += 1
+            self.log(f"[{task.key}] 完成，{len(records)} 条数据")
+        else:
+            self.log(f"[{task.key}] 租约已被收回，结果丢弃")
+
+    def _loop(self, exit_when_idle, poll):
+        while self.is_running:
+            try:
+                task = self.queue.claim(self.worker_id, self.lease)
+            except Exception as e:
+                # 共享目录暂时不可用或队列文件被长时间锁定
+                self.log(f"领取任务失败: {e}")
+                self.stopped.wait(poll)
+                continue
+            if task is None:
+                if exit_when_idle:
+                    counts = self.queue.status()
+                    if counts['pending'] == 0 and counts['leased'] == 0:
+                        return
+                # 其他节点的任务可能随后拆出页码区间任务或租约过期，稍后再领取
+                self.stopped.wait(poll)
+                continue
+            if task.attempts > 1:
+                self.log(f"[{task.key}] 第 {task.attempts} 次领取")
+            try:
+                self._run_task(task)
+            except Exception as e:
+                self.failed += 1
+                self.log(f"[{task.key}] 执行失败: {e}")
+                self.queue.fail(task, self.worker_id, e)
+
+    def run(self, exit_when_idle=False, poll=DEFAULT_POLL):
+        """执行任务直到 stop()；exit_when_idle 为 True 时队列空闲即返回"""
+        self.log(f"抓取节点 {self.worker_id} 开始领取任务（{self.workers} 个线程，租约 {self.lease:.0f} 秒）")
+        renewer = threading.Thread(target=self._renew_leases, daemon=True)
+        renewer.start()
+        threads = [threading.Thread(target=self._loop, args=(exit_when_idle, poll), daemon=True)
+                   for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            # 分段等待，主线程才能及时响应 Ctrl+C
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+            raise
+        finally:
+            self.stopped.set()
+        self.log(f"抓取节点 {self.worker_id} 结束：完成 {self.completed} 个任务，失败 {self.failed} 个")
@@ -0,0 +1,628 @@
+# -*- coding: utf-8 -*-
+"""
+中国政府采购网公告抓取引擎。
+
+引擎本身不依赖任何图形界面框架，GUI、命令行脚本和定时任务都通过
+CrawlEngine.iter_records() 以生成器的方式逐条获取解析后的公告记录。
+"""
+
+import hashlib
+import json
+import math
+import random
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import ResponseCache
+# 列表页解析函数也从本模块导出，兼容原有的导入方式
+from .listpage import (LIST_XPATH, TOTAL_XPATH, list_items, parse_document, parse_info,  # noqa: F401
+                       parse_items, parse_list_item, parse_total)
+from .parsepool import ParserPool, build_records
+from .profiling import stage_timer
+from .proxypool import PROXY_FAILURE_STATUS, ProxyPool
+from .ratelimit import AdaptiveRateLimiter
+from .retry import CircuitBreaker, RetryPolicy, is_retryable, is_server_failure, sleep_unless
+
+# 搜索接口地址
+SEARCH_URL = 'http://search.ccgp.gov.cn/bxsearch?'
+
+# 搜索结果每页固定20条
+PAGE_SIZE = 20
+
+# 默认逐页顺序抓取；大于1时第2页起按该并发数同时抓取
+DEFAULT_CONCURRENCY = 1
+
+# 导出表头: 序号、关键字、名称、日期、采购人、代理机构、公告类型、详情、项目概况
+HEAD = ['序号', '关键字', '名称', '日期', '采购人', '代理机构', '公告类型', '详情', '项目概况']
+
+BID_TYPE_MAP = {
+    "0": "所有", "1": "公开招标", "2": "询价公告", "3": "竞争性谈判",
+    "4": "单一来源", "5": "资格预审", "6": "邀请公告", "7": "中标公告",
+    "8": "更正公告", "9": "其他公告", "10": "竞争性磋商", "11": "成交公告",
+    "12": "废标公告"
+}
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/119.0'
+]
+
+
+class CrawlStopped(Exception):
+    """抓取在等待或请求过程中被停止"""
+
+
+def get_bid_type_name(bid_type_code):
+    """根据公告类型代码获取对应的名称"""
+    return BID_TYPE_MAP.get(str(bid_type_code), "未知类型")
+
+
+def get_request_headers(referer=None, url=None):
+    """
+    生成模拟浏览器的请求头。Host 取自请求地址 url（列表页在 search.ccgp.gov.cn，详情页在 www.ccgp.gov.cn），
+    未给出 referer 时以该站点首页作为来源页。
+    """
+    parts = urlsplit(url or SEARCH_URL)
+    return {
+        "User-Agent": random.choice(USER_AGENTS),
+        "Host": parts.netloc,
+        "Referer": referer if referer else f"{parts.scheme}://{parts.netloc}/",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+        "Accept-Encoding": "gzip, deflate",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Cache-Control": "max-age=0"
+    }
+
+
+def get_concurrency(config):
+    """读取并发页数配置，至少为1"""
+    try:
+        return max(1, int(config.get('concurrency', DEFAULT_CONCURRENCY)))
+    except (ValueError, TypeError):
+        return DEFAULT_CONCURRENCY
+
+
+def query_fingerprint(config):
+    """不含日期和页码的查询条件摘要，同一查询在不同时间窗口下保持不变"""
+    fields = ['keyword', 'buyer_name', 'agent_name', 'zone_id', 'bid_type']
+    text = json.dumps([str(config.get(k, '')) for k in fields], ensure_ascii=False)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:10]
+
+
+def create_session(config):
+    """根据配置创建网络会话（含代理设置）"""
+    session = requests.Session()
+    # 禁用环境变量中的代理以避免连接问题
+    session.trust_env = False
+    # 连接池大小不小于并发数，避免并发抓取时连接被反复丢弃重建
+    pool_size = max(10, get_concurrency(config))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if config.get('use_proxy', False):
+        proxy_host = config.get('proxy_host', '127.0.0.1')
+        proxy_port = config.get('proxy_port', 7890)
+        proxy_url = f"http://{proxy_host}:{proxy_port}"
+        session.proxies = {'http': proxy_url, 'https': proxy_url}
+    else:
+        session.proxies = {}
+    return session
+
+
+def build_params(config, page_index=1):
+    """把配置转换为搜索接口的查询参数"""
+    params = {
+        'searchtype': 1,
+        'page_index': page_index,
+        'bidSort': 0,
+        'buyerName': config.get('buyer_name', ''),
+        'projectId': '',
+        'pinMu': 0,
+        'bidType': config.get('bid_type', '0'),
+        'dbselect': 'bidx',
+        'kw': config.get('keyword', ''),
+        'start_time': config.get('start_date', ''),
+        'end_time': config.get('end_date', ''),
+        'timeType': config.get('time_type', 6),
+        'displayZone': '',
+        'zoneId': config.get('zone_id', ''),
+        'pppStatus': 0,
+        'agentName': config.get('agent_name', '')
+    }
+
+    # 简单清理空参数，但保留重要参数
+    cleaned_params = {}
+    for k, v in params.items():
+        if k == 'kw':
+            # 如果用户没有输入关键字，使用空字符串而不是默认值
+            cleaned_params[k] = (v or '').strip()
+        elif k == 'dbselect':
+            cleaned_params[k] = 'bidx'
+        elif k in ['searchtype', 'page_index', 'bidSort', 'pinMu', 'pppStatus', 'timeType']:
+            # 这些参数转换为整数
+            try:
+                cleaned_params[k] = int(v) if v != '' else 0
+            except (ValueError, TypeError):
+                cleaned_params[k] = 0
+        elif k == 'bidType':
+            # bidType保持字符串格式
+            cleaned_params[k] = str(v) if v is not None else '0'
+        elif k in ['start_time', 'end_time']:
+            # 时间参数必须保留
+            cleaned_params[k] = v
+        elif v is not None and str(v).strip():
+            cleaned_params[k] = v
+    return cleaned_params
+
+
+def record_to_row(seq, record):
+    """把记录转换为与HEAD对应的导出行"""
+    return [seq, record.keyword, record.title, record.date, record.buyer,
+            record.agent, record.bid_type_name, record.href, record.summary]
+
+
+class CrawlEngine(object):
+    """
+    单个查询的抓取引擎。
+
+    config 与 GUI 的配置字典格式一致；log 和 progress 为可选回调，
+    分别用于输出日志文本和汇报 (当前页, 总页数)。debug 用于请求参数、逐页进度等较琐碎的日志，
+    未提供时与 log 相同。
+    session、limiter、cache 和 breaker 可由多个引擎共享，未提供时按配置各自创建。
+    page_filter(该页记录列表) 返回 (要产出的记录, 是否停止翻页)，用于增量抓取；
+    设置后逐页顺序抓取，避免并发预取用不到的页面。
+
+    checkpoint 为 ccgp.checkpoint.CrawlCheckpoint（断点日志）时，先产出日志中已完成页面的记录，
+    只抓取其余页面，每页的记录全部产出后记入日志。
+
+    单页请求失败时按 RetryPolicy 重试；重试后仍失败的页面（第1页除外）放入 failed_pages，
+    其余页面照常抓取，全部页面结束后再统一重试一轮。最终仍失败的页码保留在 failed_pages 中，
+    此时 completed 为 False。
+
+    并发抓取（concurrency 大于1）且配置了 parse_workers 时，并发抓取的页面交给 parser_pool
+    （ccgp.parsepool.ParserPool，可共享）在子进程中解析，抓取线程不再等待解析。
+
+    配置了 proxies 时，请求经 proxy_pool（ccgp.proxypool.ProxyPool，可共享）选出的出口发出，
+    请求间隔由各出口自己的限速器控制，不再使用 limiter。
+
+    metrics（ccgp.metrics.CrawlMetrics，可共享）不为 None 时记录请求耗时、状态码、下载字节数、
+    各阶段耗时和在途请求数；profiler（ccgp.profiling.Profiler）不为 None 时另按阶段和页码记录墙钟和 CPU 时间。
+
+    给出 pages 时只抓取其中的页码（分布式抓取中的页码区间任务）；pages 不含第1页时
+    不再请求第1页确定总页数。
+    """
+
+    def __init__(self, config, session=None, log=None, progress=None, limiter=None, page_filter=None,
+                 cache=None, breaker=None, checkpoint=None, debug=None, parser_pool=None,
+                 proxy_pool=None, pages=None, metrics=None, profiler=None):
+        self.config = config
+        self.metrics = metrics
+        self._timed = stage_timer(metrics, profiler)
+        self.pages = set(pages) if pages is not None else None
+        self.search_url = config.get('search_url', SEARCH_URL)
+        # 只关闭自己创建的会话，共享会话由创建者负责关闭
+        self.owns_session = session is None
+        self.session = session if session is not None else create_session(config)
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter.from_config(config)
+        self.owns_cache = cache is None
+        self.cache = cache if cache is not None else ResponseCache.from_config(config)
+        self.retry = RetryPolicy.from_config(config)
+        self.breaker = breaker if breaker is not None else CircuitBreaker.from_config(config)
+        self.log = log or (lambda message: None)
+        self.debug = debug or self.log
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool.from_config(config, self.log)
+        self.progress = progress or (lambda current, total: None)
+        self.page_filter = page_filter
+        self.checkpoint = checkpoint
+        self.concurrency = 1 if page_filter is not None else get_concurrency(config)
+        # 逐页抓取时解析与请求交替进行，用不到解析进程池
+        self.owns_parser_pool = parser_pool is None
+        if parser_pool is None and self.concurrency > 1:
+            parser_pool = ParserPool.from_config(config)
+        self.parser_pool = parser_pool
+        self.is_running = True
+        self.completed = False
+        self.total = 0
+        self.page_count = 0
+        self.failed_pages = []
+
+    def stop(self):
+        """
+        请求停止抓取，当前请求结束后生成器即退出。可从其他线程调用：只关闭网络会话以尽快结束等待中的连接，
+        缓存和解析进程池仍可能被抓取线程使用，由抓取线程结束后调用 close() 释放。
+        """
+        self.is_running = False
+        self._close_session()
+
+    def close(self):
+        """释放缓存、解析进程池和网络会话；在抓取线程（生成器所在线程）结束后调用"""
+        if self.owns_cache and self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.owns_parser_pool and self.parser_pool is not None:
+            self.parser_pool.close()
+        self._close_session()
+
+    def _close_session(self):
+        if not self.owns_session:
+            return
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+    def _open_url(self, url, params, refer=None):
+        # 命中缓存时不需要等待请求间隔；离线模式下未命中会抛出 CacheMiss
+        if self.cache is not None:
+            cached = self.cache.get(url, params)
+            if cached is not None:
+                if self.metrics is not None:
+                    self.metrics.inc('cache_hits_total')
+                return cached
+
+        headers = get_request_headers(refer, url)
+        page = params.get('page_index') if params else None
+        proxy = None
+        with self._timed('sleep', page):
+            # 网站大面积出错时，所有请求在熔断器处暂停
+            probe = self.breaker.wait(lambda: not self.is_running)
+            if not probe:
+                raise CrawlStopped()
+            if self.proxy_pool is not None:
+                acquired = self.proxy_pool.acquire(lambda: not self.is_running)
+                proxy, waited = acquired if acquired is not None else (None, None)
+            else:
+                waited = self.limiter.acquire(lambda: not self.is_running)
+        if waited is None or not self.is_running:
+            if proxy is not None:
+                self.proxy_pool.release(proxy)
+            # 试探请求没有发出，交还给其他引擎（熔断器可能由多个引擎共享）
+            if probe == CircuitBreaker.PROBE:
+                self.breaker.release_probe()
+            raise CrawlStopped()
+        if waited >= 1:
+            self.debug(f"等待 {waited:.1f} 秒...")
+
+        started = time.monotonic()
+        if self.metrics is not None:
+            self.metrics.adjust('requests_in_flight', 1, '正在进行的列表页请求数')
+        try:
+            with self._timed('fetch', page):
+                if proxy is not None:
+                    resp = self.session.get(url, headers=headers, params=params, timeout=30, proxies=proxy.proxies)
+                else:
+                    resp = self.session.get(url, headers=headers, params=params, timeout=30)
+        except Exception as e:
+            if self.metrics is not None:
+                self._observe_request(None, started)
+            if proxy is not None:
+                self.proxy_pool.feedback(proxy, error=True)
+            else:
+                self.limiter.feedback(error=True)
+            # 连不上代理是该出口的问题，不计入整个网站的熔断；
+            # 试探请求因此没有结果时要交还，否则熔断器一直停在半开状态
+            if not isinstance(e, requests.exceptions.ProxyError):
+                self._record_failure()
+            elif probe == CircuitBreaker.PROBE:
+                self.breaker.release_probe()
+            if not self.is_running:
+                raise CrawlStopped()
+            self.log(f"网络错误: {str(e)[:30]}")
+            raise
+        if self.metrics is not None:
+            self._observe_request(resp.status_code, started, len(resp.content))
+        if proxy is not None:
+            self.proxy_pool.feedback(proxy, resp.status_code, time.monotonic() - started)
+        else:
+            self.limiter.feedback(resp.status_code, time.monotonic() - started)
+        if proxy is not None and resp.status_code in PROXY_FAILURE_STATUS:
+            # 针对该出口 IP 的拒绝或限流，由代理池处理；看不出网站是否恢复，交还试探机会
+            if probe == CircuitBreaker.PROBE:
+                self.breaker.release_probe()
+        elif is_server_failure(resp.status_code):
+            self._record_failure()
+        else:
+            self.breaker.record_success()
+        if self.cache is not None and resp.status_code == 200:
+            self.cache.put(url, params, resp)
+        return resp
+
+    def _observe_request(self, status, started, size=0):
+        elapsed = time.monotonic() - started
+        self.metrics.adjust('requests_in_flight', -1)
+        self.metrics.observe_request(status, elapsed, size)
+
+    def _record_failure(self):
+        cooldown = self.breaker.record_failure()
+        if cooldown is not None:
+            self.log(f"网站连续出错，所有请求暂停 {cooldown:.0f} 秒")
+
+    def fetch_page(self, page_index, referer=None, parse=True):
+        """
+        抓取并解析指定页，返回 (响应, 文档树)；可重试的错误按重试策略退避后重试。
+        parse 为 False 时不解析，文档树为 None。
+        """
+        params = build_params(self.config, page_index)
+        attempt = 0
+        while True:
+            try:
+                resp = self._open_url(self.search_url, params, referer)
+                resp.raise_for_status()
+                tree = self._parse_document(resp.content, page_index) if parse else None
+                return resp, tree
+            except CrawlStopped:
+                raise
+            except Exception as e:
+                if not self.is_running:
+                    raise CrawlStopped()
+                if attempt >= self.retry.retries or not is_retryable(e):
+                    raise
+                attempt += 1
+                delay = self.retry.delay(attempt)
+                self.log(f"第 {page_index} 页请求失败: {str(e)[:50]}，{delay:.1f} 秒后第 {attempt} 次重试")
+                with self._timed('sleep', page_index):
+                    resumed = sleep_unless(delay, lambda: not self.is_running)
+                if not resumed:
+                    raise CrawlStopped()
+
+    def _fetch_or_defer(self, page_index, referer=None, parse=True):
+        """抓取第2页及以后的页面；重试后仍失败时记入 failed_pages 并返回 None，不中断整个抓取"""
+        try:
+            return self.fetch_page(page_index, referer, parse)
+        except CrawlStopped:
+            raise
+        except Exception as e:
+            if not self.is_running:
+                raise CrawlStopped()
+            self.failed_pages.append(page_index)
+            self.log(f"第 {page_index} 页抓取失败，稍后重试: {str(e)[:50]}")
+            return None
+
+    def iter_pages(self):
+        """
+        按页码顺序生成 (页码, 文档树)，被停止时正常结束。
+        使用解析进程池时，并发抓取的页面已在子进程中解析，生成的是 (页码, 记录列表)。
+        """
+        try:
+            for page in self._iter_pages():
+                yield page
+        except CrawlStopped:
+            self.log("抓取已停止。")
+
+    def _iter_pages(self):
+        self.log(f"使用时间范围: {self.config.get('start_date', '')} 至 {self.config.get('end_date', '')}")
+        self.debug(f"API参数: {build_params(self.config)}")
+
+        done = self.checkpoint.done_pages if self.checkpoint is not None else set()
+        first = None
+        referer = None
+        if self.pages is not None and 1 not in self.pages:
+            # 总页数已由其他任务确定，只抓取指定的页码区间
+            self.page_count = max(self.pages, default=0)
+            self.log(f"抓取第 {min(self.pages, default=0)}-{self.page_count} 页")
+        elif 1 in done and self.checkpoint.page_count:
+            # 续抓时第1页已完成，总数沿用断点日志中的记录
+            self.total = self.checkpoint.total
+            self.page_count = self.checkpoint.page_count
+            self.log(f"从断点续抓：共 {self.total} 条数据、{self.page_count} 页")
+        else:
+            self.log("开始获取数据...")
+            resp, tree = self.fetch_page(1)
+            if not self.is_running:
+                return
+
+            self.total = parse_total(tree)
+            self.log(f"找到 {self.total} 条数据")
+            if self.total <= 0:
+                return
+
+            self.page_count = math.ceil(self.total / PAGE_SIZE)
+            self.log(f"总共 {self.page_count} 页数据需要抓取")
+            if self.checkpoint is not None:
+                self.checkpoint.set_total(self.total, self.page_count)
+            if 1 not in done:
+                first = tree
+            referer = resp.url
+
+        pages = [p for p in range(2, self.page_count + 1)
+                 if p not in done and (self.pages is None or p in self.pages)]
+        if done:
+            self.log(f"断点日志中已完成 {len(done)} 页，剩余 {len(pages) + (first is not None)} 页")
+
+        if first is not None:
+            self._report_page(1)
+            yield 1, first
+        if self.concurrency > 1 and pages:
+            self.log(f"并发抓取剩余页面，并发数: {self.concurrency}")
+            for curr_page, tree in self._iter_pages_concurrently(pages, referer):
+                yield curr_page, tree
+        else:
+            for curr_page in pages:
+                if not self.is_running:
+                    return
+                result = self._fetch_or_defer(curr_page, referer)
+                if not self.is_running:
+                    return
+                if result is None:
+                    continue
+                resp, tree = result
+                referer = resp.url
+                self._report_page(curr_page)
+                yield curr_page, tree
+
+        for curr_page, tree in self._retry_failed_pages(referer):
+            yield curr_page, tree
+
+    def _retry_failed_pages(self, referer):
+        """其余页面抓取完后，逐页重试之前失败的页面；仍失败的页码留在 failed_pages 中"""
+        if not self.failed_pages or not self.is_running:
+            return
+        pages, self.failed_pages = sorted(self.failed_pages), []
+        self.log(f"重试之前失败的 {len(pages)} 页: {pages}")
+        for index, curr_page in enumerate(pages):
+            if not self.is_running:
+                self.failed_pages.extend(pages[index:])
+                return
+            try:
+                resp, tree = self.fetch_page(curr_page, referer)
+            except CrawlStopped:
+                self.failed_pages.extend(pages[index:])
+                raise
+            except Exception as e:
+                self.failed_pages.append(curr_page)
+                self.log(f"第 {curr_page} 页重试后仍然失败: {str(e)[:50]}")
+                continue
+            self._report_page(curr_page)
+            yield curr_page, tree
+        if self.failed_pages:
+            self.log(f"以下页面最终抓取失败，结果不完整: {self.failed_pages}")
+
+    def _report_page(self, curr_page):
+        self.debug(f"正在抓取第 {curr_page}/{self.page_count} 页数据...")
+        self.progress(curr_page, self.page_count)
+
+    def _fetch_for_pool(self, page_index, referer):
+        """抓取一页后立即把正文提交给解析进程池，返回 (响应, 解析结果的 Future)"""
+        result = self._fetch_or_defer(page_index, referer, parse=False)
+        if result is None:
+            return None
+        resp = result[0]
+        try:
+            future = self.parser_pool.submit(resp.content, self._page_query(page_index))
+        except Exception:
+            # 进程池已关闭或损坏，由 _collect_parsed() 在本进程解析
+            future = None
+        return resp, future
+
+    def _collect_parsed(self, resp, future, page_index):
+        """等待子进程的解析结果并构造记录；子进程出错时退回在本进程解析"""
+        if future is not None:
+            try:
+                # 记入解析阶段的是抓取线程等待子进程解析的时间
+                with self._timed('parse', page_index):
+                    rows, skipped = future.result()
+            except CancelledError:
+                if not self.is_running:
+                    raise CrawlStopped()
+            except Exception as e:
+                self.log(f"解析进程出错，改为在本进程解析第 {page_index} 页: {str(e)[:50]}")
+            else:
+                for message in skipped:
+                    self.log(message)
+                return build_records(rows, self._page_query(page_index))
+        return self.parse_page(self._parse_document(resp.content, page_index), page_index)
+
+    def _iter_pages_concurrently(self, pages, referer):
+        """
+        第2页至最后一页的地址在第1页返回后即可确定，这里用线程池并发抓取 pages 中的页，
+        同时在途的请求不超过并发数的两倍，结果仍按页码顺序产出。
+        有解析进程池时，抓取线程只负责请求，产出的是子进程解析得到的记录列表。
+        """
+        pending = {}
+        next_index = 0
+        window = self.concurrency * 2
+        fetch = self._fetch_for_pool if self.parser_pool is not None else self._fetch_or_defer
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for index, curr_page in enumerate(pages):
+                    while next_index < len(pages) and next_index < index + window:
+                        page = pages[next_index]
+                        pending[page] = executor.submit(fetch, page, referer)
+                        next_index += 1
+                        self._adjust_pending(1)
+                    result = pending.pop(curr_page).result()
+                    self._adjust_pending(-1)
+                    if not self.is_running:
+                        return
+                    if result is None:
+                        continue
+                    resp, tree = result
+                    if self.parser_pool is not None:
+                        tree = self._collect_parsed(resp, tree, curr_page)
+                    self._report_page(curr_page)
+                    yield curr_page, tree
+            finally:
+                # 停止或出错时取消尚未开始的请求
+                for future in pending.values():
+                    future.cancel()
+                self._adjust_pending(-len(pending))
+
+    def _adjust_pending(self, delta):
+        if self.metrics is not None and delta:
+            self.metrics.adjust('pending_pages', delta, '已提交尚未取回的列表页数')
+
+    def _page_query(self, page_index):
+        """记录中与查询相关的字段"""
+        bid_type = str(self.config.get('bid_type', '0'))
+        return {
+            'keyword': self.config.get('keyword', ''),
+            'bid_type': bid_type,
+            'bid_type_name': get_bid_type_name(bid_type),
+            'zone_id': str(self.config.get('zone_id', '')),
+            'page': page_index,
+        }
+
+    def _parse_document(self, content, page_index=None):
+        with self._timed('parse', page_index):
+            return parse_document(content)
+
+    def parse_page(self, tree, page_index):
+        """解析一页结果，返回该页的记录列表"""
+        with self._timed('parse', page_index):
+            records, skipped = parse_items(tree, self._page_query(page_index))
+        for message in skipped:
+            self.log(message)
+        return records
+
+    def iter_records(self):
+        """
+        逐条生成解析后的公告记录（Announcement）。
+
+        记录在每页解析完成后立即产出，调用方无需等待整个查询结束即可开始处理。
+        设置了 page_filter 时，每页记录先交给它筛选，它返回停止标志后不再翻页。
+        """
+        if self.checkpoint is not None and self.checkpoint.record_count:
+            self.log(f"从断点日志读出已完成页面的 {self.checkpoint.record_count} 条数据")
+            for record in self.checkpoint.replay():
+                if not self.is_running:
+                    return
+                yield record
+        for page_index, page in self.iter_pages():
+            # 解析进程池产出的已经是记录列表
+            records = page if isinstance(page, list) else self.parse_page(page, page_index)
+            stop = False
+            if self.page_filter is not None:
+                records, stop = self.page_filter(records)
+            if self.metrics is not None:
+                self.metrics.add_page(len(records))
+            for record in records:
+                if not self.is_running:
+                    return
+                yield record
+            if self.checkpoint is not None:
+                self.checkpoint.page_done(page_index, records)
+            if stop:
+                self.log(f"第 {page_index} 页已到达上次抓取的位置，停止翻页")
+                break
+        # 没有被停止且没有最终失败的页面，才视为完整抓取了该查询
+        self.completed = self.is_running and not self.failed_pages
+        if self.proxy_pool is not None:
+            for line in self.proxy_pool.summary():
+                self.debug(f"代理 {line}")
+
+
+def iter_records(config, log=None, progress=None):
+    """便捷函数：按配置抓取并逐条生成公告记录"""
+    engine = CrawlEngine(config, log=log, progress=progress)
+    try:
+        for record in engine.iter_records():
+            yield record
+    finally:
+        engine.close()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+抓取结果导出（Excel / CSV / JSON Lines）。
+"""
+
+import csv
+import json
+import os
+import sys
+
+from .detail import DETAIL_HEAD, detail_to_row
+from .engine import HEAD, record_to_row
+
+
+def resolve_output_path(save_path, filename, ext='.xlsx'):
+    """拼接保存目录和文件名，保存目录为空时使用当前目录"""
+    if save_path and save_path.strip():
+        return os.path.join(save_path, filename + ext)
+    return filename + ext
+
+
+class ExcelSink(object):
+    """
+    边抓取边写入的Excel文件。
+
+    以 xlsxwriter 的 constant_memory 模式打开工作簿，每次追加一整行并立即写入临时文件，
+    内存占用不随行数增长；close() 时生成最终的 .xlsx 文件，抓取中途停止时同样调用 close()
+    即可得到包含已抓取数据的完整文件。
+
+    详情链接写为超链接，超链接信息需保留到 close() 时才能写出；Excel 每个工作表最多
+    MAX_LINKS 个超链接，超出后的链接按普通文本写入，因此内存占用有上限。
+    """
+
+    MAX_LINKS = 65530
+
+    def __init__(self, full_path, head=HEAD, sheetname='中标公告'):
+        import xlsxwriter
+
+        self.full_path = full_path
+        self.workbook = xlsxwriter.Workbook(full_path, {'constant_memory': True})
+        self.worksheet = self.workbook.add_worksheet(sheetname)
+        self.worksheet.write_row(0, 0, head)
+        self.count = 0
+
+    def append(self, row):
+        self.count += 1
+        if self.worksheet.strings_to_urls and self.worksheet.hlink_count >= self.MAX_LINKS:
+            self.worksheet.strings_to_urls = False
+        self.worksheet.write_row(self.count, 0, row)
+
+    def close(self):
+        if self.workbook is not None:
+            self.workbook.close()
+            self.workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_excel(data, head, full_path, sheetname='中标公告'):
+    """将表头和数据行写入新的Excel文件"""
+    with ExcelSink(full_path, head, sheetname) as sink:
+        for rowdata in data:
+            sink.append(rowdata)
+
+
+def write_csv(data, head, full_path):
+    """将表头和数据行写入CSV文件（带BOM，便于Excel直接打开）"""
+    with open(full_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(head)
+        writer.writerows(data)
+
+
+def write_jsonl_record(fp, record):
+    """以JSON Lines格式写出单条记录并立即刷新，供下游流式消费"""
+    fp.write(json.dumps(record.to_dict(), ensure_ascii=False) + '\n')
+    fp.flush()
+
+
+class RecordWriter(object):
+    """
+    按输出格式逐条写出记录。
+
+    三种格式都在抓取过程中逐条写入：jsonl 每条立即刷新，full_path 为 None 时写到标准输出；
+    csv 逐行写入文件；xlsx 通过 ExcelSink 以常量内存模式追加。
+    中断后调用 close() 即可得到包含已抓取数据的有效文件。
+    details 为 True 时，xlsx / csv 在表头后追加详情字段列（DETAIL_HEAD）。
+    """
+
+    def __init__(self, fmt, full_path=None, details=False):
+        self.fmt = fmt
+        self.full_path = full_path
+        self.details = details
+        self.head = HEAD + DETAIL_HEAD if details else HEAD
+        self.count = 0
+        self.fp = None
+        self.csv_writer = None
+        self.sink = None
+        if fmt == 'jsonl':
+            self.fp = open(full_path, 'w', encoding='utf-8') if full_path else sys.stdout
+        elif fmt == 'csv':
+            self.fp = open(full_path, 'w', encoding='utf-8-sig', newline='')
+            self.csv_writer = csv.writer(self.fp)
+            self.csv_writer.writerow(self.head)
+        elif fmt == 'xlsx':
+            self.sink = ExcelSink(full_path, self.head)
+        else:
+            raise ValueError(f"不支持的输出格式: {fmt}")
+
+    def row(self, record):
+        row = record_to_row(self.count, record)
+        if self.details:
+            row += detail_to_row(record)
+        return row
+
+    def write(self, record):
+        self.count += 1
+        if self.sink is not None:
+            self.sink.append(self.row(record))
+        elif self.csv_writer is not None:
+            self.csv_writer.writerow(self.row(record))
+        else:
+            write_jsonl_record(self.fp, record)
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
+        if self.fp is not None:
+            if self.fp is not sys.stdout:
+                self.fp.close()
+            self.fp = None
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+增量抓取。
+
+搜索结果按发布时间从新到旧排列。每个查询（按 query_fingerprint 区分，不含日期）
+在公告库中记录一个高水位：上次抓取到的最新公告。再次抓取时，一旦某页出现
+高水位公告，或整页都是库中已有的公告，就不再继续翻页。每小时轮询同一查询时，
+通常只需要请求第1页。
+"""
+
+from .engine import query_fingerprint
+from .store import record_key
+
+
+class IncrementalTracker(object):
+    """
+    作为 CrawlEngine 的 page_filter 使用：过滤掉已知公告，并在到达上次位置时要求停止翻页。
+
+    完整抓取后调用 mark_completed()，新记录写入公告库后再调用 commit() 更新高水位；
+    抓取中途出错或被停止时不更新，下次仍从上一个高水位开始判断。
+    """
+
+    def __init__(self, store, config):
+        self.store = store
+        self.fingerprint = query_fingerprint(config)
+        self.watermark = store.get_watermark(self.fingerprint)
+        self.newest = None
+        self.new_count = 0
+        self.completed = False
+
+    def __call__(self, records):
+        if not records:
+            return records, False
+        if self.newest is None:
+            # 第1页第1条即本次看到的最新公告
+            self.newest = (record_key(records[0]), records[0].date)
+
+        keys = [record_key(r) for r in records]
+        known = self.store.existing_keys(keys)
+        watermark_href = self.watermark[0] if self.watermark else None
+
+        new_records = []
+        reached = False
+        for key, record in zip(keys, records):
+            if key == watermark_href:
+                # 高水位之后的公告都更旧，已在之前的抓取中处理过
+                reached = True
+                break
+            if key not in known:
+                new_records.append(record)
+        if not new_records:
+            reached = True
+        self.new_count += len(new_records)
+        return new_records, reached
+
+    def mark_completed(self):
+        self.completed = True
+
+    def commit(self):
+        """记录本次看到的最新公告作为新的高水位"""
+        if self.completed and self.newest is not None:
+            self.store.set_watermark(self.fingerprint, self.newest[0], self.newest[1])
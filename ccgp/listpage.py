@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+搜索结果列表页解析。
+
+并发抓取后，解析成为主要的 CPU 开销，这里尽量减少每条记录的重复工作：
+
+- 直接从响应字节解析文档，不先解码成字符串；
+- XPath 表达式在模块加载时编译一次，每条记录内的查找只走相对路径；
+- 日期/采购人/代理机构/区域用一个预编译正则一次匹配，
+  不符合常见格式的信息串再退回逐段查找的 parse_info_slow()。
+
+性能对比见 benchmarks/bench_parser.py。
+"""
+
+import re
+import threading
+
+from lxml import etree
+
+from .record import Announcement
+
+# 结果页中总条数和列表项的位置
+TOTAL_XPATH = '/html/body/div[5]/div[1]/div/p[1]/span[2]/text()'
+LIST_XPATH = '/html/body/div[5]/div[2]/div/div/div[1]/ul/li'
+
+_total_text = etree.XPath(TOTAL_XPATH)
+_list_items = etree.XPath(LIST_XPATH)
+_string_value = etree.XPath('string()')
+
+# 常见格式: "2025.07.0912:00:00|采购人：xx|代理机构：xx|广西"，采购人、代理机构、区域都可能缺失。
+# 各字段中不允许出现全角冒号，标识出现在意外位置的信息串匹配失败后交给 parse_info_slow()
+_INFO_PATTERN = re.compile(
+    r'(.{10})[^|：]*'
+    r'(?:\|采购人：([^|：]*))?'
+    r'(?:\|代理机构：([^|：]*))?'
+    r'(?:\|([^|：]*))?',
+    re.S)
+
+# lxml 的解析器对象不能在线程间共享，每个线程各用一个
+_local = threading.local()
+
+
+def _html_parser():
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = etree.HTMLParser(encoding='utf-8')
+    return parser
+
+
+def parse_document(content):
+    """把响应正文（UTF-8 字节）解析为文档树"""
+    if isinstance(content, str):
+        return etree.HTML(content)
+    return etree.fromstring(content, _html_parser())
+
+
+def parse_total(tree):
+    """从结果页中读取匹配的公告总数"""
+    total_text = _total_text(tree)
+    return int(total_text[0].strip()) if total_text else 0
+
+
+def list_items(tree):
+    """结果页中的列表项（li 元素）"""
+    return _list_items(tree)
+
+
+def parse_info_slow(info):
+    """
+    逐段查找标识解析信息串，能处理缺少分隔符、字段顺序不同等不规则的格式。
+    返回 (日期, 采购人, 代理机构, 区域)。
+    """
+    date_part = info[:10]
+    remaining_info = info[10:]
+
+    buyer_part = ''
+    agent_part = ''
+    region_part = ''
+
+    # 先找到所有标识位置
+    buyer_pos = remaining_info.find('采购人：')
+    agent_pos = remaining_info.find('代理机构：')
+
+    # 处理采购人
+    if buyer_pos != -1:
+        buyer_start = buyer_pos + 4
+        next_sep = remaining_info.find('|', buyer_start)
+        if next_sep != -1:
+            buyer_part = remaining_info[buyer_start:next_sep].strip()
+        elif agent_pos > buyer_pos:
+            # 如果没有|，看是否有代理机构标识
+            buyer_part = remaining_info[buyer_start:agent_pos].strip()
+        else:
+            buyer_part = remaining_info[buyer_start:].strip()
+
+    # 处理代理机构
+    if agent_pos != -1:
+        agent_start = agent_pos + 5
+        next_sep = remaining_info.find('|', agent_start)
+        if next_sep != -1:
+            agent_part = remaining_info[agent_start:next_sep].strip()
+        else:
+            agent_part = remaining_info[agent_start:].strip()
+
+    # 处理区域信息 - 从最后一个|开始的部分
+    last_pipe = remaining_info.rfind('|')
+    if last_pipe != -1:
+        potential_region = remaining_info[last_pipe + 1:].strip()
+        # 确保这部分不包含采购人或代理机构标识
+        if '采购人：' not in potential_region and '代理机构：' not in potential_region:
+            region_part = potential_region
+
+    return date_part, buyer_part, agent_part, region_part
+
+
+def parse_info(info):
+    """
+    解析列表项中形如 "2025.07.09 12:00:00|采购人：xx|代理机构：xx|广西" 的信息串（已去掉空白），
+    返回 (日期, 采购人, 代理机构, 区域)。
+    """
+    match = _INFO_PATTERN.fullmatch(info)
+    if match is not None:
+        date_part, buyer, agent, region = match.groups('')
+        return date_part, buyer.strip(), agent.strip(), region.strip()
+    return parse_info_slow(info)
+
+
+def parse_list_item(li, keyword='', bid_type='0', bid_type_name='', zone_id='', page=0):
+    """
+    解析结果列表中的单个li元素，查询相关的字段（关键字、公告类型、区域ID、页码）由调用方传入。
+    成功时返回 Announcement，数据不完整时返回None。
+    """
+    title_element = summary_element = span_element = None
+    for child in li:
+        tag = child.tag
+        if tag == 'a':
+            if title_element is None:
+                title_element = child
+        elif tag == 'p':
+            if summary_element is None:
+                summary_element = child
+        elif tag == 'span':
+            if span_element is None:
+                span_element = child
+    if title_element is None or summary_element is None or span_element is None:
+        return None
+
+    title = title_element.text.strip() if title_element.text else ''
+    if not title:
+        return None
+
+    span_text = _string_value(span_element)
+    if not span_text:
+        return None
+    info = span_text.replace(' ', '').replace('\r', '').replace('\n', '').replace('\t', '')
+    if len(info) < 10:
+        return None
+
+    date_part, buyer_part, agent_part, region_part = parse_info(info)
+    return Announcement(
+        title=title,
+        date=date_part,
+        buyer=buyer_part,
+        agent=agent_part,
+        region=region_part,
+        href=title_element.get('href', ''),
+        summary=summary_element.text.strip() if summary_element.text else '',
+        keyword=keyword,
+        bid_type=bid_type,
+        bid_type_name=bid_type_name,
+        zone_id=zone_id,
+        page=page,
+    )
+
+
+def parse_items(tree, query):
+    """
+    解析一页中的全部列表项，query 为 parse_list_item() 的查询相关参数。
+    返回 (记录列表, 跳过的条目说明列表)，由调用方决定如何记录日志。
+    """
+    records = []
+    skipped = []
+    for li in list_items(tree):
+        try:
+            record = parse_list_item(li, **query)
+        except (ValueError, IndexError, AttributeError) as e:
+            skipped.append(f"解析数据时出错，跳过此条记录: {e}")
+            continue
+        if record is None:
+            skipped.append("  跳过不完整的数据项")
+            continue
+        records.append(record)
+    return records, skipped
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+抓取过程的运行指标。
+
+CrawlMetrics 汇总列表页请求的耗时分布、状态码、下载字节数、缓存命中，各阶段（等待请求间隔、请求、解析、写入）
+的累计耗时，抓到的页数和条数，以及在途请求数等队列深度。可由多个引擎共享，各方法都是线程安全的。
+
+抓取结束时 summary() 给出可直接写入日志的摘要；常驻模式下 MetricsServer 以 Prometheus 文本格式
+在本机 HTTP 端口上提供 /metrics，供 Prometheus 采集后按时间观察请求速率和响应耗时，据此调整并发数和请求间隔。
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 响应耗时直方图的桶上限（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_NAMES = {'sleep': '等待', 'fetch': '请求', 'parse': '解析', 'write': '写入'}
+
+PREFIX = 'ccgp_'
+
+HELP = {
+    'requests_total': '列表页请求数，status 为 HTTP 状态码，网络错误为 error',
+    'response_bytes_total': '列表页响应正文字节数',
+    'cache_hits_total': '命中响应缓存的请求数',
+    'stage_seconds_total': '各阶段累计耗时（秒，并发时为各线程之和）',
+    'pages_total': '已解析的列表页数',
+    'rows_total': '已抓取的公告条数',
+    'request_duration_seconds': '列表页请求耗时（秒）',
+}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    text = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels)
+    return '{' + text + '}'
+
+
+class CrawlMetrics(object):
+    """
+    抓取指标。inc() 累加计数器，adjust() / set_gauge() 维护瞬时值，
+    set_gauge() 的值可以是函数，在输出时调用（如某个队列的当前长度）。
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        # 名称 -> {标签元组: 值}
+        self.counters = {}
+        self.gauges = {}
+        self.help = dict(HELP)
+
+    def inc(self, name, amount=1, help=None, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            values = self.counters.setdefault(name, {})
+            values[key] = values.get(key, 0) + amount
+            if help:
+                self.help.setdefault(name, help)
+
+    def value(self, name, **labels):
+        with self.lock:
+            return self.counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def total(self, name):
+        with self.lock:
+            return sum(self.counters.get(name, {}).values())
+
+    def set_gauge(self, name, value, help=None):
+        with self.lock:
+            self.gauges[name] = value
+            if help:
+                self.help[name] = help
+
+    def adjust(self, name, delta, help=None):
+        with self.lock:
+            self.gauges[name] = self.gauges.get(name, 0) + delta
+            if help:
+                self.help.setdefault(name, help)
+
+    def observe_request(self, status, elapsed, size=0):
+        """记录一次发出的请求；status 为 None 表示网络错误"""
+        self.inc('requests_total', status='error' if status is None else status)
+        if size:
+            self.inc('response_bytes_total', size)
+        with self.lock:
+            self.latency_sum += elapsed
+            self.latency_count += 1
+            for i, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def add_time(self, stage, seconds):
+        if seconds > 0:
+            self.inc('stage_seconds_total', seconds, stage=stage)
+
+    @contextmanager
+    def timed(self, stage):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.monotonic() - started)
+
+    def add_page(self, rows):
+        self.inc('pages_total')
+        self.inc('rows_total', rows)
+
+    def quantile(self, q):
+        """按直方图估计响应耗时的分位数，返回所在桶的上限；超过最大桶时返回 None"""
+        with self.lock:
+            target = q * self.latency_count
+            seen = 0
+            for bound, count in zip(self.buckets, self.bucket_counts):
+                seen += count
+                if count and seen >= target:
+                    return bound
+        return None
+
+    def render(self):
+        """Prometheus 文本格式"""
+        lines = []
+        with self.lock:
+            counters = {name: dict(values) for name, values in self.counters.items()}
+            gauges = dict(self.gauges)
+            buckets = list(zip(self.buckets, self.bucket_counts))
+            latency_sum, latency_count = self.latency_sum, self.latency_count
+        for name in sorted(counters):
+            full = PREFIX + name
+            lines.append(f"# HELP {full} {self.help.get(name, name)}")
+            lines.append(f"# TYPE {full} counter")
+            for labels, value in sorted(counters[name].items(), key=lambda item: str(item[0])):
+                lines.append(f"{full}{_format_labels(labels)} {value:g}")
+
+        full = PREFIX + 'request_duration_seconds'
+        lines.append(f"# HELP {full} {self.help['request_duration_seconds']}")
+        lines.append(f"# TYPE {full} histogram")
+        cumulative = 0
+        for bound, count in buckets:
+            cumulative += count
+            lines.append(f'{full}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{full}_bucket{{le="+Inf"}} {latency_count}')
+        lines.append(f"{full}_sum {latency_sum:g}")
+        lines.append(f"{full}_count {latency_count}")
+
+        for name in sorted(gauges):
+            value = gauges[name]
+            try:
+                value = value() if callable(value) else value
+            except Exception:
+                continue
+            full = PREFIX + name
+            lines.append(f"# HELP {full} {self.help.get(name, name)}")
+            lines.append(f"# TYPE {full} gauge")
+            lines.append(f"{full} {value:g}")
+
+        full = PREFIX + 'uptime_seconds'
+        lines.append(f"# HELP {full} 指标开始统计后经过的秒数")
+        lines.append(f"# TYPE {full} gauge")
+        lines.append(f"{full} {time.monotonic() - self.started:.1f}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """抓取结束时写入日志的摘要，返回若干行文字"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self.lock:
+            statuses = dict(self.counters.get('requests_total', {}))
+            stages = {dict(labels)['stage']: v for labels, v in self.counters.get('stage_seconds_total', {}).items()}
+            latency_sum, latency_count = self.latency_sum, self.latency_count
+        rows = self.total('rows_total')
+        pages = self.total('pages_total')
+        lines = [f"共 {pages} 页、{rows} 条数据，用时 {elapsed:.1f} 秒，{rows / elapsed:.1f} 条/秒"]
+
+        if latency_count:
+            by_status = '，'.join(f"{dict(labels)['status']}: {count}"
+                                 for labels, count in sorted(statuses.items(), key=lambda item: str(item[0])))
+            size = self.total('response_bytes_total') / 1024 / 1024
+            lines.append(f"请求 {latency_count} 次（{by_status}），下载 {size:.1f} MB，"
+                         f"缓存命中 {self.total('cache_hits_total')} 次")
+            quantiles = []
+            for q in (0.5, 0.9, 0.99):
+                bound = self.quantile(q)
+                name = f"p{int(q * 100)}"
+                quantiles.append(f"{name} ≤ {bound:g}s" if bound is not None else f"{name} > {self.buckets[-1]:g}s")
+            lines.append(f"响应耗时平均 {latency_sum / latency_count:.2f} 秒，{'，'.join(quantiles)}")
+
+        if stages:
+            parts = [f"{label} {stages[stage]:.2f}s" for stage, label in STAGE_NAMES.items() if stage in stages]
+            lines.append("各阶段累计耗时（并发时为各线程之和）：" + '，'.join(parts))
+        return lines
+
+
+class MetricsServer(object):
+    """在本机端口上以 Prometheus 文本格式提供 /metrics"""
+
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        self.metrics = metrics
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def _make_handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
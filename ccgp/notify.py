@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+邮件提醒的后台发送。
+
+EmailDispatcher 把提醒放入队列后立即返回，抓取不必等待 SMTP 服务器。后台线程取到第一条提醒后
+再等待 digest_window 秒，期间到达的提醒合并为一封摘要邮件；新数据总条数超过 attach_threshold 时，
+正文只列出各部分的条数，完整数据作为压缩的 CSV 附件（zip）发送，避免邮件正文过大。
+
+SMTPConnection 保持一个登录后的连接，多封邮件复用；连接空闲超过 idle_timeout 秒时主动断开，
+发送时发现连接已被服务器关闭则重新连接并重发一次。
+"""
+
+import csv
+import html
+import io
+import queue
+import smtplib
+import threading
+import time
+import zipfile
+from datetime import datetime
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+DEFAULT_DIGEST_WINDOW = 60.0
+DEFAULT_ATTACH_THRESHOLD = 100
+DEFAULT_IDLE_TIMEOUT = 240.0
+
+EMAIL_STYLE = """
+    <style>
+        .data-table { width: 100%; border-collapse: collapse; font-family: Arial, sans-serif; font-size: 14px; color: #333; }
+        .data-table th, .data-table td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        .data-table th { background-color: #f8f9fa; font-weight: bold; color: #333; }
+        .data-table tr:hover { background-color: #f1f1f1; }
+        .data-table a { color: #007bff; text-decoration: none; }
+        .data-table a:hover { text-decoration: underline; }
+    </style>
+"""
+
+# 连接被服务器关闭或网络中断，重新连接后可以重发
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+_STOP = object()
+
+
+def render_table(rows, head, link_column=None):
+    """把数据行渲染为 HTML 表格；link_column 列的内容为链接，显示为“点击查看”"""
+    parts = ['<table class="data-table"><tr>']
+    parts.extend(f'<th>{html.escape(str(col))}</th>' for col in head)
+    parts.append('</tr>')
+    for row in rows:
+        parts.append('<tr>')
+        for i, cell in enumerate(row):
+            text = html.escape('' if cell is None else str(cell))
+            if i == link_column and text:
+                text = f'<a href="{text}" target="_blank">点击查看</a>'
+            parts.append(f'<td>{text}</td>')
+        parts.append('</tr>')
+    parts.append('</table>')
+    return ''.join(parts)
+
+
+def render_digest(alerts, head, link_column=None, attached=False):
+    """
+    摘要邮件的 HTML 正文。alerts 为 [(标题, 数据行列表)]；attached 为 True 时只列出条数。
+    """
+    total = sum(len(rows) for _, rows in alerts)
+    sections = []
+    for title, rows in alerts:
+        heading = f'<h4>{html.escape(title)}：{len(rows)} 条</h4>' if title else ''
+        if attached:
+            sections.append(heading)
+        else:
+            sections.append(heading + render_table(rows, head, link_column))
+    note = '<p>数据较多，完整列表见附件。</p>' if attached else ''
+    return f"""
+    <html>
+        <head>{EMAIL_STYLE}</head>
+        <body>
+            <h3>发现 {total} 条新招标公告：</h3>
+            {''.join(sections)}
+            {note}
+            <p>请及时查看邮件内容或访问网站获取详细信息。</p>
+        </body>
+    </html>
+    """
+
+
+def build_attachment(alerts, head):
+    """把全部数据行写成 CSV（UTF-8 BOM，Excel 可直接打开）并压缩，返回 zip 文件内容"""
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(['来源'] + list(head))
+    for title, rows in alerts:
+        for row in rows:
+            writer.writerow([title] + list(row))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('new_announcements.csv', '\ufeff' + text.getvalue())
+    return buffer.getvalue()
+
+
+class SMTPConnection(object):
+    """复用的 SMTP 连接；use_ssl 为 False 时使用明文 SMTP（用于本地测试服务器）"""
+
+    def __init__(self, host, port, user=None, password=None, use_ssl=True, timeout=30,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.last_used = 0.0
+        self.connects = 0
+
+    def _connect(self):
+        factory = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        server = factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.connects += 1
+
+    def send(self, sender, receivers, message):
+        for attempt in (1, 2):
+            if self.server is None:
+                self._connect()
+            try:
+                self.server.sendmail(sender, receivers, message.as_string())
+                self.last_used = time.monotonic()
+                return
+            except _RECONNECT_ERRORS:
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close_if_idle(self):
+        if self.server is not None and time.monotonic() - self.last_used >= self.idle_timeout:
+            self.close()
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+        self.server = None
+
+
+class EmailDispatcher(object):
+    """
+    后台发送提醒邮件。notify(标题, 数据行) 立即返回；close() 发出尚未发送的提醒后结束后台线程。
+
+    head 为数据行的表头，link_column 为链接所在列；发送失败只记录日志。
+    """
+
+    def __init__(self, connection, sender, receivers, head, link_column=None,
+                 subject='[招标公告更新提醒] 发现新数据', digest_window=DEFAULT_DIGEST_WINDOW,
+                 attach_threshold=DEFAULT_ATTACH_THRESHOLD, log=None):
+        self.connection = connection
+        self.sender = sender
+        self.receivers = [receivers] if isinstance(receivers, str) else list(receivers)
+        self.head = head
+        self.link_column = link_column
+        self.subject = subject
+        self.digest_window = max(0.0, float(digest_window))
+        self.attach_threshold = int(attach_threshold)
+        self.log = log or (lambda message: None)
+        self.queue = queue.Queue()
+        self.sent = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def notify(self, title, rows):
+        if rows:
+            self.queue.put((title, list(rows)))
+
+    def close(self, timeout=None):
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def build_message(self, alerts):
+        total = sum(len(rows) for _, rows in alerts)
+        titles = [title for title, _ in alerts if title]
+        subject = f"{self.subject}（{total} 条"
+        if titles:
+            subject += '：' + '、'.join(dict.fromkeys(titles))
+        subject += '）'
+        attached = total > self.attach_threshold
+        msg = MIMEMultipart()
+        msg['From'] = self.sender
+        msg['To'] = ', '.join(self.receivers)
+        msg['Subject'] = subject
+        msg.attach(MIMEText(render_digest(alerts, self.head, self.link_column, attached), 'html', 'utf-8'))
+        if attached:
+            part = MIMEApplication(build_attachment(alerts, self.head), 'zip')
+            filename = 'new_announcements_' + datetime.now().strftime('%Y%m%d_%H%M%S') + '.zip'
+            part.add_header('Content-Disposition', 'attachment', filename=filename)
+            msg.attach(part)
+        return msg
+
+    def _send(self, alerts):
+        total = sum(len(rows) for _, rows in alerts)
+        try:
+            self.connection.send(self.sender, self.receivers, self.build_message(alerts))
+        except Exception as e:
+            self.failed += 1
+            self.log(f"邮件发送失败（{total} 条新数据）: {e}")
+            return
+        self.sent += 1
+        self.log(f"邮件发送成功（{len(alerts)} 条提醒，{total} 条新数据）")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=5)
+            except queue.Empty:
+                self.connection.close_if_idle()
+                continue
+            if item is _STOP:
+                break
+            alerts = [item]
+            # 等待一段时间，把随后到达的提醒合并到同一封邮件
+            deadline = time.monotonic() + self.digest_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                alerts.append(item)
+            self._send(alerts)
+        self.connection.close()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+多进程列表页解析。
+
+并发抓取时，网络等待被线程池掩盖，lxml 解析和逐条的字符串处理成为主要开销，
+且同一进程内受 GIL 限制，多个抓取线程并不能同时解析。ParserPool 把响应正文（字节）
+交给子进程解析，子进程只返回每条记录的基本字段（元组），主进程据此构造 Announcement。
+
+抓取线程拿到响应后立即把正文提交给进程池并继续抓取下一页，引擎按页码顺序等待解析结果；
+在途的页面数受抓取窗口限制（并发数的两倍），解析结果不会在内存中无限堆积。
+配置 parse_workers 为解析进程数，0（默认）表示在抓取线程中直接解析。
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .listpage import parse_document, parse_items
+from .record import Announcement
+
+# 子进程返回的字段，其余字段（关键字、公告类型、区域ID、页码）由主进程按查询补上
+ITEM_FIELDS = ('title', 'date', 'buyer', 'agent', 'region', 'href', 'summary')
+
+
+def parse_content(content, query):
+    """在子进程中执行：解析一页的响应正文，返回 (字段元组列表, 跳过的条目说明列表)"""
+    records, skipped = parse_items(parse_document(content), query)
+    return [tuple(getattr(record, name) for name in ITEM_FIELDS) for record in records], skipped
+
+
+def build_records(rows, query):
+    return [Announcement(*row, **query) for row in rows]
+
+
+class ParserPool(object):
+    """
+    解析进程池，可由多个引擎共享。
+
+    子进程以 spawn 方式启动：抓取进程中已有多个线程（以及 GUI 的事件循环），fork 后的子进程可能继承被占用的锁。
+    """
+
+    def __init__(self, workers):
+        self.workers = max(1, int(workers))
+        self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+
+    @classmethod
+    def from_config(cls, config):
+        """配置了 parse_workers 时创建进程池，否则返回 None"""
+        workers = int(config.get('parse_workers', 0) or 0)
+        if workers <= 0:
+            return None
+        return cls(workers)
+
+    def submit(self, content, query):
+        """提交一页的响应正文，返回 Future，结果为 (字段元组列表, 跳过的条目说明列表)"""
+        return self.executor.submit(parse_content, content, query)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+性能分析模式。
+
+抓取变慢时，用来区分时间花在了等待请求间隔、网络请求、解析、写文件还是界面更新上。开启后：
+
+- 按阶段和页码统计墙钟时间和 CPU 时间（CPU 时间为执行该阶段的线程自身的 CPU 时间）；
+- 后台线程每隔 profile_interval 秒（默认 0.01）采样所有线程的调用栈，写成火焰图工具通用的
+  折叠栈格式（stacks.collapsed，每行为 “线程;函数;函数... 样本数”），可用 flamegraph.pl 或 speedscope 打开；
+- 配置 cprofile 时同时用 cProfile 记录函数级耗时（只统计调用 start() 的线程）。
+
+结果写入 profile_dir（默认 profiles）下以开始时间命名的目录，report.txt 为文字报告。
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from .metrics import STAGE_NAMES as METRIC_STAGE_NAMES
+
+DEFAULT_PROFILE_DIR = 'profiles'
+DEFAULT_INTERVAL = 0.01
+
+# 报告中按页列出的最慢页数
+SLOWEST_PAGES = 20
+# 报告中列出的 cProfile 函数数
+CPROFILE_TOP = 30
+
+STAGE_NAMES = dict(METRIC_STAGE_NAMES, emit='界面更新')
+
+
+def stage_timer(metrics=None, profiler=None):
+    """
+    返回 timed(阶段, 页码=None) 上下文管理器工厂：同时记入运行指标和性能分析，
+    两者都没有时不计时。
+    """
+    if profiler is not None:
+        return lambda stage, page=None: profiler.timed(stage, page, metrics)
+    if metrics is not None:
+        return lambda stage, page=None: metrics.timed(stage)
+    return lambda stage, page=None: nullcontext()
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class Profiler(object):
+    """
+    按阶段、按页统计耗时并采样调用栈。start() 开始，stop() 结束，write() 写出报告目录并返回其路径。
+    timed() 可在多个线程中同时使用。
+    """
+
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, use_cprofile=False, interval=DEFAULT_INTERVAL):
+        self.directory = directory
+        self.interval = max(0.001, float(interval))
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        self.lock = threading.Lock()
+        # 阶段 -> [次数, 墙钟, CPU]
+        self.stages = {}
+        # 页码 -> {阶段: 墙钟}，以及 CPU 合计
+        self.pages = {}
+        self.page_cpu = {}
+        self.stacks = {}
+        self.samples = 0
+        self.started_at = None
+        self.started = None
+        self.cpu_started = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.stopped = threading.Event()
+        self.sampler = None
+
+    @classmethod
+    def from_config(cls, config):
+        """配置中开启 profile 时创建，否则返回 None"""
+        if not config.get('profile'):
+            return None
+        return cls(config.get('profile_dir') or DEFAULT_PROFILE_DIR, bool(config.get('cprofile')),
+                   config.get('profile_interval', DEFAULT_INTERVAL))
+
+    @contextmanager
+    def timed(self, stage, page=None, metrics=None):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            if metrics is not None:
+                metrics.add_time(stage, wall)
+            with self.lock:
+                entry = self.stages.setdefault(stage, [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += wall
+                entry[2] += cpu
+                if page is not None:
+                    per_page = self.pages.setdefault(page, {})
+                    per_page[stage] = per_page.get(stage, 0.0) + wall
+                    self.page_cpu[page] = self.page_cpu.get(page, 0.0) + cpu
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {}
+        while not self.stopped.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, frame in frames.items():
+                    if ident == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_name(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    key = ';'.join(reversed(stack))
+                    self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def start(self):
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.sampler = threading.Thread(target=self._sample, name='profiler', daemon=True)
+        self.sampler.start()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        return self
+
+    def stop(self):
+        if self.started is None or self.stopped.is_set():
+            return
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.stopped.set()
+        self.sampler.join()
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self.cpu_started
+
+    def report(self):
+        """文字报告：各阶段耗时、最慢的页面和 cProfile 统计"""
+        lines = [f"性能分析：{self.started_at:%Y-%m-%d %H:%M:%S} 开始，墙钟 {self.wall:.2f} 秒，进程 CPU {self.cpu:.2f} 秒",
+                 '',
+                 '各阶段耗时（并发时为各线程之和）：',
+                 f"{'阶段':<8}{'次数':>8}{'墙钟(秒)':>12}{'CPU(秒)':>12}{'平均(毫秒)':>12}"]
+        with self.lock:
+            stages = {k: list(v) for k, v in self.stages.items()}
+            pages = {k: dict(v) for k, v in self.pages.items()}
+            page_cpu = dict(self.page_cpu)
+        for stage in sorted(stages, key=lambda s: -stages[s][1]):
+            count, wall, cpu = stages[stage]
+            lines.append(f"{STAGE_NAMES.get(stage, stage):<8}{count:>8}{wall:>12.3f}{cpu:>12.3f}"
+                         f"{wall / count * 1000 if count else 0:>12.1f}")
+
+        if pages:
+            columns = [s for s in STAGE_NAMES if any(s in p for p in pages.values())]
+            lines += ['', f"墙钟最长的 {min(SLOWEST_PAGES, len(pages))} 页（秒）：",
+                      f"{'页码':>6}" + ''.join(f"{STAGE_NAMES[s]:>10}" for s in columns) + f"{'合计':>10}{'CPU':>10}"]
+            slowest = sorted(pages, key=lambda p: -sum(pages[p].values()))[:SLOWEST_PAGES]
+            for page in slowest:
+                row = pages[page]
+                lines.append(f"{page:>6}" + ''.join(f"{row.get(s, 0.0):>10.3f}" for s in columns)
+                             + f"{sum(row.values()):>10.3f}{page_cpu.get(page, 0.0):>10.3f}")
+
+        lines += ['', f"调用栈采样 {self.samples} 次，间隔 {self.interval * 1000:.0f} 毫秒，见 stacks.collapsed"]
+        if self.cprofile is not None:
+            text = io.StringIO()
+            stats = pstats.Stats(self.cprofile, stream=text)
+            stats.sort_stats('cumulative').print_stats(CPROFILE_TOP)
+            lines += ['', f"cProfile 累计耗时前 {CPROFILE_TOP} 的函数（完整数据见 cprofile.prof）：", text.getvalue()]
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """结束分析并写出报告目录，返回目录路径"""
+        self.stop()
+        path = os.path.join(self.directory, f"profile_{self.started_at:%Y%m%d_%H%M%S}")
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'report.txt'), 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        with self.lock:
+            stacks = sorted(self.stacks.items())
+        with open(os.path.join(path, 'stacks.collapsed'), 'w', encoding='utf-8') as f:
+            for stack, count in stacks:
+                f.write(f"{stack} {count}\n")
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(os.path.join(path, 'cprofile.prof'))
+        return path
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+代理池。
+
+网站按来源 IP 限制访问频率，单个出口的请求间隔决定了抓取速度的上限。配置 proxies 给出多个出口后，
+每个出口有自己的限速器（请求间隔 proxy_min_delay / proxy_max_delay，默认与 min_delay / max_delay 相同），
+每次请求选择当前最合适的出口：
+
+- 健康评分：响应耗时和出错率的指数滑动平均，加上该出口限速器还需等待的时间和在途请求数；
+- 剔除：连续失败 proxy_eject_threshold 次（默认 3），或出错率超过一半时，暂停使用该出口
+  proxy_eject_cooldown 秒（默认 60），再次被剔除时暂停时间加倍；
+- 恢复：暂停结束后先放行一个试探请求，成功即恢复正常使用。
+
+代理本身的故障（连接不上代理、403/407/429 等针对来源 IP 的拒绝）只影响对应出口，
+网站本身的 5xx 仍交给熔断器处理。配置示例：
+
+    "proxies": ["http://10.0.0.2:3128", "http://10.0.0.3:3128",
+                {"url": "http://10.0.0.4:3128", "min_delay": 1, "max_delay": 3}, "direct"]
+
+"direct" 表示不经代理直接访问。
+"""
+
+import threading
+import time
+
+from .ratelimit import AdaptiveRateLimiter
+from .retry import sleep_unless
+
+DEFAULT_EJECT_THRESHOLD = 3
+DEFAULT_EJECT_COOLDOWN = 60.0
+MAX_EJECT_COOLDOWN = 600.0
+
+# 滑动平均中最新一次结果的权重
+EWMA_ALPHA = 0.2
+# 还没有响应记录的出口按该耗时估计（秒），取0使新出口（包括恢复后的出口）优先被尝试
+INITIAL_LATENCY = 0.0
+# 针对来源 IP 的拒绝：代理认证失败、被禁止访问、请求过多
+PROXY_FAILURE_STATUS = (403, 407, 429)
+
+DIRECT = 'direct'
+
+
+class ProxyEndpoint(object):
+    """一个出口及其健康状况"""
+
+    def __init__(self, url, min_delay, max_delay, cooldown=DEFAULT_EJECT_COOLDOWN):
+        self.url = url
+        # 值为 None 时 requests 不使用会话或环境变量中的代理
+        self.proxies = {'http': None, 'https': None} if url == DIRECT else {'http': url, 'https': url}
+        self.limiter = AdaptiveRateLimiter(min_delay, max_delay)
+        self.latency = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.ejected_until = None
+        self.probing = False
+        self.cooldown = cooldown
+        self.ejections = 0
+
+    def score(self):
+        """估计通过该出口完成一个请求所需的秒数，越小越好"""
+        latency = self.latency if self.latency is not None else INITIAL_LATENCY
+        # 出错率高的出口按重试的代价加重
+        return self.limiter.estimated_wait() + latency * (1 + self.in_flight) * (1 + 4 * self.error_rate)
+
+    def __repr__(self):
+        return f"ProxyEndpoint({self.url!r})"
+
+
+class ProxyPool(object):
+    """
+    多出口代理池，可由多个引擎共享。
+
+    acquire() 选择出口并等待该出口的请求间隔，返回 (出口, 等待秒数)；
+    请求结束后必须调用 feedback() 报告结果。
+    """
+
+    def __init__(self, endpoints, eject_threshold=DEFAULT_EJECT_THRESHOLD, eject_cooldown=DEFAULT_EJECT_COOLDOWN,
+                 max_cooldown=MAX_EJECT_COOLDOWN, log=None):
+        if not endpoints:
+            raise ValueError('代理池中至少需要一个出口')
+        self.endpoints = endpoints
+        self.eject_threshold = max(1, int(eject_threshold))
+        self.base_cooldown = max(0.0, float(eject_cooldown))
+        self.max_cooldown = max(self.base_cooldown, float(max_cooldown))
+        for endpoint in endpoints:
+            endpoint.cooldown = self.base_cooldown
+        self.log = log or (lambda message: None)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, log=None):
+        """配置了 proxies 时创建代理池，否则返回 None"""
+        entries = config.get('proxies') or []
+        if isinstance(entries, str):
+            entries = [entries]
+        min_delay = config.get('proxy_min_delay', config.get('min_delay', 2))
+        max_delay = config.get('proxy_max_delay', config.get('max_delay', 6))
+        endpoints = []
+        for entry in entries:
+            if isinstance(entry, dict):
+                endpoints.append(ProxyEndpoint(entry['url'], entry.get('min_delay', min_delay),
+                                               entry.get('max_delay', max_delay)))
+            elif entry and entry.strip():
+                endpoints.append(ProxyEndpoint(entry.strip(), min_delay, max_delay))
+        if not endpoints:
+            return None
+        return cls(endpoints, config.get('proxy_eject_threshold', DEFAULT_EJECT_THRESHOLD),
+                   config.get('proxy_eject_cooldown', DEFAULT_EJECT_COOLDOWN), log=log)
+
+    def _available(self, now):
+        """可以接受请求的出口；暂停结束的出口只放行一个试探请求"""
+        result = []
+        for endpoint in self.endpoints:
+            if endpoint.ejected_until is None:
+                result.append(endpoint)
+            elif now >= endpoint.ejected_until and not endpoint.probing:
+                result.append(endpoint)
+        return result
+
+    def _select(self):
+        """选出评分最好的出口并登记一个在途请求；全部暂停时返回距最早恢复的秒数"""
+        with self.lock:
+            now = time.monotonic()
+            candidates = self._available(now)
+            if not candidates:
+                waits = [e.ejected_until - now for e in self.endpoints if e.ejected_until is not None and not e.probing]
+                return None, max(0.0, min(waits)) if waits else 0.2
+            endpoint = min(candidates, key=lambda e: e.score())
+            if endpoint.ejected_until is not None:
+                endpoint.probing = True
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint, 0.0
+
+    def acquire(self, should_stop=None):
+        """返回 (出口, 等待秒数)；等待期间 should_stop() 为真时返回 None"""
+        while True:
+            endpoint, wait = self._select()
+            if endpoint is not None:
+                break
+            if not sleep_unless(min(max(wait, 0.05), 1.0), should_stop):
+                return None
+        waited = endpoint.limiter.acquire(should_stop)
+        if waited is None:
+            self.release(endpoint)
+            return None
+        return endpoint, waited
+
+    def release(self, endpoint):
+        """请求未发出（被停止）时归还出口"""
+        with self.lock:
+            endpoint.in_flight -= 1
+            endpoint.requests -= 1
+            endpoint.probing = False
+
+    def feedback(self, endpoint, status_code=None, elapsed=None, error=False):
+        """报告一次请求的结果，更新出口的限速和健康状况"""
+        endpoint.limiter.feedback(status_code, elapsed, error=error)
+        failed = error or status_code in PROXY_FAILURE_STATUS
+        message = None
+        with self.lock:
+            endpoint.in_flight -= 1
+            endpoint.error_rate += EWMA_ALPHA * ((1.0 if failed else 0.0) - endpoint.error_rate)
+            if elapsed is not None:
+                if endpoint.latency is None:
+                    endpoint.latency = elapsed
+                else:
+                    endpoint.latency += EWMA_ALPHA * (elapsed - endpoint.latency)
+            if not failed:
+                endpoint.failures = 0
+                if endpoint.ejected_until is not None:
+                    # 试探成功，恢复使用
+                    endpoint.ejected_until = None
+                    endpoint.probing = False
+                    endpoint.cooldown = self.base_cooldown
+                    endpoint.error_rate /= 2
+                    message = f"代理 {endpoint.url} 已恢复使用"
+            else:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                # 已暂停的出口上还未返回的请求失败时不再重复剔除
+                unhealthy = endpoint.failures >= self.eject_threshold or (
+                    endpoint.requests >= 10 and endpoint.error_rate > 0.5)
+                if endpoint.probing or (endpoint.ejected_until is None and unhealthy):
+                    message = self._eject(endpoint)
+        if message:
+            self.log(message)
+
+    def _eject(self, endpoint):
+        cooldown = endpoint.cooldown
+        endpoint.ejected_until = time.monotonic() + cooldown
+        endpoint.probing = False
+        endpoint.failures = 0
+        endpoint.ejections += 1
+        endpoint.cooldown = min(self.max_cooldown, endpoint.cooldown * 2)
+        active = sum(1 for e in self.endpoints if e.ejected_until is None)
+        return f"代理 {endpoint.url} 连续出错，暂停使用 {cooldown:.0f} 秒（可用 {active}/{len(self.endpoints)}）"
+
+    def summary(self):
+        """各出口的请求数、出错数、平均耗时和被剔除次数"""
+        lines = []
+        with self.lock:
+            for e in self.endpoints:
+                latency = f"{e.latency:.2f}s" if e.latency is not None else '-'
+                state = '暂停中' if e.ejected_until is not None else '正常'
+                lines.append(f"{e.url}: 请求 {e.requests}，出错 {e.errors}，平均耗时 {latency}，"
+                             f"剔除 {e.ejections} 次，{state}")
+        return lines
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+自适应请求限速。
+
+配置中的 min_delay / max_delay（秒）给出请求间隔的上下限：
+响应快且返回200时逐步缩短间隔，响应变慢、返回非200或出现网络错误时
+迅速拉长间隔，始终保持在上下限之间。多个抓取线程共享同一个限速器时，
+总请求速率仍受同一个令牌桶约束。
+"""
+
+import random
+import threading
+import time
+
+DEFAULT_MIN_DELAY = 2
+DEFAULT_MAX_DELAY = 6
+
+
+class AdaptiveRateLimiter(object):
+    """
+    令牌桶限速器，令牌补充速度为 1 / interval（个/秒），桶容量为 burst。
+
+    acquire() 在没有令牌时预约下一个令牌并在锁外等待，
+    因此并发调用者会按到达顺序依次错开，而不会同时醒来。
+    """
+
+    # 响应耗时低于该值视为“快”，高于 slow_threshold 视为“慢”（秒）
+    FAST_THRESHOLD = 1.0
+    SLOW_THRESHOLD = 5.0
+    # 每次快速成功后间隔乘以 SPEED_UP，慢响应乘以 SLOW_DOWN，失败时乘以 BACK_OFF
+    SPEED_UP = 0.9
+    SLOW_DOWN = 1.5
+    BACK_OFF = 2.0
+
+    def __init__(self, min_delay=DEFAULT_MIN_DELAY, max_delay=DEFAULT_MAX_DELAY, burst=1, jitter=0.2):
+        self.min_delay = max(0.0, float(min_delay))
+        self.max_delay = max(self.min_delay, float(max_delay))
+        self.capacity = max(1, int(burst))
+        self.jitter = jitter
+        # 从上下限的中点开始，根据响应情况再调整
+        self.interval = (self.min_delay + self.max_delay) / 2
+        # 初始桶为空，第一个请求同样需要等待一个间隔，与原先“请求前先等待”的行为一致
+        self.tokens = 0.0
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        # 桶容量取并发数，使并发抓取的各线程可以同时发出第一批请求
+        try:
+            burst = max(1, int(config.get('concurrency', 1)))
+        except (ValueError, TypeError):
+            burst = 1
+        return cls(config.get('min_delay', DEFAULT_MIN_DELAY), config.get('max_delay', DEFAULT_MAX_DELAY), burst)
+
+    def _refill(self, now):
+        if self.interval > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) / self.interval)
+        else:
+            self.tokens = self.capacity
+        self.last_refill = now
+
+    def estimated_wait(self):
+        """现在申请令牌需要等待的秒数（不取走令牌），用于在多个限速器之间选择"""
+        with self.lock:
+            self._refill(time.monotonic())
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) * self.interval
+
+    def acquire(self, should_stop=None):
+        """
+        取得一个令牌，必要时阻塞等待。
+        返回实际等待的秒数；等待期间 should_stop() 为真时提前返回 None。
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            wait = -self.tokens * self.interval if self.tokens < 0 else 0.0
+        if wait > 0 and self.jitter:
+            wait *= 1 + random.uniform(-self.jitter, self.jitter)
+
+        deadline = time.monotonic() + wait
+        while True:
+            if should_stop is not None and should_stop():
+                return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return wait
+            # 分段等待，以便及时响应停止请求
+            time.sleep(min(remaining, 0.2))
+
+    def feedback(self, status_code=None, elapsed=None, error=False):
+        """根据一次请求的结果调整请求间隔"""
+        with self.lock:
+            if error or status_code != 200:
+                interval = max(self.interval * self.BACK_OFF, self.min_delay or 1.0)
+            elif elapsed is not None and elapsed >= self.SLOW_THRESHOLD:
+                interval = self.interval * self.SLOW_DOWN
+            elif elapsed is None or elapsed <= self.FAST_THRESHOLD:
+                interval = self.interval * self.SPEED_UP
+            else:
+                return self.interval
+            self.interval = min(self.max_delay, max(self.min_delay, interval))
+            return self.interval
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+公告记录。
+
+抓取、去重、入库、导出各环节统一使用 Announcement 对象，而不是字典或9列的列表：
+
+- 使用 __slots__，每条记录只占固定的几个槽位，没有每条一份的字典；
+- 关键字、公告类型、区域、采购人、代理机构、日期等在大量记录中反复出现的字段
+  驻留（sys.intern）为同一个字符串对象；
+- 日期同时解析为 datetime.date（published），按日期筛选、排序时无需再解析字符串；
+- 抓取详情页（ccgp.detail）时，从详情页提取的字段以字典形式保存在 detail 中，未抓取时为 None。
+
+导出为表格时用 engine.record_to_row() 按表头顺序生成数据行，写 JSON 时用 to_dict()。
+"""
+
+import sys
+from datetime import date
+from functools import lru_cache
+
+FIELDS = ('title', 'date', 'buyer', 'agent', 'region', 'href', 'summary',
+          'keyword', 'bid_type', 'bid_type_name', 'zone_id', 'page', 'detail')
+
+# 在大量记录中重复出现的字段
+INTERNED_FIELDS = ('date', 'buyer', 'agent', 'region', 'keyword', 'bid_type', 'bid_type_name', 'zone_id')
+
+
+@lru_cache(maxsize=4096)
+def parse_published(value):
+    """把 2025.07.09 / 2025-07-09 / 2025:07:09 解析为 date，无法识别时返回 None"""
+    text = value[:10]
+    if len(text) != 10 or text[4] != text[7] or text[4] not in '.-:':
+        return None
+    try:
+        return date(int(text[:4]), int(text[5:7]), int(text[8:10]))
+    except ValueError:
+        return None
+
+
+def _intern(value):
+    return sys.intern(value if isinstance(value, str) else ('' if value is None else str(value)))
+
+
+class Announcement(object):
+    """一条公告。字段见 FIELDS，另有由 date 解析得到的 published（datetime.date 或 None）"""
+
+    __slots__ = FIELDS + ('published',)
+
+    def __init__(self, title='', date='', buyer='', agent='', region='', href='', summary='',
+                 keyword='', bid_type='0', bid_type_name='', zone_id='', page=0, detail=None):
+        self.title = title
+        self.date = _intern(date)
+        self.buyer = _intern(buyer)
+        self.agent = _intern(agent)
+        self.region = _intern(region)
+        self.href = href
+        self.summary = summary
+        self.keyword = _intern(keyword)
+        self.bid_type = _intern(bid_type)
+        self.bid_type_name = _intern(bid_type_name)
+        self.zone_id = _intern(zone_id)
+        self.page = page
+        self.detail = detail
+        self.published = parse_published(self.date)
+
+    @classmethod
+    def from_dict(cls, data):
+        """由 to_dict() 的结果（例如 JSON Lines 中的一行）还原记录，忽略未知的键"""
+        return cls(**{name: data[name] for name in FIELDS if data.get(name) is not None})
+
+    def to_dict(self):
+        """转换为字典；没有详情字段时不输出 detail 键"""
+        values = {name: getattr(self, name) for name in FIELDS}
+        if values['detail'] is None:
+            del values['detail']
+        return values
+
+    def replace(self, **changes):
+        """返回修改了部分字段的新记录"""
+        values = self.to_dict()
+        values.update(changes)
+        return Announcement(**values)
+
+    def __eq__(self, other):
+        if not isinstance(other, Announcement):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Announcement(date={self.date!r}, title={self.title!r}, href={self.href!r})"
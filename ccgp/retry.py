@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+请求重试与熔断。
+
+- RetryPolicy：单个请求失败（网络错误、超时、429 或 5xx）后按指数退避加随机抖动重试，
+  重试次数和初始退避时间由配置 max_retries / retry_backoff 给出；
+- CircuitBreaker：所有请求共享，连续失败达到 breaker_threshold 次时判定网站大面积出错，
+  暂停全部请求 breaker_cooldown 秒；之后先放行一个试探请求，成功则恢复，
+  失败则暂停时间加倍（不超过 MAX_COOLDOWN）。
+
+与 AdaptiveRateLimiter 一样，多个引擎可以共享同一个熔断器。
+"""
+
+import random
+import threading
+import time
+
+import requests
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+MAX_BACKOFF = 60.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 60.0
+MAX_COOLDOWN = 600.0
+
+
+def is_retryable(error):
+    """网络错误、超时、429 和 5xx 可以重试；4xx、离线缓存未命中和解析错误重试也不会成功"""
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status == 429 or status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout,
+                              requests.exceptions.ChunkedEncodingError))
+
+
+def is_server_failure(status_code):
+    """说明网站本身出错或限流的状态码，计入熔断器"""
+    return status_code == 429 or status_code >= 500
+
+
+def sleep_unless(seconds, should_stop=None):
+    """分段等待，期间 should_stop() 为真时提前返回 False"""
+    deadline = time.monotonic() + seconds
+    while True:
+        if should_stop is not None and should_stop():
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        time.sleep(min(remaining, 0.2))
+
+
+class RetryPolicy(object):
+    """第 n 次重试前等待 backoff * 2^(n-1) 秒（不超过 MAX_BACKOFF），实际等待为其一半到全部之间的随机值"""
+
+    def __init__(self, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, max_backoff=MAX_BACKOFF):
+        self.retries = max(0, int(retries))
+        self.backoff = max(0.0, float(backoff))
+        self.max_backoff = max(self.backoff, float(max_backoff))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('max_retries', DEFAULT_RETRIES), config.get('retry_backoff', DEFAULT_BACKOFF))
+
+    def delay(self, attempt):
+        """第 attempt 次重试（从1开始）前的等待秒数"""
+        ceiling = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        # 随机抖动使同时失败的多个请求错开重试，不会一起再次打到网站上
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class CircuitBreaker(object):
+    """
+    熔断器，状态为 closed（正常）、open（暂停）和 half_open（试探）。
+
+    每次发出请求前调用 wait()，请求结束后调用 record_success() 或 record_failure()。
+    wait() 返回 PROBE 表示由调用者发出试探请求；试探请求没有发出（被停止）或结果不能说明网站状况时
+    必须调用 release_probe() 交还，否则其他调用者会一直等待试探结果。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    # wait() 的返回值：可以请求，且本次请求是试探请求
+    PROBE = 'probe'
+
+    def __init__(self, threshold=DEFAULT_BREAKER_THRESHOLD, cooldown=DEFAULT_BREAKER_COOLDOWN,
+                 max_cooldown=MAX_COOLDOWN):
+        # threshold 为 0 时不熔断
+        self.threshold = max(0, int(threshold))
+        self.base_cooldown = max(0.0, float(cooldown))
+        self.max_cooldown = max(self.base_cooldown, float(max_cooldown))
+        self.cooldown = self.base_cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('breaker_threshold', DEFAULT_BREAKER_THRESHOLD),
+                   config.get('breaker_cooldown', DEFAULT_BREAKER_COOLDOWN))
+
+    def remaining(self):
+        """暂停状态下距离恢复的秒数，未暂停时为0"""
+        with self.lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.open_until - time.monotonic())
+
+    def wait(self, should_stop=None):
+        """
+        熔断期间阻塞，直到可以发出请求。
+        返回 True 表示可以请求，返回 PROBE 表示可以请求且本次为试探请求；等待期间 should_stop() 为真时返回 False。
+        """
+        while True:
+            with self.lock:
+                if self.state == self.CLOSED:
+                    return True
+                now = time.monotonic()
+                if self.state == self.OPEN and now >= self.open_until:
+                    # 暂停结束，由当前调用者发出试探请求，其他调用者继续等待结果
+                    self.state = self.HALF_OPEN
+                    return self.PROBE
+                remaining = self.open_until - now if self.state == self.OPEN else 0.2
+            if not sleep_unless(min(remaining, 1.0), should_stop):
+                return False
+
+    def release_probe(self):
+        """交还未得出结果的试探请求，下一个调用 wait() 的调用者立即重新试探"""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.open_until = time.monotonic()
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self.cooldown = self.base_cooldown
+
+    def record_failure(self):
+        """记录一次失败；本次失败导致暂停时返回暂停秒数，否则返回 None"""
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                # 试探失败，加倍暂停时间
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            elif self.state == self.OPEN or not self.threshold or self.failures < self.threshold:
+                return None
+            self.state = self.OPEN
+            self.open_until = time.monotonic() + self.cooldown
+            self.trips += 1
+            return self.cooldown
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+常驻进程中的定时任务。
+
+每个任务是一个查询及其执行时间表，时间表使用 cron 的5个字段（分 时 日 月 星期），例如：
+
+    */10 7-22 * * *     每天 7:00-22:59 每10分钟
+    0 9,14 * * 1-5      工作日 9:00 和 14:00
+
+也可以写 @hourly、@daily 或 @every 15m / @every 2h（固定间隔）。
+
+任务文件为 JSON，例如：
+
+    {
+        "defaults": {"zone_id": "45", "min_delay": 2, "max_delay": 6},
+        "jitter": 60,
+        "jobs": [
+            {"name": "广西公告", "schedule": "*/10 7-22 * * *", "days": 3, "query": {"keyword": "公告"}},
+            {"name": "广西医疗", "schedule": "*/30 * * * *", "query": {"keyword": "医疗", "bid_type": "7"}}
+        ]
+    }
+
+每次执行时查询的日期范围为最近 days 天（默认 3）。实际执行时间在计划时间之后随机推迟
+0~jitter 秒，多个任务即使时间表相同也不会同时发出请求。任务依次执行，
+某次执行超时错过的计划时间不再补跑，从当前时间起计算下一次。
+"""
+
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_JITTER = 60
+DEFAULT_DAYS = 3
+
+# 字段的取值范围
+_FIELDS = [('分钟', 0, 59), ('小时', 0, 23), ('日', 1, 31), ('月', 1, 12), ('星期', 0, 7)]
+
+_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+}
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _parse_field(text, name, low, high):
+    """把单个 cron 字段解析为取值集合，支持 *、a-b、a,b 和 /步长"""
+    values = set()
+    for part in text.split(','):
+        part, _, step = part.partition('/')
+        try:
+            step = int(step) if step else 1
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(v) for v in part.split('-', 1))
+            else:
+                start = int(part)
+                # 5/15 表示从5开始每15
+                end = high if step > 1 else start
+        except ValueError:
+            raise ValueError(f"无法识别的{name}字段: {text}")
+        if step <= 0:
+            raise ValueError(f"{name}字段的步长必须为正数: {text}")
+        if start < low or end > high or start > end:
+            raise ValueError(f"{name}字段超出范围 {low}-{high}: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule(object):
+    """cron 时间表，next_after(时间) 返回该时间之后的下一个执行时间"""
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        text = _ALIASES.get(self.expression, self.expression)
+        self.interval = None
+        if text.startswith('@every'):
+            value = text[len('@every'):].strip()
+            try:
+                seconds = float(value[:-1]) * _UNITS[value[-1]]
+            except (KeyError, ValueError, IndexError):
+                raise ValueError(f"无法识别的间隔: {expression}，应为如 @every 15m 的形式")
+            if seconds <= 0:
+                raise ValueError(f"间隔必须为正数: {expression}")
+            self.interval = timedelta(seconds=seconds)
+            return
+
+        parts = text.split()
+        if len(parts) != 5:
+            raise ValueError(f"时间表应包含5个字段（分 时 日 月 星期）: {expression}")
+        fields = [_parse_field(part, *spec) for part, spec in zip(parts, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        # cron 中 0 和 7 都表示星期日；Python 的 weekday() 中星期一为 0
+        self.weekdays = {(d - 1) % 7 for d in weekdays}
+        # 与 cron 相同：日和星期都有限制时，满足其一即可
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment):
+        if self.interval is not None:
+            return moment + self.interval
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 按天、小时、分钟逐级跳过不匹配的时间，最多查找约4年（覆盖 2月29日）
+        limit = candidate + timedelta(days=366 * 4 + 1)
+        while candidate <= limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"时间表永远不会执行: {self.expression}")
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
+
+
+class ScheduledJob(object):
+    """一个定时执行的查询；config_at(时间) 返回该次执行使用的查询配置（日期为最近 days 天）"""
+
+    def __init__(self, name, schedule, config, days=DEFAULT_DAYS, jitter=DEFAULT_JITTER):
+        self.name = name
+        self.schedule = schedule if isinstance(schedule, CronSchedule) else CronSchedule(schedule)
+        self.config = config
+        self.days = days
+        self.jitter = max(0.0, float(jitter))
+        self.next_run = None
+        self.runs = 0
+
+    def config_at(self, moment):
+        config = dict(self.config)
+        if self.days:
+            config['start_date'] = (moment - timedelta(days=self.days)).strftime('%Y:%m:%d')
+            config['end_date'] = moment.strftime('%Y:%m:%d')
+            config['time_type'] = 6
+        return config
+
+    def plan(self, moment):
+        """安排 moment 之后的下一次执行，加上随机推迟"""
+        delay = random.uniform(0, self.jitter) if self.jitter else 0.0
+        self.next_run = self.schedule.next_after(moment) + timedelta(seconds=delay)
+        return self.next_run
+
+
+def load_jobs(path, base_config=None):
+    """读取任务文件，返回 ScheduledJob 列表；defaults 和 base_config 作为各任务查询的基础"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    defaults = dict(base_config or {})
+    defaults.update(data.get('defaults', {}))
+    jitter = data.get('jitter', DEFAULT_JITTER)
+    jobs = []
+    for i, item in enumerate(data.get('jobs', []), start=1):
+        if 'schedule' not in item:
+            raise ValueError(f"第 {i} 个任务缺少 schedule")
+        config = dict(defaults, **item.get('query', {}))
+        jobs.append(ScheduledJob(item.get('name') or f"任务{i}", item['schedule'], config,
+                                 days=item.get('days', data.get('days', DEFAULT_DAYS)),
+                                 jitter=item.get('jitter', jitter)))
+    return jobs
+
+
+class Scheduler(object):
+    """
+    在当前线程中按时间表依次执行任务，直到调用 stop()。
+
+    run_job(任务, 查询配置) 由调用方提供；单次执行抛出的异常只记录日志，不影响之后的执行。
+    """
+
+    def __init__(self, jobs, run_job, log=None):
+        self.jobs = jobs
+        self.run_job = run_job
+        self.log = log or (lambda message: None)
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        if not self.jobs:
+            self.log("没有定时任务。")
+            return
+        for job in self.jobs:
+            job.plan(datetime.now())
+            self.log(f"[{job.name}] {job.schedule.expression}，下次执行 {job.next_run:%Y-%m-%d %H:%M:%S}")
+
+        while not self.stopped.is_set():
+            job = min(self.jobs, key=lambda j: j.next_run)
+            remaining = (job.next_run - datetime.now()).total_seconds()
+            if remaining > 0:
+                # 分段等待，系统时间被调整后也能及时重新计算
+                self.stopped.wait(min(remaining, 60))
+                continue
+
+            started = datetime.now()
+            try:
+                self.run_job(job, job.config_at(started))
+            except Exception as e:
+                self.log(f"[{job.name}] 执行失败: {e}")
+            job.runs += 1
+            job.plan(datetime.now())
+            elapsed = (datetime.now() - started).total_seconds()
+            self.log(f"[{job.name}] 用时 {elapsed:.1f} 秒，下次执行 {job.next_run:%Y-%m-%d %H:%M:%S}")
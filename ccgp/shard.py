@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+按日期分片的回填抓取。
+
+把 start_date..end_date 拆成按天或按周的若干分片，每个分片是一次独立的查询，
+多个分片并行抓取并共享同一个网络会话、限速器和熔断器。每个分片的结果单独写入
+分片目录中的 JSON Lines 文件，写完后才改为正式文件名，因此：
+
+- 正式文件存在即表示该分片已完成，重新运行时自动跳过；
+- 单个分片失败或被中断只需重抓这一个分片；分片内已完成的页面记在该分片的断点日志
+  （<分片标识>.checkpoint）中，重抓时直接读出，只请求剩余的页面。
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from .checkpoint import CrawlCheckpoint
+from .engine import CrawlEngine, create_session
+from .record import Announcement
+from .cache import ResponseCache
+from .parsepool import ParserPool
+from .proxypool import ProxyPool
+from .ratelimit import AdaptiveRateLimiter
+from .retry import CircuitBreaker
+
+SHARD_UNITS = {'day': 1, 'week': 7}
+
+
+def parse_date(value):
+    """解析 yyyy-MM-dd 或 yyyy:MM:dd 格式的日期，返回 (date, 分隔符)"""
+    for sep in ('-', ':', '.'):
+        try:
+            return datetime.strptime(value, f'%Y{sep}%m{sep}%d').date(), sep
+        except ValueError:
+            continue
+    raise ValueError(f"无法识别的日期格式: {value}")
+
+
+def split_date_range(start_date, end_date, unit='day'):
+    """把日期区间拆成按天或按周的分片，返回 [(开始日期, 结束日期), ...]，日期格式与输入一致"""
+    if unit not in SHARD_UNITS:
+        raise ValueError(f"不支持的分片单位: {unit}")
+    start, sep = parse_date(start_date)
+    end, _ = parse_date(end_date)
+    if end < start:
+        raise ValueError("结束日期早于开始日期")
+
+    fmt = f'%Y{sep}%m{sep}%d'
+    step = timedelta(days=SHARD_UNITS[unit])
+    shards = []
+    current = start
+    while current <= end:
+        shard_end = min(current + step - timedelta(days=1), end)
+        shards.append((current.strftime(fmt), shard_end.strftime(fmt)))
+        current = shard_end + timedelta(days=1)
+    return shards
+
+
+def shard_id(start_date, end_date):
+    """分片标识，同时用作分片结果文件名"""
+    return f"{start_date}_{end_date}".replace(':', '-')
+
+
+class ShardedCrawl(object):
+    """
+    分片回填任务。
+
+    config 为普通查询配置（含 start_date / end_date），workers 为同时抓取的分片数；
+    shard_dir 下每个已完成分片对应一个 <分片标识>.jsonl 文件。
+    """
+
+    def __init__(self, config, shard_dir, unit='day', workers=2, log=None, session=None, limiter=None, cache=None,
+                 breaker=None, parser_pool=None, proxy_pool=None, metrics=None, profiler=None):
+        self.config = config
+        self.shard_dir = shard_dir
+        self.unit = unit
+        self.workers = max(1, int(workers))
+        self.log = log or (lambda message: None)
+        self.session = session if session is not None else create_session(config)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter.from_config(dict(config, concurrency=self.workers))
+        self.limiter = limiter
+        self.cache = cache if cache is not None else ResponseCache.from_config(config)
+        self.breaker = breaker if breaker is not None else CircuitBreaker.from_config(config)
+        self.parser_pool = parser_pool if parser_pool is not None else ParserPool.from_config(config)
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool.from_config(config, self.log)
+        self.metrics = metrics
+        self.profiler = profiler
+        self.is_running = True
+        self.engines = set()
+        self.lock = threading.Lock()
+        self.shards = split_date_range(config['start_date'], config['end_date'], unit)
+        os.makedirs(shard_dir, exist_ok=True)
+
+    def shard_path(self, start_date, end_date):
+        return os.path.join(self.shard_dir, shard_id(start_date, end_date) + '.jsonl')
+
+    def checkpoint_path(self, start_date, end_date):
+        return os.path.join(self.shard_dir, shard_id(start_date, end_date) + '.checkpoint')
+
+    def pending_shards(self):
+        """尚未完成的分片"""
+        return [(s, e) for s, e in self.shards if not os.path.exists(self.shard_path(s, e))]
+
+    def stop(self):
+        self.is_running = False
+        with self.lock:
+            engines = list(self.engines)
+        for engine in engines:
+            engine.stop()
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+        if self.parser_pool is not None:
+            self.parser_pool.close()
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+    def _crawl_shard(self, start_date, end_date):
+        """抓取单个分片并写入分片文件，返回抓取条数；被停止时返回None"""
+        shard_config = dict(self.config, start_date=start_date, end_date=end_date, time_type=6)
+        name = shard_id(start_date, end_date)
+        checkpoint = CrawlCheckpoint(self.checkpoint_path(start_date, end_date), shard_config, resume=True)
+        engine = CrawlEngine(shard_config, session=self.session, limiter=self.limiter, cache=self.cache,
+                             breaker=self.breaker, parser_pool=self.parser_pool, proxy_pool=self.proxy_pool,
+                             metrics=self.metrics, profiler=self.profiler,
+                             checkpoint=checkpoint,
+                             log=lambda message: self.log(f"[{name}] {message}"))
+        with self.lock:
+            self.engines.add(engine)
+
+        final_path = self.shard_path(start_date, end_date)
+        part_path = final_path + '.part'
+        count = 0
+        try:
+            with open(part_path, 'w', encoding='utf-8') as f:
+                for record in engine.iter_records():
+                    f.write(json.dumps(record.to_dict(), ensure_ascii=False) + '\n')
+                    count += 1
+            # 有页面最终失败的分片不标记为完成，下次运行时重新抓取
+            if not engine.is_running or not self.is_running or engine.failed_pages:
+                return None
+            os.replace(part_path, final_path)
+            checkpoint.finish()
+            return count
+        finally:
+            checkpoint.close()
+            with self.lock:
+                self.engines.discard(engine)
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    def run(self):
+        """并行抓取所有未完成的分片，返回失败的分片列表"""
+        pending = self.pending_shards()
+        total = len(self.shards)
+        done = total - len(pending)
+        self.log(f"共 {total} 个分片，已完成 {done} 个，待抓取 {len(pending)} 个")
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._crawl_shard, s, e): (s, e) for s, e in pending}
+            try:
+                for future in as_completed(futures):
+                    start_date, end_date = futures[future]
+                    name = shard_id(start_date, end_date)
+                    try:
+                        count = future.result()
+                    except Exception as e:
+                        failed.append((start_date, end_date))
+                        self.log(f"分片 {name} 抓取失败: {e}")
+                        continue
+                    if count is None:
+                        failed.append((start_date, end_date))
+                        continue
+                    done += 1
+                    self.log(f"分片 {name} 完成，{count} 条数据（{done}/{total}）")
+            except KeyboardInterrupt:
+                # 先停止所有分片，线程池退出时才不会一直等待
+                self.stop()
+                for future in futures:
+                    future.cancel()
+                raise
+        return failed
+
+    def iter_records(self):
+        """按日期顺序读出所有已完成分片中的记录"""
+        for start_date, end_date in self.shards:
+            path = self.shard_path(start_date, end_date)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield Announcement.from_dict(json.loads(line))
@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+"""
+基于 SQLite 的公告库。
+
+以详情链接（href）为主键保存抓取到的公告，按日期、采购人、代理机构建索引。
+去重和历史查询都走主键/索引，耗时与历史数据量基本无关；
+写入按批在单个事务中完成，已存在的公告只更新最近一次出现的时间和字段内容。
+
+标题、项目概况、采购人、代理机构和详情字段另建 FTS5 全文索引（trigram 分词，按连续3个字切分，
+不需要中文词典），由触发器随公告表自动更新。search() 按搜索词、日期范围、区域和公告类型查询：
+3个字及以上的搜索词走全文索引；trigram 索引无法匹配1~2个字的搜索词，这些词走另建的二字索引
+（相邻两个字为一个词，见 bigrams()），只有含标点等符号的短词才在其余条件筛出的公告中逐行匹配。
+SQLite 低于 3.34 时没有 trigram 分词器，3个字及以上的搜索词逐行匹配。
+
+二字索引的切词在 Python 中完成，由 upsert_many() 在写入公告的同一事务中更新，不使用触发器，
+其他程序仍可直接写入公告表：新增的公告在下次打开公告库时补入二字索引，
+修改已有公告后需用 rebuild_search_index() 重建索引。
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_STORE = 'announcements.db'
+
+# SQLite 单条语句的参数个数有限，IN 查询按该大小分批
+QUERY_CHUNK = 500
+
+DEFAULT_SEARCH_LIMIT = 200
+# trigram 分词器能匹配的最短搜索词，更短的词走二字索引
+TRIGRAM_LENGTH = 3
+# 全文索引匹配的公告不超过该数时按匹配结果逐条取出再排序，否则沿日期索引倒序扫描，取够 limit 条即停止
+SEARCH_SCAN_THRESHOLD = 2000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS announcements (
+    href          TEXT PRIMARY KEY,
+    title         TEXT NOT NULL,
+    date          TEXT,
+    buyer         TEXT,
+    agent         TEXT,
+    region        TEXT,
+    summary       TEXT,
+    keyword       TEXT,
+    bid_type      TEXT,
+    bid_type_name TEXT,
+    zone_id       TEXT,
+    detail        TEXT,
+    first_seen    TEXT NOT NULL,
+    last_seen     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_announcements_date ON announcements(date);
+CREATE INDEX IF NOT EXISTS idx_announcements_buyer ON announcements(buyer);
+CREATE INDEX IF NOT EXISTS idx_announcements_agent ON announcements(agent);
+CREATE INDEX IF NOT EXISTS idx_announcements_bid_type ON announcements(bid_type, date);
+CREATE TABLE IF NOT EXISTS watermarks (
+    fingerprint TEXT PRIMARY KEY,
+    newest_href TEXT NOT NULL,
+    newest_date TEXT,
+    updated_at  TEXT NOT NULL
+);
+'''
+
+UPSERT_SQL = '''
+INSERT INTO announcements (href, title, date, buyer, agent, region, summary, keyword,
+                           bid_type, bid_type_name, zone_id, detail, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(href) DO UPDATE SET
+    title = excluded.title,
+    date = excluded.date,
+    buyer = excluded.buyer,
+    agent = excluded.agent,
+    region = excluded.region,
+    summary = excluded.summary,
+    bid_type = CASE WHEN excluded.bid_type != '0' THEN excluded.bid_type ELSE announcements.bid_type END,
+    bid_type_name = CASE WHEN excluded.bid_type != '0' THEN excluded.bid_type_name ELSE announcements.bid_type_name END,
+    zone_id = CASE WHEN excluded.zone_id != '' THEN excluded.zone_id ELSE announcements.zone_id END,
+    detail = COALESCE(excluded.detail, announcements.detail),
+    last_seen = excluded.last_seen
+'''
+
+# 详情字段（JSON）中的文字值，以空格连接后写入全文索引
+DETAIL_TEXT = "(SELECT group_concat(value, ' ') FROM json_each({row}.detail) WHERE type = 'text')"
+
+SEARCH_COLUMNS = ['title', 'summary', 'buyer', 'agent', 'detail']
+# 写入全文索引的各字段值
+INDEXED_VALUES = ', '.join(SEARCH_COLUMNS[:-1] + [DETAIL_TEXT.format(row='announcements')])
+
+# 无内容（contentless）的全文索引只保存索引本身，文字仍在公告表中；
+# 删除时需要提供写入时的原值，由触发器从旧行中取得
+SEARCH_SCHEMA = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS announcements_fts USING fts5(
+    title, summary, buyer, agent, detail, content='', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS announcements_fts_insert AFTER INSERT ON announcements BEGIN
+    INSERT INTO announcements_fts (rowid, title, summary, buyer, agent, detail)
+    VALUES (new.rowid, new.title, new.summary, new.buyer, new.agent, {new_detail});
+END;
+CREATE TRIGGER IF NOT EXISTS announcements_fts_delete AFTER DELETE ON announcements BEGIN
+    INSERT INTO announcements_fts (announcements_fts, rowid, title, summary, buyer, agent, detail)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.buyer, old.agent, {old_detail});
+END;
+CREATE TRIGGER IF NOT EXISTS announcements_fts_update AFTER UPDATE OF title, summary, buyer, agent, detail
+ON announcements
+WHEN old.title IS NOT new.title OR old.summary IS NOT new.summary OR old.buyer IS NOT new.buyer
+     OR old.agent IS NOT new.agent OR old.detail IS NOT new.detail
+BEGIN
+    INSERT INTO announcements_fts (announcements_fts, rowid, title, summary, buyer, agent, detail)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.buyer, old.agent, {old_detail});
+    INSERT INTO announcements_fts (rowid, title, summary, buyer, agent, detail)
+    VALUES (new.rowid, new.title, new.summary, new.buyer, new.agent, {new_detail});
+END;
+'''.format(new_detail=DETAIL_TEXT.format(row='new'), old_detail=DETAIL_TEXT.format(row='old'))
+
+# 1~2个字的搜索词使用的二字索引，写入的是 bigrams() 切好的词，以空格分开；单字前缀索引用于单字搜索。
+# 查询都是单个词，不需要词的位置（detail='none'），索引小得多。
+# 该索引不用触发器维护（切词需要 Python），由 upsert_many() 在同一事务中更新
+BIGRAM_SCHEMA = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS announcements_bigram USING fts5(
+    title, summary, buyer, agent, detail, content='',
+    tokenize='unicode61 remove_diacritics 0', prefix='1', detail='none'
+);
+'''
+
+# 二字索引只收录连续的文字和数字，标点、空白和下划线处断开
+_WORD_RUN = re.compile(r'[^\W_]+')
+
+
+COLUMNS = ['href', 'title', 'date', 'buyer', 'agent', 'region', 'summary', 'keyword',
+           'bid_type', 'bid_type_name', 'zone_id', 'detail', 'first_seen', 'last_seen']
+
+
+def record_key(record):
+    """记录主键：详情链接；个别缺少链接的记录退化为 标题|日期"""
+    if record.href:
+        return record.href
+    return f"title:{record.title}|{record.date}"
+
+
+def normalize_date(value):
+    """把列表页中的 2025.07.09 统一为 2025-07-09，便于按日期范围查询"""
+    return (value or '').replace('.', '-').replace(':', '-')[:10]
+
+
+def split_terms(text):
+    """搜索词按空白分开，各词之间为“且”的关系"""
+    return (text or '').split()
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def bigrams(text):
+    """
+    二字索引写入的内容：每段连续的文字、数字切成相邻两个字的词，再加上末尾的单字，以空格分开，
+    例如 “医疗设备A1” 为 “医疗 疗设 设备 备A A1 1”。两个字的搜索词即其中一个词，单字为某个词的前缀。
+    """
+    if not text:
+        return text
+    tokens = []
+    for run in _WORD_RUN.findall(text):
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        tokens.append(run[-1])
+    return ' '.join(tokens)
+
+
+def _bigram_query(term):
+    """1~2个字的搜索词在二字索引中的查询；含标点等符号时返回 None"""
+    if not _WORD_RUN.fullmatch(term):
+        return None
+    return f'"{term}"' if len(term) == 2 else f'"{term}"*'
+
+
+def _like_pattern(term):
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+class AnnouncementStore(object):
+    """
+    公告库。可在多个线程间共享，内部用锁串行化对连接的访问。
+    """
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        # 旧版本创建的公告库没有 detail 列
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(announcements)')}
+        if 'detail' not in columns:
+            self.conn.execute('ALTER TABLE announcements ADD COLUMN detail TEXT')
+        self.conn.commit()
+        self.fts = self._create_search_index()
+        self.bigram = self._create_bigram_index()
+
+    def _create_search_index(self):
+        """创建全文索引；已有公告的旧公告库在首次打开时建立索引。不支持 trigram 时返回 False"""
+        created = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'announcements_fts'").fetchone()
+        try:
+            self.conn.executescript(SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        if created is None and self.count():
+            self._rebuild_trigram_index()
+        return True
+
+    def _create_bigram_index(self):
+        """
+        创建二字索引，并编入索引中还没有的公告（旧公告库中的公告、其他程序直接写入公告表的公告）。
+        SQLite 不支持 FTS5 时返回 False
+        """
+        try:
+            # 上一版本由触发器调用连接上注册的 Python 函数维护二字索引，其他程序写入公告表会失败
+            for name in ('insert', 'delete', 'update'):
+                self.conn.execute(f'DROP TRIGGER IF EXISTS announcements_bigram_{name}')
+            self.conn.executescript(BIGRAM_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        self._index_missing_bigrams()
+        return True
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM announcements').fetchone()[0]
+
+    def contains(self, key):
+        with self.lock:
+            row = self.conn.execute('SELECT 1 FROM announcements WHERE href = ?', (key,)).fetchone()
+        return row is not None
+
+    def recent_keys(self, since):
+        """日期不早于 since 的公告主键"""
+        with self.lock:
+            return {row[0] for row in self.conn.execute('SELECT href FROM announcements WHERE date >= ?',
+                                                       (normalize_date(since),))}
+
+    def existing_keys(self, keys):
+        """返回 keys 中已经在库里的主键集合"""
+        keys = list(set(keys))
+        found = set()
+        with self.lock:
+            for i in range(0, len(keys), QUERY_CHUNK):
+                chunk = keys[i:i + QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                sql = f'SELECT href FROM announcements WHERE href IN ({placeholders})'
+                found.update(row[0] for row in self.conn.execute(sql, chunk))
+        return found
+
+    def filter_new(self, records):
+        """过滤出库中还没有的记录（同一批内部也去重）"""
+        existing = self.existing_keys(record_key(r) for r in records)
+        new_records = []
+        for record in records:
+            key = record_key(record)
+            if key not in existing:
+                existing.add(key)
+                new_records.append(record)
+        return new_records
+
+    def upsert_many(self, records):
+        """在一个事务中批量写入记录，返回写入条数"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = [(
+            record_key(r), r.title, r.published.isoformat() if r.published else normalize_date(r.date),
+            r.buyer, r.agent, r.region, r.summary, r.keyword, r.bid_type, r.bid_type_name, r.zone_id,
+            json.dumps(r.detail, ensure_ascii=False) if r.detail is not None else None, now, now,
+        ) for r in records]
+        if not rows:
+            return 0
+        keys = list({row[0] for row in rows})
+        with self.lock:
+            with self.conn:
+                before = self._indexed_rows(keys) if self.bigram else None
+                self.conn.executemany(UPSERT_SQL, rows)
+                if self.bigram:
+                    # 只重新编入新增和索引字段有变化的公告
+                    after = self._indexed_rows(keys)
+                    changed = [key for key, row in after.items() if before.get(key) != row]
+                    self._write_bigrams([before[key] for key in changed if key in before], delete=True)
+                    self._write_bigrams([after[key] for key in changed])
+        return len(rows)
+
+    def _indexed_rows(self, keys):
+        """主键 -> (rowid, 各索引字段的值)"""
+        result = {}
+        for i in range(0, len(keys), QUERY_CHUNK):
+            chunk = keys[i:i + QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            sql = f'SELECT href, rowid, {INDEXED_VALUES} FROM announcements WHERE href IN ({placeholders})'
+            result.update((row[0], tuple(row[1:])) for row in self.conn.execute(sql, chunk))
+        return result
+
+    def _write_bigrams(self, rows, delete=False):
+        """把 (rowid, 各索引字段的值) 切词后写入二字索引；delete 为 True 时按写入时的原值删除"""
+        if delete:
+            sql = ("INSERT INTO announcements_bigram (announcements_bigram, rowid, title, summary, buyer, agent, "
+                   "detail) VALUES ('delete', ?, ?, ?, ?, ?, ?)")
+        else:
+            sql = 'INSERT INTO announcements_bigram (rowid, title, summary, buyer, agent, detail) VALUES (?, ?, ?, ?, ?, ?)'
+        self.conn.executemany(sql, [(row[0],) + tuple(bigrams(value) for value in row[1:]) for row in rows])
+
+    def _index_missing_bigrams(self):
+        """把二字索引中还没有的公告编入索引"""
+        with self.lock:
+            rowids = [row[0] for row in self.conn.execute(
+                'SELECT rowid FROM announcements WHERE rowid NOT IN (SELECT id FROM announcements_bigram_docsize)')]
+            with self.conn:
+                for i in range(0, len(rowids), QUERY_CHUNK):
+                    chunk = rowids[i:i + QUERY_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    self._write_bigrams(self.conn.execute(
+                        f'SELECT rowid, {INDEXED_VALUES} FROM announcements WHERE rowid IN ({placeholders})',
+                        chunk).fetchall())
+
+    def rebuild_search_index(self):
+        """按公告表重建全文索引；其他程序修改过公告表后用于恢复索引"""
+        if self.fts:
+            self._rebuild_trigram_index()
+        if self.bigram:
+            with self.lock:
+                with self.conn:
+                    self.conn.execute("INSERT INTO announcements_bigram (announcements_bigram) VALUES ('delete-all')")
+                self._index_missing_bigrams()
+
+    def _rebuild_trigram_index(self):
+        columns = ', '.join(SEARCH_COLUMNS)
+        with self.lock:
+            with self.conn:
+                self.conn.execute("INSERT INTO announcements_fts (announcements_fts) VALUES ('delete-all')")
+                self.conn.execute(f'INSERT INTO announcements_fts (rowid, {columns}) '
+                                  f'SELECT rowid, {INDEXED_VALUES} FROM announcements')
+
+    def get_watermark(self, fingerprint):
+        """读取查询上次抓取到的最新公告 (详情链接, 日期)，没有记录时返回 None"""
+        with self.lock:
+            row = self.conn.execute('SELECT newest_href, newest_date FROM watermarks WHERE fingerprint = ?',
+                                    (fingerprint,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set_watermark(self, fingerprint, newest_href, newest_date):
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    'INSERT INTO watermarks (fingerprint, newest_href, newest_date, updated_at) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT(fingerprint) DO UPDATE SET newest_href = excluded.newest_href, '
+                    'newest_date = excluded.newest_date, updated_at = excluded.updated_at',
+                    (fingerprint, newest_href, normalize_date(newest_date), now))
+
+    def query(self, start_date=None, end_date=None, buyer=None, agent=None, limit=None):
+        """按日期范围、采购人、代理机构查询历史公告，结果按日期倒序；detail 列解析为字典"""
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append('date >= ?')
+            params.append(normalize_date(start_date))
+        if end_date:
+            conditions.append('date <= ?')
+            params.append(normalize_date(end_date))
+        if buyer:
+            conditions.append('buyer = ?')
+            params.append(buyer)
+        if agent:
+            conditions.append('agent = ?')
+            params.append(agent)
+        sql = 'SELECT * FROM announcements'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY date DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return self._fetch(sql, params)
+
+    def search(self, text='', start_date=None, end_date=None, zone_id=None, bid_type=None,
+               limit=DEFAULT_SEARCH_LIMIT):
+        """
+        在标题、项目概况、采购人、代理机构和详情字段中搜索，结果按日期倒序，最多 limit 条。
+
+        text 中以空格分开的各词都须出现（不区分英文大小写）；zone_id 按抓取时的区域代码前缀匹配，
+        bid_type 为抓取时的公告类型代码，'0' 或空表示不限。
+        """
+        return self._fetch(*self._search_sql(text, start_date, end_date, zone_id, bid_type, limit))
+
+    def _search_sql(self, text, start_date, end_date, zone_id, bid_type, limit):
+        conditions = []
+        params = {}
+        matches = {'announcements_fts': [], 'announcements_bigram': []}
+        for term in split_terms(text):
+            if len(term) >= TRIGRAM_LENGTH:
+                if self.fts:
+                    matches['announcements_fts'].append(_fts_phrase(term))
+                    continue
+            elif self.bigram:
+                query = _bigram_query(term)
+                if query is not None:
+                    matches['announcements_bigram'].append(query)
+                    continue
+            name = f"t{len(params)}"
+            params[name] = _like_pattern(term)
+            like = f"LIKE :{name} ESCAPE '\\'"
+            # 详情字段先在 JSON 原文中匹配，命中后再排除只匹配到字段名的情况
+            conditions.append('(' + ' OR '.join(f"{column} {like}" for column in SEARCH_COLUMNS[:-1])
+                              + f" OR (detail {like} AND {DETAIL_TEXT.format(row='announcements')} {like}))")
+        for table, queries in matches.items():
+            if not queries:
+                continue
+            name = table.split('_')[-1]
+            params[name] = ' AND '.join(queries)
+            # 常见的词匹配大量公告，逐条取出再排序反而比沿日期索引扫描慢；
+            # 加 + 号使 SQLite 不按 rowid 逐条取出，改用日期索引
+            rowid = 'rowid' if self._few_matches(table, params[name]) else '+rowid'
+            conditions.append(f'{rowid} IN (SELECT rowid FROM {table} WHERE {table} MATCH :{name})')
+        if start_date:
+            conditions.append('date >= :start_date')
+            params['start_date'] = normalize_date(start_date)
+        if end_date:
+            conditions.append('date <= :end_date')
+            params['end_date'] = normalize_date(end_date)
+        if zone_id:
+            conditions.append("zone_id LIKE :zone_id ESCAPE '\\'")
+            params['zone_id'] = _like_pattern(str(zone_id))[1:]
+        if bid_type and str(bid_type) != '0':
+            conditions.append('bid_type = :bid_type')
+            params['bid_type'] = str(bid_type)
+        sql = 'SELECT * FROM announcements'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        # 日期索引中同一日期的公告按 rowid 排列，倒序扫描即为最近写入的在前
+        sql += ' ORDER BY date DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return sql, params
+
+    def _few_matches(self, table, match):
+        with self.lock:
+            count = self.conn.execute(f'SELECT COUNT(*) FROM (SELECT rowid FROM {table} '
+                                      f'WHERE {table} MATCH ? LIMIT ?)',
+                                      (match, SEARCH_SCAN_THRESHOLD)).fetchone()[0]
+        return count < SEARCH_SCAN_THRESHOLD
+
+    def _fetch(self, sql, params):
+        with self.lock:
+            rows = [dict(row) for row in self.conn.execute(sql, params)]
+        for row in rows:
+            if row['detail']:
+                row['detail'] = json.loads(row['detail'])
+        return rows
+
+
+class KnownKeys(object):
+    """
+    常驻进程使用的去重缓存，接口与 AnnouncementStore 的去重部分一致，可直接交给 IncrementalTracker。
+
+    创建时载入最近 days 天公告的主键，之后写入的记录也加入内存；
+    内存中没有的主键再查询公告库，查到的同样留在内存中。高水位也缓存在内存中。
+    """
+
+    def __init__(self, store, days=30):
+        self.store = store
+        since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        self.keys = store.recent_keys(since)
+        self.watermarks = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def existing_keys(self, keys):
+        keys = set(keys)
+        found = keys & self.keys
+        missing = keys - found
+        if missing:
+            stored = self.store.existing_keys(missing)
+            self.keys.update(stored)
+            found |= stored
+        return found
+
+    def filter_new(self, records):
+        existing = self.existing_keys(record_key(r) for r in records)
+        new_records = []
+        for record in records:
+            key = record_key(record)
+            if key not in existing:
+                existing.add(key)
+                new_records.append(record)
+        return new_records
+
+    def upsert_many(self, records):
+        count = self.store.upsert_many(records)
+        self.keys.update(record_key(r) for r in records)
+        return count
+
+    def get_watermark(self, fingerprint):
+        if fingerprint not in self.watermarks:
+            self.watermarks[fingerprint] = self.store.get_watermark(fingerprint)
+        return self.watermarks[fingerprint]
+
+    def set_watermark(self, fingerprint, newest_href, newest_date):
+        self.store.set_watermark(fingerprint, newest_href, newest_date)
+        self.watermarks[fingerprint] = (newest_href, normalize_date(newest_date))
+
+
+class StoreWriter(object):
+    """
+    把记录流写入公告库：先在内存中缓冲，满 batch_size 条后在一个事务中写入，
+    close() 时写入剩余部分。
+    """
+
+    def __init__(self, store, batch_size=200):
+        self.store = store
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0
+
+    def write(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.count += self.store.upsert_many(self.buffer)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+分布式抓取使用的任务队列。
+
+协调节点把任务发布到队列，各抓取节点领取任务时获得有期限的租约，抓取期间定期续约，
+完成后提交结果。节点崩溃或断网导致租约过期后，任务可被其他节点重新领取；
+提交结果时校验租约仍属于自己，被收回的任务的迟到结果会被丢弃，同一任务的结果只保存一份。
+
+WorkQueue 定义队列接口，SQLiteWorkQueue 是不依赖外部服务的实现：队列文件放在各节点都能访问的
+共享目录中即可。其他后端（如 Redis）实现相同接口后加入 QUEUE_BACKENDS，用 scheme://地址 打开。
+租约时间按各节点的本机时钟计算，各节点的时钟需大致同步（误差远小于租约时长）。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    name       TEXT PRIMARY KEY,
+    meta       TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    job         TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    updated_at  TEXT NOT NULL,
+    UNIQUE (job, key)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, id);
+CREATE TABLE IF NOT EXISTS results (
+    task_id INTEGER PRIMARY KEY,
+    job     TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    data    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_job ON results(job, key);
+'''
+
+
+def _now_text():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class Task(object):
+    """领取到的任务；payload 为发布时的 JSON 对象，attempts 为包括本次在内的领取次数"""
+
+    def __init__(self, id, job, key, payload, attempts):
+        self.id = id
+        self.job = job
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.job!r}, {self.key!r})"
+
+
+class WorkQueue(object):
+    """
+    任务队列接口。
+
+    任务由 (作业名, 任务键) 唯一确定，重复发布同一任务不会产生新任务；结果按任务键排序读出。
+    """
+
+    def publish(self, job, tasks, meta=None):
+        """发布作业中的任务，tasks 为 [(任务键, payload)]，返回新增的任务数"""
+        raise NotImplementedError
+
+    def claim(self, worker, lease):
+        """领取一个待处理或租约已过期的任务，租约为 lease 秒；没有任务时返回 None"""
+        raise NotImplementedError
+
+    def renew(self, task, worker, lease):
+        """续约，租约已不属于 worker 时返回 False"""
+        raise NotImplementedError
+
+    def complete(self, task, worker, records):
+        """提交结果并标记任务完成；租约已不属于 worker 时丢弃结果并返回 False"""
+        raise NotImplementedError
+
+    def fail(self, task, worker, error):
+        """报告失败：领取次数未达上限时放回队列，否则标记为失败"""
+        raise NotImplementedError
+
+    def release(self, task, worker):
+        """放弃任务（节点停止），放回队列且不计入领取次数"""
+        raise NotImplementedError
+
+    def status(self, job=None):
+        """各状态的任务数；租约已过期的任务另计为 expired"""
+        raise NotImplementedError
+
+    def failures(self, job):
+        """失败任务的 [(任务键, 错误信息)]"""
+        raise NotImplementedError
+
+    def iter_results(self, job):
+        """按任务键顺序生成 (任务键, 记录列表)"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    基于 SQLite 文件的任务队列，可由多个进程（包括通过共享目录访问的其他机器）同时使用。
+
+    领取任务在 BEGIN IMMEDIATE 事务中完成，同一任务不会被两个节点同时领取。
+    共享目录（SMB/NFS）上不能使用 WAL 模式，这里保留默认的回滚日志。
+    """
+
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS, timeout=60):
+        self.path = path
+        self.max_attempts = max(1, int(max_attempts))
+        self.lock = threading.RLock()
+        # 自行控制事务，写操作前用 BEGIN IMMEDIATE 取得写锁
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    def _write(self, func):
+        """在写事务中执行 func(conn) 并返回其结果"""
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = func(self.conn)
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            return result
+
+    def publish(self, job, tasks, meta=None):
+        def insert(conn):
+            now = _now_text()
+            conn.execute('INSERT OR IGNORE INTO jobs (name, meta, created_at) VALUES (?, ?, ?)',
+                         (job, json.dumps(meta or {}, ensure_ascii=False), now))
+            added = 0
+            for key, payload in tasks:
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO tasks (job, key, payload, status, updated_at) VALUES (?, ?, ?, ?, ?)',
+                    (job, key, json.dumps(payload, ensure_ascii=False), PENDING, now))
+                added += cursor.rowcount
+            return added
+        return self._write(insert)
+
+    def claim(self, worker, lease):
+        def take(conn):
+            now = time.time()
+            # 租约过期且领取次数已达上限的任务不再重试
+            conn.execute("UPDATE tasks SET status = ?, error = '多次领取后租约超时', updated_at = ? "
+                         "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                         (FAILED, _now_text(), LEASED, now, self.max_attempts))
+            row = conn.execute('SELECT id, job, key, payload, attempts FROM tasks '
+                               'WHERE status = ? OR (status = ? AND lease_until < ?) ORDER BY id LIMIT 1',
+                               (PENDING, LEASED, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, '
+                         'updated_at = ? WHERE id = ?', (LEASED, worker, now + lease, _now_text(), row[0]))
+            return Task(row[0], row[1], row[2], json.loads(row[3]), row[4] + 1)
+        return self._write(take)
+
+    def renew(self, task, worker, lease):
+        def extend(conn):
+            cursor = conn.execute('UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?',
+                                  (time.time() + lease, task.id, worker, LEASED))
+            return cursor.rowcount == 1
+        return self._write(extend)
+
+    def complete(self, task, worker, records):
+        data = '\n'.join(json.dumps(r, ensure_ascii=False) for r in records)
+
+        def finish(conn):
+            cursor = conn.execute('UPDATE tasks SET status = ?, lease_until = NULL, error = NULL, updated_at = ? '
+                                  'WHERE id = ? AND worker = ? AND status = ?',
+                                  (DONE, _now_text(), task.id, worker, LEASED))
+            if cursor.rowcount != 1:
+                return False
+            conn.execute('INSERT OR REPLACE INTO results (task_id, job, key, count, data) VALUES (?, ?, ?, ?, ?)',
+                         (task.id, task.job, task.key, len(records), data))
+            return True
+        return self._write(finish)
+
+    def fail(self, task, worker, error):
+        def mark(conn):
+            row = conn.execute('SELECT attempts FROM tasks WHERE id = ? AND worker = ? AND status = ?',
+                               (task.id, worker, LEASED)).fetchone()
+            if row is None:
+                return
+            status = FAILED if row[0] >= self.max_attempts else PENDING
+            conn.execute('UPDATE tasks SET status = ?, worker = NULL, lease_until = NULL, error = ?, updated_at = ? '
+                         'WHERE id = ?', (status, str(error)[:500], _now_text(), task.id))
+        self._write(mark)
+
+    def release(self, task, worker):
+        def give_back(conn):
+            conn.execute('UPDATE tasks SET status = ?, worker = NULL, lease_until = NULL, attempts = attempts - 1, '
+                         'updated_at = ? WHERE id = ? AND worker = ? AND status = ?',
+                         (PENDING, _now_text(), task.id, worker, LEASED))
+        self._write(give_back)
+
+    def status(self, job=None):
+        where, params = ('WHERE job = ?', [job]) if job is not None else ('', [])
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0, 'expired': 0}
+        with self.lock:
+            for status, count in self.conn.execute(f'SELECT status, COUNT(*) FROM tasks {where} GROUP BY status',
+                                                   params):
+                counts[status] = count
+            sql = f"SELECT COUNT(*) FROM tasks {where + ' AND' if where else 'WHERE'} status = ? AND lease_until < ?"
+            counts['expired'] = self.conn.execute(sql, params + [LEASED, time.time()]).fetchone()[0]
+        return counts
+
+    def failures(self, job):
+        with self.lock:
+            return self.conn.execute('SELECT key, error FROM tasks WHERE job = ? AND status = ? ORDER BY key',
+                                     (job, FAILED)).fetchall()
+
+    def iter_results(self, job):
+        with self.lock:
+            keys = [row[0] for row in self.conn.execute('SELECT key FROM results WHERE job = ? ORDER BY key', (job,))]
+        # 逐个任务读出，避免一次把整个作业的结果载入内存
+        for key in keys:
+            with self.lock:
+                row = self.conn.execute('SELECT data FROM results WHERE job = ? AND key = ?', (job, key)).fetchone()
+            if row is None or not row[0]:
+                continue
+            yield key, [json.loads(line) for line in row[0].split('\n')]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# 队列地址的 scheme 与实现；不带 scheme 的地址按 SQLite 文件路径处理
+QUEUE_BACKENDS = {
+    'sqlite': SQLiteWorkQueue,
+}
+
+
+def open_queue(url, **kwargs):
+    """按地址打开任务队列，如 sqlite:///mnt/share/queue.db 或直接写文件路径"""
+    scheme, sep, rest = url.partition('://')
+    if not sep:
+        return SQLiteWorkQueue(url, **kwargs)
+    if scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"不支持的任务队列: {url}（可用: {', '.join(sorted(QUEUE_BACKENDS))}）")
+    # sqlite:///abs/path 与 sqlite://relative/path 都取 :// 之后的部分作为路径
+    return QUEUE_BACKENDS[scheme](rest, **kwargs)
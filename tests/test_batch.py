@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""批量查询的分查询输出，使用 benchmarks.fakesite 的本地模拟搜索服务器"""
+
+import json
+import os
+
+from benchmarks.fakesite import FakeSearchServer
+from ccgp.batch import expand_queries, query_filename
+from ccgp.cli import main
+
+
+def test_query_filenames_are_unique_and_safe():
+    job = {'queries': [{'zone_id': '45', 'keyword': '医疗', 'buyer_name': '南宁市第一人民医院'},
+                       {'zone_id': '45', 'keyword': '医疗', 'buyer_name': '广西医科大学'},
+                       {'zone_id': '45', 'keyword': '医疗', 'start_date': '2025-01-01'},
+                       {'keyword': '设备/耗材: 采购'}]}
+    names = [query_filename(i, q) for i, q in enumerate(expand_queries(job))]
+    assert len(set(names)) == 4
+    assert names[0] == '01_45_医疗_所有'
+    assert names[3] == '04_全国_设备_耗材_采购_所有'
+    assert not any(sep in name for name in names for sep in ('/', '\\', ':', ' '))
+
+
+def test_per_query_output_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with FakeSearchServer(total=30) as server:
+        defaults = {'search_url': server.search_url, 'min_delay': 0.01, 'max_delay': 0.05,
+                    'start_date': '2025-07-01', 'end_date': '2025-07-01'}
+        job = {'defaults': defaults,
+               'queries': [{'keyword': '公告', 'buyer_name': '甲单位'},
+                           {'keyword': '公告', 'buyer_name': '乙单位'},
+                           {'keyword': 'a/b'}]}
+        job_path = tmp_path / 'job.json'
+        job_path.write_text(json.dumps(job, ensure_ascii=False), encoding='utf-8')
+        status = main(['batch', str(job_path), '--split', 'per-query', '--format', 'jsonl',
+                       '--save-path', str(tmp_path), '-o', 'sweep', '--workers', '2'])
+
+    assert status == 0
+    names = sorted(name for name in os.listdir(tmp_path) if name.startswith('sweep_'))
+    assert names == ['sweep_01_全国_公告_所有.jsonl', 'sweep_02_全国_公告_所有.jsonl', 'sweep_03_全国_a_b_所有.jsonl']
+    for name in names:
+        with open(tmp_path / name, encoding='utf-8') as f:
+            assert len(f.read().splitlines()) == 30
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""响应缓存的有效期、LRU 淘汰和离线回放，使用 benchmarks.fakesite 的本地模拟搜索服务器"""
+
+import time
+
+import pytest
+import requests
+
+from benchmarks.fakesite import FakeSearchServer
+from ccgp.cache import CacheMiss, ResponseCache
+from ccgp.engine import CrawlEngine, build_params
+
+
+def make_config(server, tmp_path, **extra):
+    config = {'search_url': server.search_url, 'min_delay': 0.01, 'max_delay': 0.05,
+              'start_date': '2025-07-01', 'end_date': '2025-07-01', 'time_type': 6,
+              'cache_dir': str(tmp_path / 'cache')}
+    config.update(extra)
+    return config
+
+
+def crawl(config):
+    engine = CrawlEngine(config)
+    try:
+        return [record.href for record in engine.iter_records()]
+    finally:
+        engine.close()
+
+
+def test_cached_pages_expire_after_ttl(tmp_path):
+    with FakeSearchServer(total=40) as server:
+        config = make_config(server, tmp_path, cache_ttl=1)
+        first = crawl(config)
+        requests_made = server.requests
+        assert len(first) == 40 and requests_made == 2
+
+        # 有效期内重复抓取直接使用缓存
+        assert crawl(config) == first
+        assert server.requests == requests_made
+
+        time.sleep(1.2)
+        assert crawl(config) == first
+        assert server.requests == requests_made * 2
+
+
+def test_lru_eviction_keeps_recently_used_pages(tmp_path):
+    with FakeSearchServer(total=400) as server:
+        config = make_config(server, tmp_path)
+        responses = [requests.get(server.search_url, params=build_params(config, page), timeout=30)
+                     for page in range(1, 9)]
+    size = max(len(resp.content) for resp in responses)
+    params = [build_params(config, page) for page in range(1, 9)]
+    # 最多容纳约 5 页
+    cache = ResponseCache(str(tmp_path / 'lru'), max_mb=size * 5.5 / 1024 / 1024)
+    try:
+        for i in range(5):
+            cache.put(server.search_url, params[i], responses[i])
+            time.sleep(0.01)
+        # 第1页最近被访问过，不应被淘汰
+        assert cache.get(server.search_url, params[0]) is not None
+        for i in range(5, 8):
+            time.sleep(0.01)
+            cache.put(server.search_url, params[i], responses[i])
+
+        assert cache.total_bytes <= cache.max_bytes
+        assert cache.total_bytes == cache._stored_bytes()
+        # 超过上限时淘汰到上限的 90%：最久未访问的第2~5页被淘汰
+        for i in range(1, 5):
+            assert cache.get(server.search_url, params[i]) is None
+        for i in (0, 5, 6, 7):
+            assert cache.get(server.search_url, params[i]) is not None
+    finally:
+        cache.close()
+
+
+def test_access_times_are_written_back_on_close(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache'))
+    resp = requests.models.Response()
+    resp.status_code = 200
+    resp._content = b'<html></html>'
+    cache.put('http://example.com/', {'page_index': 1}, resp)
+    stored = cache.conn.execute('SELECT accessed FROM responses').fetchone()[0]
+    time.sleep(0.01)
+    assert cache.get('http://example.com/', {'page_index': 1}) is not None
+    # 命中时不写数据库
+    assert cache.conn.execute('SELECT accessed FROM responses').fetchone()[0] == stored
+    cache.close()
+
+    cache = ResponseCache(str(tmp_path / 'cache'))
+    assert cache.conn.execute('SELECT accessed FROM responses').fetchone()[0] > stored
+    assert cache.total_bytes == len(b'<html></html>')
+    cache.close()
+
+
+def test_offline_mode_replays_cache_and_raises_on_miss(tmp_path):
+    with FakeSearchServer(total=40) as server:
+        first = crawl(make_config(server, tmp_path, cache_ttl=0.01))
+        requests_made = server.requests
+        time.sleep(0.05)
+
+        # 离线回放时忽略有效期，不访问网络
+        offline = make_config(server, tmp_path, cache_ttl=0.01, offline=True)
+        assert crawl(offline) == first
+        assert server.requests == requests_made
+
+        engine = CrawlEngine(make_config(server, tmp_path, offline=True, keyword='未缓存的查询'))
+        try:
+            with pytest.raises(CacheMiss):
+                engine.fetch_page(1)
+        finally:
+            engine.close()
+        assert server.requests == requests_made
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""断点日志：末行写了一半时的恢复，以及续抓时跳过已完成的页面"""
+
+import json
+import os
+
+from benchmarks.fakesite import FakeSearchServer
+from ccgp.checkpoint import CrawlCheckpoint, read_journal
+from ccgp.engine import CrawlEngine
+from ccgp.record import Announcement
+
+CONFIG = {'keyword': '公告', 'start_date': '2025-07-01', 'end_date': '2025-07-01', 'time_type': 6}
+
+
+def tear_last_line(path):
+    """把最后一行截掉一半，模拟写入时断电"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    start = data.rstrip(b'\n').rfind(b'\n') + 1
+    with open(path, 'wb') as f:
+        f.write(data[:start + (len(data) - start) // 2])
+    return start
+
+
+def page_records(page):
+    return [Announcement(title=f'第{page}页公告{i}', date='2025.07.01', href=f'http://www.ccgp.gov.cn/{page}_{i}.htm')
+            for i in range(3)]
+
+
+def test_torn_last_line_is_dropped_on_resume(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    checkpoint = CrawlCheckpoint(path, CONFIG)
+    checkpoint.set_total(12, 4)
+    for page in (1, 2, 3, 4):
+        checkpoint.page_done(page, page_records(page))
+    checkpoint.close()
+    valid_end = tear_last_line(path)
+
+    resumed = CrawlCheckpoint(path, CONFIG, resume=True)
+    assert resumed.resumed
+    assert resumed.done_pages == {1, 2, 3}
+    assert resumed.record_count == 9
+    assert (resumed.total, resumed.page_count) == (12, 4)
+    # 写了一半的末行已截掉，只重放完整的页面
+    assert os.path.getsize(path) == valid_end
+    assert [r.href for r in resumed.replay()] == [r.href for page in (1, 2, 3) for r in page_records(page)]
+
+    # 续写的条目接在最后一个完整行之后，整个日志都可以解析
+    resumed.page_done(4, page_records(4))
+    resumed.close()
+    pages = [entry['page'] for entry in read_journal(path) if entry['type'] == 'page']
+    assert pages == [1, 2, 3, 4]
+    with open(path, encoding='utf-8') as f:
+        assert all(json.loads(line) for line in f)
+
+
+def test_resume_fetches_only_unfinished_pages(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with FakeSearchServer(total=100) as server:
+        config = dict(CONFIG, search_url=server.search_url, min_delay=0.01, max_delay=0.05)
+        checkpoint = CrawlCheckpoint(path, config)
+        engine = CrawlEngine(config, checkpoint=checkpoint)
+        first = [record.href for record in engine.iter_records()]
+        engine.close()
+        checkpoint.close()
+        assert len(first) == 100 and server.requests == 5
+
+        tear_last_line(path)
+        checkpoint = CrawlCheckpoint(path, config, resume=True)
+        assert checkpoint.done_pages == {1, 2, 3, 4}
+        engine = CrawlEngine(config, checkpoint=checkpoint)
+        second = [record.href for record in engine.iter_records()]
+        engine.close()
+        checkpoint.finish()
+
+        # 只重新请求写了一半的第5页，记录与第一次抓取一致
+        assert server.requests == 6
+        assert second == first
+        assert engine.completed
+        assert not os.path.exists(path)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""详情页抓取，使用 benchmarks.fakesite 的本地模拟搜索服务器"""
+
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fakesite import FakeSearchServer
+from ccgp.detail import DetailFetcher
+from ccgp.engine import CrawlEngine, get_request_headers
+
+
+def test_request_headers_follow_the_url():
+    headers = get_request_headers(url='http://www.ccgp.gov.cn/cggg/dfgg/gkzb/202507/t20250701_1.htm')
+    assert headers['Host'] == 'www.ccgp.gov.cn'
+    assert headers['Referer'] == 'http://www.ccgp.gov.cn/'
+    assert get_request_headers()['Host'] == 'search.ccgp.gov.cn'
+
+
+def test_detail_requests_use_detail_host_and_list_page_referer():
+    with FakeSearchServer(total=40) as server:
+        config = {'search_url': server.search_url, 'min_delay': 0.01, 'max_delay': 0.05,
+                  'detail_min_delay': 0.01, 'detail_max_delay': 0.05, 'detail_workers': 2,
+                  'keyword': '公告', 'start_date': '2025-07-01', 'end_date': '2025-07-01', 'time_type': 6}
+        engine = CrawlEngine(config)
+        fetcher = DetailFetcher(config)
+        try:
+            records = list(fetcher.enrich(engine.iter_records()))
+        finally:
+            engine.close()
+            fetcher.close()
+
+    assert len(records) == 40
+    assert fetcher.failed == 0
+    assert all(record.detail and record.detail.get('project_code') for record in records)
+    assert len(server.detail_requests) == 40
+    netloc = urlsplit(server.base_url).netloc
+    for host, referer in server.detail_requests:
+        assert host == netloc
+        assert referer.startswith(server.search_url)
+        query = parse_qs(urlsplit(referer).query)
+        assert query['kw'] == ['公告']
+        assert query['page_index'][0] in ('1', '2')
+
+
+
+def run_enrich(server, tmp_path, consume, stop=None):
+    """
+    在后台线程中读取 enrich() 的记录，consume(记录列表) 为真时停止读取，然后按 cli / GUI 的顺序关闭；
+    stop 在读到第一条记录后从主线程调用。返回 (记录列表, 关闭引擎时列表抓取是否已结束)
+    """
+    config = {'search_url': server.search_url, 'min_delay': 0.01, 'max_delay': 0.05,
+              'detail_min_delay': 0.01, 'detail_max_delay': 0.05, 'detail_workers': 2,
+              'start_date': '2025-07-01', 'end_date': '2025-07-01', 'time_type': 6,
+              'cache_dir': str(tmp_path / 'cache')}
+    engine = CrawlEngine(config)
+    fetcher = DetailFetcher(config)
+    listing_done = threading.Event()
+    result = {'records': [], 'errors': []}
+    first = threading.Event()
+
+    def listing():
+        try:
+            yield from engine.iter_records()
+        finally:
+            listing_done.set()
+
+    def crawl():
+        source = fetcher.enrich(listing())
+        try:
+            for record in source:
+                result['records'].append(record)
+                first.set()
+                if consume(result['records']):
+                    break
+        except Exception as e:
+            result['errors'].append(e)
+        finally:
+            first.set()
+            source.close()
+            result['listing_done'] = listing_done.is_set()
+            engine.close()
+            fetcher.close()
+
+    thread = threading.Thread(target=crawl)
+    thread.start()
+    assert first.wait(10)
+    if stop is not None:
+        stop(engine, fetcher)
+    thread.join(10)
+    assert not thread.is_alive()
+    assert result['errors'] == []
+    assert engine.cache is None
+    return result['records'], result['listing_done']
+
+
+def test_stop_and_close_during_enrich(tmp_path):
+    def stop(engine, fetcher):
+        engine.stop()
+        fetcher.stop()
+
+    with FakeSearchServer(total=400, latency=0.02) as server:
+        records, listing_done = run_enrich(server, tmp_path, lambda records: False, stop)
+    assert 0 < len(records) < 400
+    assert listing_done
+
+
+def test_closing_enrich_early_finishes_listing_first(tmp_path):
+    # 读取方出错提前退出（引擎没有被停止），关闭引擎前列表抓取的生成器也必须已经结束
+    with FakeSearchServer(total=400, latency=0.02) as server:
+        records, listing_done = run_enrich(server, tmp_path, lambda records: len(records) >= 5)
+    assert len(records) == 5
+    assert listing_done
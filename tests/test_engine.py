@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""CrawlEngine 的停止与资源释放，使用 benchmarks.fakesite 的本地模拟搜索服务器"""
+
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakeproxy import FakeProxy
+from benchmarks.fakesite import FakeSearchServer
+from ccgp.engine import CrawlEngine, CrawlStopped
+from ccgp.retry import CircuitBreaker
+
+
+def make_config(server, tmp_path, **extra):
+    config = {'search_url': server.search_url, 'min_delay': 0.01, 'max_delay': 0.05,
+              'start_date': '2025-07-01', 'end_date': '2025-07-01', 'time_type': 6,
+              'cache_dir': str(tmp_path / 'cache')}
+    config.update(extra)
+    return config
+
+
+def test_stop_keeps_cache_open_until_close(tmp_path):
+    with FakeSearchServer(total=40) as server:
+        engine = CrawlEngine(make_config(server, tmp_path))
+        engine.stop()
+        # stop() 可能在其他线程调用，抓取线程此时仍可能读写缓存
+        assert engine.cache is not None
+        assert engine.cache.get(server.search_url, {'page_index': 1}) is None
+        engine.close()
+        assert engine.cache is None
+
+
+def test_stop_from_another_thread_during_crawl(tmp_path):
+    with FakeSearchServer(total=400, latency=0.02) as server:
+        engine = CrawlEngine(make_config(server, tmp_path))
+        records = []
+        errors = []
+        first = threading.Event()
+
+        def crawl():
+            try:
+                for record in engine.iter_records():
+                    records.append(record)
+                    first.set()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                first.set()
+                engine.close()
+
+        thread = threading.Thread(target=crawl)
+        thread.start()
+        assert first.wait(10)
+        engine.stop()
+        thread.join(10)
+        assert not thread.is_alive()
+        assert errors == []
+        assert 0 < len(records) < 400
+        assert not engine.completed
+
+
+class StoppedLimiter(object):
+    """acquire() 期间收到停止请求的限速器"""
+
+    def acquire(self, should_stop=None):
+        return None
+
+
+def test_stopped_engine_hands_back_half_open_probe(tmp_path):
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    with FakeSearchServer(total=40) as server:
+        engine = CrawlEngine(make_config(server, tmp_path), breaker=breaker,
+                             limiter=StoppedLimiter())
+        try:
+            with pytest.raises(CrawlStopped):
+                engine._open_url(server.search_url, {'page_index': 1})
+        finally:
+            engine.close()
+        assert server.requests == 0
+    # 共享同一熔断器的其他引擎不会一直等待试探结果
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.wait() == CircuitBreaker.PROBE
+
+
+def open_breaker():
+    """冷却已结束、下一个请求就是试探请求的熔断器"""
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    return breaker
+
+
+def test_banned_proxy_hands_back_half_open_probe(tmp_path):
+    breaker = open_breaker()
+    with FakeSearchServer(total=40) as server, FakeProxy() as proxy:
+        proxy.banned = True
+        engine = CrawlEngine(make_config(server, tmp_path, proxies=[proxy.url]), breaker=breaker)
+        try:
+            resp = engine._open_url(server.search_url, {'page_index': 1})
+        finally:
+            engine.close()
+        assert resp.status_code == 403
+        assert server.requests == 0
+    # 出口 IP 被拒绝说明不了网站是否恢复，熔断器不能停在半开状态
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.wait() == CircuitBreaker.PROBE
+
+
+def test_dead_proxy_does_not_hang_half_open_breaker(tmp_path):
+    dead = FakeProxy()
+    dead.start()
+    dead.stop()
+    breaker = open_breaker()
+    with FakeSearchServer(total=40) as server, FakeProxy() as proxy:
+        config = make_config(server, tmp_path, proxies=[dead.url, proxy.url],
+                             proxy_eject_threshold=1, retry_backoff=0.01)
+        engine = CrawlEngine(config, breaker=breaker)
+        results = []
+
+        def fetch():
+            try:
+                results.append(engine.fetch_page(1, parse=False)[0].status_code)
+            except Exception as e:
+                results.append(e)
+
+        thread = threading.Thread(target=fetch)
+        thread.start()
+        thread.join(10)
+        hung = thread.is_alive()
+        engine.stop()
+        thread.join(10)
+        engine.close()
+        # 第一次试探连不上代理，交还后由另一个出口重新试探
+        assert not hung
+        assert results == [200]
+        assert proxy.requests == 1
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""列表页解析：预编译的快速路径与原来的逐段解析结果一致，使用 benchmarks.fakesite 生成的结果页"""
+
+import pytest
+from lxml import etree
+
+from benchmarks.bench_parser import legacy_parse
+from benchmarks.fakesite import render_page
+from ccgp import listpage
+
+
+def parse_page(body, **query):
+    tree = listpage.parse_document(body)
+    records, skipped = listpage.parse_items(tree, query)
+    return listpage.parse_total(tree), records, skipped
+
+
+def test_fixture_page_fields():
+    total, records, skipped = parse_page(render_page('fixture', 45, 1).encode('utf-8'), keyword='公告',
+                                         bid_type='7', bid_type_name='中标公告', zone_id='45', page=1)
+    assert total == 45
+    assert skipped == []
+    assert len(records) == 20
+    first, second = records[0], records[1]
+    assert first.to_dict() == {
+        'title': '柳州市财政局医疗设备采购项目更正公告',
+        'date': '2025.09.06',
+        'buyer': '柳州市财政局',
+        'agent': '中化国际招标有限责任公司',
+        'region': '广西',
+        'href': 'http://www.ccgp.gov.cn/cggg/dfgg/gkzb/202507/tfixture_0.htm',
+        'summary': '项目编号：GXZC2025-G7-89732，预算金额约710万元。',
+        'keyword': '公告', 'bid_type': '7', 'bid_type_name': '中标公告', 'zone_id': '45', 'page': 1,
+    }
+    assert (second.date, second.buyer, second.agent, second.region, second.href) == (
+        '2025.05.18', '玉林市人民政府办公室', '广西建设工程招标有限公司', '广西',
+        'http://www.ccgp.gov.cn/cggg/dfgg/gkzb/202503/tfixture_1.htm')
+
+
+@pytest.mark.parametrize('seed', ['fixture', '公告|45|7|2025:07:01|2025:07:31', 'other'])
+def test_fast_parser_matches_legacy_parser(seed):
+    for page in (1, 2, 3):
+        body = render_page(seed, 55, page).encode('utf-8')
+        legacy_total, legacy_rows = legacy_parse(body)
+        total, records, _ = parse_page(body)
+        assert total == legacy_total
+        fields = ['title', 'date', 'buyer', 'agent', 'region', 'href', 'summary']
+        assert [{k: getattr(r, k) for k in fields} for r in records] == legacy_rows
+
+
+@pytest.mark.parametrize('info, expected', [
+    ('2025.07.0912:00:00|采购人：南宁市财政局|代理机构：广西招标公司|广西',
+     ('2025.07.09', '南宁市财政局', '广西招标公司', '广西')),
+    ('2025.07.0912:00:00|采购人：南宁市财政局|广西', ('2025.07.09', '南宁市财政局', '', '广西')),
+    ('2025.07.0912:00:00|代理机构：广西招标公司|广西', ('2025.07.09', '', '广西招标公司', '广西')),
+    ('2025.07.0912:00:00|采购人：南宁市财政局', ('2025.07.09', '南宁市财政局', '', '')),
+    # 正则不接受的信息串（字段中有全角冒号、字段顺序不同）交给逐段解析，结果与原来的解析方式一致
+    ('2025.07.0912:00:00|采购人：南宁市财政局代理机构：广西招标公司|广西',
+     ('2025.07.09', '南宁市财政局代理机构：广西招标公司', '广西招标公司', '广西')),
+    ('2025.07.0912:00:00|采购人：南宁市财政局代理机构：广西招标公司',
+     ('2025.07.09', '南宁市财政局', '广西招标公司', '')),
+    ('2025.07.0912:00:00|代理机构：广西招标公司|采购人：南宁市财政局|广西',
+     ('2025.07.09', '南宁市财政局', '广西招标公司', '广西')),
+])
+def test_parse_info(info, expected):
+    assert listpage.parse_info(info) == expected
+    assert listpage.parse_info_slow(info) == expected
+
+
+def test_incomplete_items_are_skipped():
+    li = etree.fromstring('<li><a href="/x.htm">标题</a><p>概况</p></li>')
+    assert listpage.parse_list_item(li) is None
+    li = etree.fromstring('<li><a href="/x.htm"> </a><p>概况</p><span>2025.07.09</span></li>')
+    assert listpage.parse_list_item(li) is None
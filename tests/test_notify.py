@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""邮件提醒的合并、附件和连接复用，使用 benchmarks.fakesmtp 的本地模拟 SMTP 服务器"""
+
+import email.header
+import io
+import time
+import zipfile
+
+from benchmarks.fakesmtp import FakeSMTPServer
+from ccgp.notify import EmailDispatcher, SMTPConnection
+
+HEAD = ['标题', '链接']
+
+
+def make_dispatcher(server, **extra):
+    connection = SMTPConnection(server.host, server.port, 'user', 'pass', use_ssl=False)
+    options = {'digest_window': 0.0, 'attach_threshold': 100}
+    options.update(extra)
+    return EmailDispatcher(connection, 'sender@example.com', 'receiver@example.com', HEAD,
+                           link_column=1, **options)
+
+
+def make_rows(count, prefix='公告'):
+    return [(f'{prefix}{i}', f'http://www.ccgp.gov.cn/{prefix}{i}.htm') for i in range(count)]
+
+
+def wait_for_messages(server, count, timeout=10):
+    deadline = time.monotonic() + timeout
+    while len(server.messages) < count and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return server.messages
+
+
+def subject_of(message):
+    return str(email.header.make_header(email.header.decode_header(message['Subject'])))
+
+
+def html_of(message):
+    for part in message.walk():
+        if part.get_content_type() == 'text/html':
+            return part.get_payload(decode=True).decode('utf-8')
+
+
+def attachments_of(message):
+    return [part for part in message.walk() if part.get_filename()]
+
+
+def test_alerts_within_window_are_merged_into_one_digest():
+    with FakeSMTPServer() as server:
+        dispatcher = make_dispatcher(server, digest_window=0.5)
+        dispatcher.notify('关键词A', make_rows(2, 'A'))
+        dispatcher.notify('关键词B', make_rows(3, 'B'))
+        dispatcher.notify('关键词A', make_rows(1, 'C'))
+        messages = wait_for_messages(server, 1)
+        dispatcher.close(10)
+
+    assert len(messages) == 1
+    assert dispatcher.sent == 1
+    subject = subject_of(messages[0])
+    assert '6 条' in subject
+    assert '关键词A、关键词B' in subject
+    body = html_of(messages[0])
+    assert '发现 6 条新招标公告' in body
+    for row in make_rows(2, 'A') + make_rows(3, 'B') + make_rows(1, 'C'):
+        assert row[0] in body
+    assert attachments_of(messages[0]) == []
+
+
+def test_large_digest_is_sent_as_zip_attachment():
+    with FakeSMTPServer() as server:
+        dispatcher = make_dispatcher(server, attach_threshold=5)
+        dispatcher.notify('关键词A', make_rows(5))
+        wait_for_messages(server, 1)
+        dispatcher.notify('关键词B', make_rows(6))
+        messages = wait_for_messages(server, 2)
+        dispatcher.close(10)
+
+    # 未超过阈值时正文直接列出数据
+    assert attachments_of(messages[0]) == []
+    assert '公告4' in html_of(messages[0])
+
+    body = html_of(messages[1])
+    assert '关键词B：6 条' in body
+    assert '完整列表见附件' in body
+    assert '公告5' not in body
+    parts = attachments_of(messages[1])
+    assert len(parts) == 1
+    assert parts[0].get_filename().endswith('.zip')
+    with zipfile.ZipFile(io.BytesIO(parts[0].get_payload(decode=True))) as archive:
+        text = archive.read('new_announcements.csv').decode('utf-8-sig')
+    lines = text.splitlines()
+    assert lines[0] == '来源,标题,链接'
+    assert len(lines) == 7
+    assert lines[-1] == '关键词B,公告5,http://www.ccgp.gov.cn/公告5.htm'
+
+
+def test_connection_and_login_are_reused():
+    with FakeSMTPServer() as server:
+        dispatcher = make_dispatcher(server)
+        for i in range(3):
+            dispatcher.notify(f'关键词{i}', make_rows(1, f'第{i}封'))
+            wait_for_messages(server, i + 1)
+        dispatcher.close(10)
+
+        assert len(server.messages) == 3
+        assert server.connections == 1
+        assert server.logins == 1
+        assert dispatcher.connection.connects == 1
+        assert dispatcher.connection.server is None
+
+
+def test_close_flushes_pending_alerts():
+    with FakeSMTPServer() as server:
+        dispatcher = make_dispatcher(server, digest_window=60)
+        dispatcher.notify('关键词A', make_rows(2, 'A'))
+        dispatcher.notify('关键词B', make_rows(1, 'B'))
+        started = time.monotonic()
+        dispatcher.close(10)
+
+        # 不等合并窗口结束，立即发出一封包含全部提醒的邮件
+        assert time.monotonic() - started < 5
+        assert not dispatcher.thread.is_alive()
+        assert len(server.messages) == 1
+        assert '3 条' in subject_of(server.messages[0])
+        assert dispatcher.sent == 1
+        assert dispatcher.failed == 0
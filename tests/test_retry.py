@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""熔断器的状态转换"""
+
+import threading
+import time
+
+from ccgp.retry import CircuitBreaker
+
+
+def trip(breaker):
+    for _ in range(breaker.threshold):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_closed_open_half_open_stop_open():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    assert breaker.wait() is True
+    trip(breaker)
+    # 暂停期间被停止
+    assert breaker.wait(lambda: True) is False
+    time.sleep(0.06)
+    assert breaker.wait() == CircuitBreaker.PROBE
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # 获得试探机会的调用者被停止，交还后其他调用者立即得到试探机会
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.remaining() == 0
+    assert breaker.wait() == CircuitBreaker.PROBE
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.wait() is True
+
+
+def test_release_probe_does_not_reopen_closed_breaker():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_released_probe_unblocks_waiting_caller():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    trip(breaker)
+    time.sleep(0.02)
+    assert breaker.wait() == CircuitBreaker.PROBE
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(breaker.wait()))
+    waiter.start()
+    waiter.join(0.3)
+    # 试探结果出来之前其他调用者一直等待
+    assert waiter.is_alive()
+    breaker.release_probe()
+    waiter.join(2)
+    assert results == [CircuitBreaker.PROBE]
+
+
+def test_failed_probe_doubles_cooldown():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    trip(breaker)
+    time.sleep(0.02)
+    assert breaker.wait() == CircuitBreaker.PROBE
+    assert breaker.record_failure() == 0.02
+    assert breaker.state == CircuitBreaker.OPEN
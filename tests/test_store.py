@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""公告库的搜索：1~2个字的搜索词走二字索引，结果与逐行匹配一致"""
+
+import random
+import sqlite3
+
+import pytest
+
+from ccgp.record import Announcement
+from ccgp.store import AnnouncementStore, bigrams
+
+CHARS = '南宁医疗设备采购项目公开招标服务工程学校医院政府道路维修物业管理AbCx1-'
+
+
+def make_record(i, rng):
+    title = ''.join(rng.choice(CHARS) for _ in range(12))
+    if i % 500 == 3:
+        title += '鑫'
+    detail = {'项目编号': f'GXZC2025-G{i}', '预算': f'{rng.randint(1, 99)}万元'}
+    return Announcement(title=title, date=f'2025-{1 + i % 12:02d}-{1 + i % 28:02d}', buyer=f'单位{i % 30}',
+                        agent='代理公司', href=f'http://www.ccgp.gov.cn/{i}.htm', summary='概况' + title[:4],
+                        bid_type=str(1 + i % 3), zone_id='45' if i % 2 else '4501', detail=detail)
+
+
+@pytest.fixture(scope='module')
+def seeded(tmp_path_factory):
+    rng = random.Random(7)
+    records = [make_record(i, rng) for i in range(3000)]
+    store = AnnouncementStore(str(tmp_path_factory.mktemp('store') / 'announcements.db'))
+    store.upsert_many(records)
+    yield store, records
+    store.close()
+
+
+def brute_force(records, terms, bid_type=None):
+    """逐条检查各字段（详情只看字段值，英文不区分大小写）"""
+    result = set()
+    for r in records:
+        fields = [r.title, r.summary, r.buyer, r.agent, ' '.join(r.detail.values())]
+        text = '\n'.join(fields).lower()
+        if all(term.lower() in text for term in terms) and (bid_type is None or r.bid_type == bid_type):
+            result.add(r.href)
+    return result
+
+
+def test_bigrams():
+    assert bigrams('医疗设备A1') == '医疗 疗设 设备 备A A1 1'
+    assert bigrams('GXZC-G1_2') == 'GX XZ ZC C G1 1 2'
+    assert bigrams('') == ''
+    assert bigrams(None) is None
+
+
+@pytest.mark.parametrize('text', ['鑫', '医', 'a', 'B', '医院', '修物', 'AB', 'x1', '1-', '万元', '预算',
+                                  '南宁 鑫', '采购项目 医'])
+def test_short_terms_match_like_scan(seeded, text):
+    store, records = seeded
+    found = {row['href'] for row in store.search(text, limit=None)}
+    assert found == brute_force(records, text.split())
+
+
+def test_short_terms_combine_with_filters(seeded):
+    store, records = seeded
+    rows = store.search('鑫', bid_type='2', limit=None)
+    assert {row['href'] for row in rows} == brute_force(records, ['鑫'], bid_type='2')
+    assert all(row['bid_type'] == '2' for row in rows)
+
+
+def test_rare_short_term_uses_bigram_index(seeded):
+    store, _ = seeded
+    assert store.bigram
+    sql, params = store._search_sql('鑫', None, None, None, None, 200)
+    plan = [row[3] for row in store.conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+    # 按索引匹配到的 rowid 逐条取出，不再扫描公告表
+    assert any('announcements_bigram VIRTUAL TABLE' in step for step in plan)
+    assert any('INTEGER PRIMARY KEY' in step for step in plan)
+    assert not any(step.startswith('SCAN announcements ') or step == 'SCAN announcements' for step in plan)
+    assert 'LIKE' not in sql
+
+
+def test_terms_with_symbols_fall_back_to_like(seeded):
+    store, records = seeded
+    sql, _ = store._search_sql('-G', None, None, None, None, 200)
+    assert 'LIKE' in sql
+    assert {row['href'] for row in store.search('-G', limit=None)} == brute_force(records, ['-G'])
+
+
+def test_bigram_index_follows_updates(tmp_path):
+    store = AnnouncementStore(str(tmp_path / 'announcements.db'))
+    record = Announcement(title='南宁医院设备', date='2025-07-01', href='http://www.ccgp.gov.cn/1.htm')
+    store.upsert_many([record])
+    assert len(store.search('医院')) == 1
+    store.upsert_many([record.replace(title='柳州学校设备')])
+    assert store.search('医院') == []
+    assert len(store.search('学校')) == 1
+    with store.conn:
+        store.conn.execute('DELETE FROM announcements')
+    assert store.search('学校') == []
+    store.close()
+
+
+def test_existing_store_builds_bigram_index(tmp_path):
+    path = str(tmp_path / 'announcements.db')
+    store = AnnouncementStore(path)
+    store.upsert_many([Announcement(title='南宁医院设备', date='2025-07-01', href='http://www.ccgp.gov.cn/1.htm')])
+    # 模拟二字索引加入之前创建的公告库
+    with store.conn:
+        store.conn.execute('DROP TABLE announcements_bigram')
+    store.close()
+
+    store = AnnouncementStore(path)
+    sql, _ = store._search_sql('医院', None, None, None, None, 200)
+    assert 'announcements_bigram' in sql
+    assert len(store.search('医院')) == 1
+    store.close()
+
+
+def test_other_programs_can_write_the_store(tmp_path):
+    path = str(tmp_path / 'announcements.db')
+    store = AnnouncementStore(path)
+    store.upsert_many([Announcement(title='南宁医院设备', date='2025-07-01', href='http://www.ccgp.gov.cn/1.htm')])
+    store.close()
+
+    # 不经过 AnnouncementStore 的连接（如 sqlite3 命令行）写入公告表
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT INTO announcements (href, title, date, first_seen, last_seen) "
+                     "VALUES ('http://www.ccgp.gov.cn/2.htm', '柳州学校维修', '2025-07-02', '', '')")
+        conn.execute("UPDATE announcements SET title = '南宁道路工程' WHERE href = 'http://www.ccgp.gov.cn/1.htm'")
+    conn.close()
+
+    store = AnnouncementStore(path)
+    # 新增的公告在打开时补入二字索引，修改过的公告在重建后更新
+    assert [row['title'] for row in store.search('学校')] == ['柳州学校维修']
+    assert [row['title'] for row in store.search('道路工程')] == ['南宁道路工程']
+    store.rebuild_search_index()
+    assert store.search('医院') == []
+    assert [row['title'] for row in store.search('道路')] == ['南宁道路工程']
+    store.close()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+任务队列的租约、收回和失败上限，以及分布式回填中收回崩溃节点的任务。
+
+每个测试用两个连接打开同一个队列文件，模拟两台机器上的节点。
+"""
+
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakesite import FakeSearchServer
+from ccgp.distributed import Coordinator, QueueWorker
+from ccgp.workqueue import SQLiteWorkQueue
+
+LEASE = 0.2
+
+
+@pytest.fixture
+def queues(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    first = SQLiteWorkQueue(path, max_attempts=2)
+    second = SQLiteWorkQueue(path, max_attempts=2)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_expired_lease_is_reclaimed_and_late_result_discarded(queues):
+    a, b = queues
+    a.publish('job', [('k1', {'n': 1})])
+    task = a.claim('a', LEASE)
+    assert task.attempts == 1
+    # 租约有效期内其他节点领取不到
+    assert b.claim('b', LEASE) is None
+    assert a.renew(task, 'a', LEASE)
+    assert b.status('job')['leased'] == 1
+
+    time.sleep(LEASE + 0.1)
+    assert b.status('job')['expired'] == 1
+    reclaimed = b.claim('b', LEASE)
+    assert (reclaimed.id, reclaimed.attempts) == (task.id, 2)
+
+    # 原节点恢复后续约失败，迟到的结果被丢弃
+    assert not a.renew(task, 'a', LEASE)
+    assert not a.complete(task, 'a', [{'href': 'late'}])
+    assert b.complete(reclaimed, 'b', [{'href': 'on-time'}])
+    assert list(a.iter_results('job')) == [('k1', [{'href': 'on-time'}])]
+    assert a.status('job')['done'] == 1
+
+
+def test_task_fails_after_max_attempts(queues):
+    a, b = queues
+    a.publish('job', [('k1', {})])
+    task = a.claim('a', LEASE)
+    a.fail(task, 'a', '第 [3] 页抓取失败')
+    assert b.status('job')['pending'] == 1
+
+    task = b.claim('b', LEASE)
+    assert task.attempts == 2
+    b.fail(task, 'b', '连接超时')
+    assert a.claim('a', LEASE) is None
+    assert a.status('job')['failed'] == 1
+    assert a.failures('job') == [('k1', '连接超时')]
+
+
+def test_expired_lease_at_max_attempts_is_marked_failed(queues):
+    a, b = queues
+    a.publish('job', [('k1', {})])
+    a.claim('a', LEASE)
+    time.sleep(LEASE + 0.1)
+    b.claim('b', LEASE)
+    time.sleep(LEASE + 0.1)
+    # 两次领取后租约都超时，不再重试
+    assert a.claim('a', LEASE) is None
+    assert b.failures('job') == [('k1', '多次领取后租约超时')]
+
+
+def test_release_does_not_count_an_attempt(queues):
+    a, b = queues
+    a.publish('job', [('k1', {})])
+    task = a.claim('a', LEASE)
+    a.release(task, 'a')
+    assert b.claim('b', LEASE).attempts == 1
+
+
+def test_concurrent_claims_take_each_task_once(queues):
+    a, b = queues
+    a.publish('job', [(f'k{i:03d}', {}) for i in range(100)])
+    claimed = {'a': [], 'b': []}
+
+    def drain(queue, worker):
+        while True:
+            task = queue.claim(worker, 30)
+            if task is None:
+                return
+            claimed[worker].append(task.key)
+
+    threads = [threading.Thread(target=drain, args=(a, 'a')), threading.Thread(target=drain, args=(b, 'b'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    keys = claimed['a'] + claimed['b']
+    assert len(keys) == 100
+    assert len(set(keys)) == 100
+
+
+def test_worker_takes_over_task_of_crashed_node(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    with FakeSearchServer(total=60) as server:
+        config = {'search_url': server.search_url, 'min_delay': 0.01, 'max_delay': 0.05,
+                  'keyword': '公告', 'start_date': '2025-07-01', 'end_date': '2025-07-01'}
+        coordinator_queue = SQLiteWorkQueue(path)
+        coordinator = Coordinator(coordinator_queue, config, pages_per_task=1)
+        assert coordinator.publish() == 1
+
+        # 崩溃的节点领取了分片任务后不再续约
+        crashed = SQLiteWorkQueue(path)
+        lost = crashed.claim('crashed', LEASE)
+        time.sleep(LEASE + 0.1)
+
+        worker_queue = SQLiteWorkQueue(path)
+        worker = QueueWorker(worker_queue, config, worker_id='alive')
+        try:
+            worker.run(exit_when_idle=True, poll=0.05)
+        finally:
+            worker.close()
+
+        assert worker.completed == 3
+        assert not crashed.complete(lost, 'crashed', [])
+        counts = coordinator.wait(poll=0.05)
+        assert counts['done'] == 3 and counts['failed'] == 0
+        records = list(coordinator.iter_records())
+        assert len(records) == 60
+        assert len({record.href for record in records}) == 60
+        for queue in (crashed, worker_queue, coordinator_queue):
+            queue.close()